@@ -0,0 +1 @@
+# Benchmarks for the framework itself - BasePage primitives, page objects and the journey offline
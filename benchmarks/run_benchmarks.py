@@ -0,0 +1,399 @@
+"""
+Offline benchmarks for the framework - times BasePage primitives, page-object methods and the whole
+journey against the local fixtures in a headless browser, and compares them with a saved baseline
+Usage:
+    python -m benchmarks.run_benchmarks                  # run and compare with the baseline
+    python -m benchmarks.run_benchmarks --save-baseline  # run and store the result as new baseline
+    python -m benchmarks.run_benchmarks --only primitives --repeat 10 --tolerance 0.3
+
+The stand-in server serves home_full.html (OneTrust banner, update popup in an iframe, sample
+modal with react-select inputs) and results.html (acmg card, ColoredPill verdict), so the same
+locators as on varsome.com are exercised. Exit code is 1 when something got slower than the
+baseline by more than the tolerance
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from locators import Locators, TestData, RunSettings
+from framework.timeout_policy import percentile
+
+# Each benchmark is (group, name, setup, action) - setup(ctx) is not timed, action(ctx) is
+# Primitives run first - the page benchmarks install the overlay watcher, which closes popups by itself
+BENCHMARKS = []
+
+
+def benchmark(group, name, setup=None):
+    """Register the decorated function as the timed action of a benchmark"""
+    def register(action):
+        BENCHMARKS.append((group, name, setup, action))
+        return action
+    return register
+
+
+class Context:
+    """Browser, stand-in server and page objects shared by all benchmarks"""
+
+    def __init__(self, driver, base_url):
+        from framework.network_monitor import NetworkMonitor
+        from pages.home_page import HomePage
+        from pages.results_page import ResultsPage
+        from pages.sample_info_modal import SampleInfoModal
+
+        self.driver = driver
+        self.base_url = base_url
+        self.network = NetworkMonitor.for_driver(driver)
+        self.home = HomePage(driver)
+        self.modal = SampleInfoModal(driver)
+        self.results = ResultsPage(driver, network=self.network)
+
+    def fresh_browser_state(self):
+        """Like a new visitor - cookie banner and update popup show up again"""
+        from framework.driver_pool import reset_driver_state
+
+        reset_driver_state(self.driver)
+
+    def load_home(self, popups=False):
+        if not popups:
+            # Popups seen before - only the search form and the modal
+            self.driver.get(self.base_url + "/popup.html")
+            self.driver.add_cookie({"name": "OptanonAlertBoxClosed", "value": "1"})
+            self.driver.execute_script("localStorage.setItem('versionPopupSeen', '1');")
+        self.driver.get(self.base_url)
+        self.home.wait_for_page_load()
+
+    def open_modal(self):
+        self.load_home()
+        self.home.enter_variant(TestData.VARIANT)
+        self.home.click_search()
+        self.modal.check_if_modal_appears()
+
+    def load_results(self, wait=True):
+        from pages.results_page import build_results_url
+
+        self.network.reset()
+        self.driver.get(build_results_url(TestData.VARIANT, TestData.GENOME, base_url=self.base_url))
+        if wait:
+            self.results.wait_for_results_page(TestData.VARIANT, TestData.GENOME)
+
+
+# --- BasePage primitives ---
+
+@benchmark("primitives", "get_element (id)", setup=lambda ctx: ctx.load_results())
+def bench_get_element(ctx):
+    assert ctx.results.get_element(Locators.GERMLINE_CLASSIFICATION_CARD)
+
+
+@benchmark("primitives", "get_visible_element (xpath)", setup=lambda ctx: ctx.load_results())
+def bench_get_visible_element(ctx):
+    assert ctx.results.get_visible_element(Locators.VERDICT_PILL_TEXT)
+
+
+@benchmark("primitives", "get_clickable_element (composite)", setup=lambda ctx: ctx.load_home())
+def bench_get_clickable_element(ctx):
+    assert ctx.home.get_clickable_element(Locators.SEARCH_BUTTON_ANY)
+
+
+@benchmark("primitives", "is_element_visible (present)", setup=lambda ctx: ctx.load_results())
+def bench_is_element_visible(ctx):
+    assert ctx.results.is_element_visible(Locators.PUBLICATIONS_CARD)
+
+
+@benchmark("primitives", "get_text", setup=lambda ctx: ctx.load_results())
+def bench_get_text(ctx):
+    assert ctx.results.get_text(Locators.VERDICT_PILL_TEXT)
+
+
+@benchmark("primitives", "type_text", setup=lambda ctx: ctx.load_home())
+def bench_type_text(ctx):
+    assert ctx.home.type_text(Locators.SEARCH_INPUT_ANY, TestData.VARIANT)
+
+
+@benchmark("primitives", "click", setup=lambda ctx: ctx.open_modal())
+def bench_click(ctx):
+    assert ctx.modal.click(Locators.GERMLINE_TAB)
+
+
+@benchmark("primitives", "wait_for_dom (already true)", setup=lambda ctx: ctx.load_results())
+def bench_wait_for_dom(ctx):
+    assert ctx.results.wait_for_dom("return !!findAll(args[0]).length;", list(Locators.GERMLINE_CLASSIFICATION_CARD),
+                                    key="benchmark")
+
+
+@benchmark("primitives", "wait_for_locator (visible)", setup=lambda ctx: ctx.load_results())
+def bench_wait_for_locator(ctx):
+    assert ctx.results.wait_for_locator(Locators.GERMLINE_CLASSIFICATION_CARD, "visible") is not None
+
+
+@benchmark("primitives", "race_locator (3 alternatives)", setup=lambda ctx: ctx.load_results())
+def bench_race_locator(ctx):
+    assert ctx.results.race_locator(Locators.VERDICT_TEXT_ANY, "visible") is not None
+
+
+@benchmark("primitives", "wait_for_page_load", setup=lambda ctx: ctx.load_results())
+def bench_wait_for_page_load(ctx):
+    ctx.results.wait_for_page_load()
+
+
+@benchmark("primitives", "dismiss_overlays (nothing there)", setup=lambda ctx: ctx.load_results())
+def bench_dismiss_nothing(ctx):
+    assert ctx.results.dismiss_overlays() == []
+
+
+def _home_with_popups(ctx):
+    ctx.fresh_browser_state()
+    ctx.load_home(popups=True)
+    ctx.home.wait_for_dom("var f = document.getElementById('version-popup');"
+                          "return !!(f && f.contentDocument && f.contentDocument.readyState === 'complete');")
+
+
+@benchmark("primitives", "dismiss_overlays (banner + iframe popup)", setup=_home_with_popups)
+def bench_dismiss_popups(ctx):
+    assert ctx.home.dismiss_overlays()
+
+
+# --- Page objects ---
+
+@benchmark("pages", "HomePage.navigate_to_homepage (with popups)",
+           setup=lambda ctx: ctx.fresh_browser_state())
+def bench_navigate_to_homepage(ctx):
+    assert ctx.home.navigate_to_homepage()
+
+
+@benchmark("pages", "HomePage.enter_variant + select_genome", setup=lambda ctx: ctx.load_home())
+def bench_enter_variant(ctx):
+    assert ctx.home.enter_variant(TestData.VARIANT)
+    assert ctx.home.select_genome(TestData.GENOME)
+
+
+@benchmark("pages", "SampleInfoModal.select_germline_tab", setup=lambda ctx: ctx.open_modal())
+def bench_select_germline_tab(ctx):
+    assert ctx.modal.select_germline_tab()
+
+
+@benchmark("pages", "SampleInfoModal.fill_phenotype", setup=lambda ctx: ctx.open_modal())
+def bench_fill_phenotype(ctx):
+    assert ctx.modal.fill_phenotype(TestData.PHENOTYPE)
+
+
+@benchmark("pages", "SampleInfoModal.select_sex + enter_age + select_ethnicity", setup=lambda ctx: ctx.open_modal())
+def bench_fill_other_fields(ctx):
+    assert ctx.modal.select_sex(TestData.SEX)
+    assert ctx.modal.enter_age(TestData.AGE)
+    assert ctx.modal.select_ethnicity(TestData.ETHNICITY)
+
+
+@benchmark("pages", "SampleInfoModal.fill_profile (batched)", setup=lambda ctx: ctx.open_modal())
+def bench_fill_profile(ctx):
+    from framework.sample_profiles import load_profile
+
+    assert ctx.modal.fill_profile(load_profile("default"))
+
+
+@benchmark("pages", "ResultsPage.wait_for_results_page", setup=lambda ctx: ctx.load_results(wait=False))
+def bench_wait_for_results_page(ctx):
+    assert ctx.results.wait_for_results_page(TestData.VARIANT, TestData.GENOME)
+
+
+@benchmark("pages", "ResultsPage.verify_page_sections", setup=lambda ctx: ctx.load_results())
+def bench_verify_page_sections(ctx):
+    ctx.results.verify_page_sections(print_results=False, required=["Germline Classification"])
+
+
+@benchmark("pages", "ResultsPage.expand_germline_classification", setup=lambda ctx: ctx.load_results())
+def bench_expand_germline_classification(ctx):
+    assert ctx.results.expand_germline_classification()
+
+
+@benchmark("pages", "ResultsPage.get_verdict_snapshot", setup=lambda ctx: ctx.load_results())
+def bench_get_verdict_snapshot(ctx):
+    assert ctx.results.get_verdict_snapshot()["verdict_text"] == TestData.EXPECTED_VERDICT
+
+
+# --- Whole journey ---
+
+def _journey(ctx, mode):
+    from framework.journey import VariantCase, run_variant_journey
+
+    result = run_variant_journey(ctx.driver, VariantCase(TestData.VARIANT, mode=mode), retries=0)
+    assert result["passed"], result["error"]
+
+
+@benchmark("journey", "run_variant_journey (full)", setup=lambda ctx: ctx.fresh_browser_state())
+def bench_journey_full(ctx):
+    _journey(ctx, "full")
+
+
+@benchmark("journey", "run_variant_journey (direct)", setup=lambda ctx: ctx.fresh_browser_state())
+def bench_journey_direct(ctx):
+    _journey(ctx, "direct")
+
+
+def run_benchmarks(ctx, repeat, groups=None):
+    """Run every benchmark repeat times. Returns {name: {group, median, p90, min, runs, error}}"""
+    results = {}
+    for group, name, setup, action in BENCHMARKS:
+        if groups and group not in groups:
+            continue
+        samples, error = [], None
+        for _ in range(repeat):
+            try:
+                if setup:
+                    setup(ctx)
+                started = time.perf_counter()
+                action(ctx)
+                samples.append(time.perf_counter() - started)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+        results[name] = {
+            "group": group,
+            "median": round(percentile(samples, 0.5), 4) if samples else None,
+            "p90": round(percentile(samples, 0.9), 4) if samples else None,
+            "min": round(min(samples), 4) if samples else None,
+            "runs": len(samples),
+            "error": error,
+        }
+        status = f"{results[name]['median'] * 1000:8.1f} ms" if samples else "  FAILED  "
+        print(f"  [{group}] {name:<58} {status}" + (f"  {error}" if error else ""))
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance, noise_floor):
+    """Benchmarks whose median got slower than baseline x (1 + tolerance)
+    Differences below noise_floor seconds are ignored - a few ms is just jitter on fast primitives"""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("benchmarks", {}).get(name, {}).get("median")
+        if current["median"] is None or before is None:
+            continue
+        if current["median"] > before * (1 + tolerance) and current["median"] - before > noise_floor:
+            regressions.append({"name": name, "baseline": before, "current": current["median"],
+                                "change": round(current["median"] / before - 1, 3) if before else None})
+    return regressions
+
+
+def environment(driver):
+    """What the numbers depend on - a baseline from another machine or browser is only a rough guide"""
+    import selenium
+
+    return {
+        "python": platform.python_version(),
+        "selenium": selenium.__version__,
+        "browser": driver.capabilities.get("browserVersion"),
+        "machine": platform.node(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def close_state_writers():
+    """Save what the shared stores would write at exit and drop their exit hooks
+    They all write into the temporary state folder, which main() removes before exit"""
+    from framework.evidence import close_evidence_writer
+    from framework.locator_priority import get_priority_store
+    from framework.timeout_policy import get_timeout_policy
+
+    for save in (get_timeout_policy().save, get_priority_store().save):
+        save()
+        atexit.unregister(save)
+    close_evidence_writer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time framework primitives, page objects and the journey offline")
+    parser.add_argument("--repeat", type=int, default=RunSettings.BENCHMARK_REPEAT, help="Runs per benchmark")
+    parser.add_argument("--only", action="append", choices=["primitives", "pages", "journey"],
+                        help="Only this group (can be given more than once)")
+    parser.add_argument("--baseline", default=RunSettings.BENCHMARK_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=RunSettings.BENCHMARK_TOLERANCE,
+                        help="Allowed slowdown before a benchmark counts as regression (0.2 = 20%%)")
+    parser.add_argument("--api-delay", type=float, default=0.05, help="Seconds each stand-in API call takes")
+    args = parser.parse_args(argv)
+
+    # Keep learned timeouts, locator order and artifacts of the real runs out of this
+    state_dir = tempfile.mkdtemp(prefix="varsome_bench_")
+    RunSettings.ADAPTIVE_TIMEOUTS = False  # Fixed deadlines and polling so runs are comparable
+    RunSettings.NETWORK_READINESS = True  # The ApiEndpoints patterns match the stand-in server
+    RunSettings.DIRECT_MODE = True  # ...and so do the ResultsUrl parameters
+    RunSettings.TIMEOUT_HISTORY_FILE = os.path.join(state_dir, "timeout_history.json")
+    RunSettings.LOCATOR_PRIORITY_FILE = os.path.join(state_dir, "locator_priority.json")
+    RunSettings.ARTIFACTS_DIR = os.path.join(state_dir, "artifacts")
+    RunSettings.EVIDENCE_DIR = os.path.join(state_dir, "evidence")
+    os.environ["VARSOME_ADAPTIVE_TIMEOUTS"] = "0"
+
+    from framework.driver_factory import create_driver
+    from tools.stand_in_server import start_server
+
+    server, TestData.BASE_URL = start_server(api_delay=args.api_delay, home_page="home_full.html")
+    driver = create_driver(profile="lean", use_template=False)
+    try:
+        print(f"Running benchmarks ({args.repeat} runs each) against {TestData.BASE_URL}")
+        results = run_benchmarks(Context(driver, TestData.BASE_URL), args.repeat, args.only)
+        env = environment(driver)
+    finally:
+        driver.quit()
+        server.shutdown()
+        close_state_writers()  # Now, so nothing is written at exit after the folder is gone
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    run = {"created": datetime.now().isoformat(timespec="seconds"), "repeat": args.repeat,
+           "environment": env, "benchmarks": results}
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR, f"benchmarks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    failed = [name for name, r in results.items() if r["error"]]
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    print("\n" + "="*70)
+    if args.save_baseline:
+        if args.only and baseline:
+            # Partial run - keep the baseline of the groups that were not run
+            results = {**baseline.get("benchmarks", {}), **results}
+            run["benchmarks"] = results
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved as: {args.baseline}")
+    elif baseline is None:
+        # No baseline is committed - timings only compare on the machine that made them
+        print(f"No baseline at {args.baseline} - skipping the regression comparison. "
+              f"Run with --save-baseline on this machine to create one")
+    else:
+        if baseline.get("environment", {}).get("browser") != env["browser"]:
+            print(f"Note: baseline was made with browser {baseline.get('environment', {}).get('browser')}, "
+                  f"this run used {env['browser']}")
+        regressions = compare_with_baseline(results, baseline, args.tolerance, RunSettings.BENCHMARK_NOISE_FLOOR)
+        for r in regressions:
+            print(f"  [REGRESSION] {r['name']}: {r['baseline'] * 1000:.1f} ms -> {r['current'] * 1000:.1f} ms "
+                  f"(+{r['change']:.0%})")
+        print(f"{len(regressions)} regressions (tolerance {args.tolerance:.0%}) against baseline from {baseline.get('created')}")
+    for name in failed:
+        print(f"  [FAILED] {name}: {results[name]['error']}")
+    print("="*70)
+
+    run["regressions"] = regressions
+    run["tolerance"] = args.tolerance
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"Results saved as: {path}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Framework package for VarSome Test Automation
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Browser memory - how much RAM a WebDriver's Chrome (all its processes) is using
+Uses psutil when installed, otherwise reads /proc on Linux
+"""
+
+import os
+
+
+def _children_map_from_proc():
+    """parent pid -> list of child pids, read from /proc"""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # Process name can contain spaces, so split after the closing bracket
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(name))
+        except (OSError, IndexError, ValueError):
+            continue  # Process exited while we were looking
+    return children
+
+
+def _rss_from_proc(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree_rss(root_pid):
+    """Total resident memory in bytes of a process and everything it started"""
+    try:
+        import psutil
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    except ImportError:
+        pass
+
+    if not os.path.isdir("/proc"):
+        return 0
+    children = _children_map_from_proc()
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += _rss_from_proc(pid)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def browser_rss_mb(driver):
+    """Memory of the chromedriver process tree (chromedriver, Chrome and its renderers) in MB
+    Returns None if the driver wasnt started locally"""
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None:
+        return None
+    return round(process_tree_rss(process.pid) / (1024 * 1024), 1)
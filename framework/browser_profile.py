@@ -0,0 +1,153 @@
+"""
+Pre-seeded browser profile - cookie consent and the version popup are already dealt with
+A template is built once (python -m tools.profile_template build): a Chrome user-data directory
+that visited VarSome and dismissed every popup, plus seed.json with the cookies and localStorage
+that remember it. Every browser then starts from its own copy of the template
+"""
+
+import atexit
+import json
+import os
+import shutil
+import tempfile
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from locators import TestData, RunSettings
+
+SEED_FILE = "seed.json"
+USER_DATA_DIR = "user-data"
+
+# Chrome refuses to start on a profile that still has these from another browser
+LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "LOCK")
+
+# Sets the seeded localStorage before any VarSome script runs, on every page load
+SEED_STORAGE_JS = """
+(function() {
+    if (location.origin !== %s) return;
+    var items = %s;
+    try {
+        for (var key in items) {
+            if (localStorage.getItem(key) === null) localStorage.setItem(key, items[key]);
+        }
+    } catch (e) {}
+})();
+"""
+
+_clones = []
+
+
+def profile_template():
+    """Template folder from VARSOME_PROFILE_TEMPLATE or RunSettings - empty means dont use one"""
+    return os.environ.get("VARSOME_PROFILE_TEMPLATE", RunSettings.PROFILE_TEMPLATE)
+
+
+def load_seed(template):
+    """Cookies and localStorage saved with the template, or None"""
+    try:
+        with open(os.path.join(template, SEED_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def clone_profile(template):
+    """Copy the template's user-data directory for one browser
+    Returns the copy's path, or None if the template has no user-data directory"""
+    source = os.path.join(template, USER_DATA_DIR)
+    if not os.path.isdir(source):
+        return None
+    clone = os.path.join(tempfile.mkdtemp(prefix="varsome-profile-"), USER_DATA_DIR)
+    shutil.copytree(source, clone, symlinks=True, ignore=shutil.ignore_patterns(*LOCK_FILES))
+    _clones.append(clone)
+    return clone
+
+
+def remove_clone(path):
+    """Delete a copy made by clone_profile - call after the browser using it has quit"""
+    if path in _clones:
+        _clones.remove(path)
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+@atexit.register
+def _remove_all_clones():
+    for path in list(_clones):
+        remove_clone(path)
+
+
+def apply_seed(driver, seed):
+    """Put the template's cookies and localStorage into a running browser
+    Cookies go in through DevTools so no page has to be open. localStorage is set by a script
+    that runs before VarSome's own scripts on every load, so OneTrust sees the consent at once"""
+    if not seed:
+        return False
+    try:
+        install_storage_seed(driver, seed)
+        set_seed_cookies(driver, seed)
+        return True
+    except WebDriverException as e:
+        print(f"Could not apply profile seed: {e}")
+        return False
+
+
+def install_storage_seed(driver, seed):
+    origin = seed.get("origin") or _origin(TestData.BASE_URL)
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        "source": SEED_STORAGE_JS % (json.dumps(origin), json.dumps(seed.get("local_storage", {})))
+    })
+
+
+def set_seed_cookies(driver, seed):
+    """Cookies are cleared between journeys (driver_pool.reset_driver_state) so this runs again there"""
+    for cookie in seed.get("cookies", []):
+        params = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+                  if key in cookie}
+        if "expiry" in cookie:
+            params["expires"] = cookie["expiry"]
+        driver.execute_cdp_cmd("Network.setCookie", params)
+
+
+def build_profile_template(template=None, profile=None):
+    """Visit VarSome in a browser with its own user-data directory, dismiss every popup and save
+    the result as a template. Returns the template path"""
+    # Imported here - pages import the framework, not the other way round
+    from framework.driver_factory import create_driver
+    from pages.home_page import HomePage
+
+    template = template or profile_template() or RunSettings.DEFAULT_PROFILE_TEMPLATE
+    user_data = os.path.join(template, USER_DATA_DIR)
+    shutil.rmtree(template, ignore_errors=True)
+    os.makedirs(user_data)
+
+    driver = create_driver(profile=profile, profile_dir=user_data, use_template=False)
+    try:
+        home_page = HomePage(driver)
+        home_page.navigate_to_homepage()
+        home_page.wait_for_dom_quiet(quiet_ms=1000)  # Version popup shows up a bit after load
+        dismissed = home_page.dismiss_overlays() + [e["name"] for e in home_page.overlay_watcher_log()]
+        seed = {
+            "origin": _origin(TestData.BASE_URL),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < localStorage.length; i++) {"
+                "    var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                "}"
+                "return items;"),
+            "dismissed": sorted(set(dismissed)),
+        }
+    finally:
+        driver.quit()  # Chrome writes cookies and cache to user-data on quit
+
+    with open(os.path.join(template, SEED_FILE), "w") as f:
+        json.dump(seed, f, indent=2)
+    print(f"Profile template saved in: {template} "
+          f"({len(seed['cookies'])} cookies, {len(seed['local_storage'])} localStorage items)")
+    return template
+
+
+def _origin(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
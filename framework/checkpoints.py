@@ -0,0 +1,103 @@
+"""
+Journey checkpoints - browser state saved at safe points of the journey so a retry can continue
+from the last one instead of starting again at the homepage
+A checkpoint is the URL plus cookies, localStorage and sessionStorage at that moment
+"""
+
+import json
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.timeout_policy import mark_navigation
+
+STORAGE_SNAPSHOT_JS = """
+var dump = function(storage) {
+    var items = {};
+    try {
+        for (var i = 0; i < storage.length; i++) { var key = storage.key(i); items[key] = storage.getItem(key); }
+    } catch (e) {}
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Runs before any page script on the restored page so the site sees its old storage straight away
+RESTORE_STORAGE_JS = """
+(function() {
+    if (location.origin !== %s) return;
+    var local = %s, session = %s;
+    try {
+        for (var key in local) { localStorage.setItem(key, local[key]); }
+        for (var key in session) { sessionStorage.setItem(key, session[key]); }
+    } catch (e) {}
+})();
+"""
+
+
+def take_checkpoint(driver, name, next_step, elapsed):
+    """Save the browser state after a step - next_step is where a resume from here continues
+    elapsed is how long the journey took to get here, which is what a resume saves
+    Returns the checkpoint dict, or None if the browser didnt answer"""
+    try:
+        storage = driver.execute_script(STORAGE_SNAPSHOT_JS) or {}
+        checkpoint = {
+            "name": name,
+            "next_step": next_step,
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "local_storage": storage.get("local", {}),
+            "session_storage": storage.get("session", {}),
+            "elapsed": round(elapsed, 2),
+        }
+    except WebDriverException as e:
+        print(f"Could not save checkpoint {name}: {e.msg}")
+        return None
+    return checkpoint
+
+
+def restore_checkpoint(driver, checkpoint):
+    """Put cookies and storage back and open the checkpoint URL
+    Uses DevTools so everything is in place before the page loads; other browsers get the page
+    loaded twice (once to be on the right domain, once with the state). Returns True if it worked"""
+    parsed = urlparse(checkpoint["url"])
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    print(f"Restoring checkpoint '{checkpoint['name']}': {checkpoint['url']}")
+    try:
+        driver.delete_all_cookies()
+        try:
+            _restore_with_devtools(driver, checkpoint, origin)
+        except (WebDriverException, AttributeError):
+            _restore_with_page_load(driver, checkpoint, origin)
+    except WebDriverException as e:
+        print(f"Could not restore checkpoint {checkpoint['name']}: {e.msg}")
+        return False
+    return True
+
+
+def _restore_with_devtools(driver, checkpoint, origin):
+    from framework.browser_profile import set_seed_cookies
+
+    set_seed_cookies(driver, checkpoint)  # Same cookie list format as a profile seed
+    script = RESTORE_STORAGE_JS % (json.dumps(origin), json.dumps(checkpoint["local_storage"]),
+                                   json.dumps(checkpoint["session_storage"]))
+    identifier = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})["identifier"]
+    try:
+        driver.get(checkpoint["url"])
+        mark_navigation(driver)
+    finally:
+        # Only for this load - the next journey in this browser should start clean
+        driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+
+
+def _restore_with_page_load(driver, checkpoint, origin):
+    driver.get(checkpoint["url"])
+    for cookie in checkpoint["cookies"]:
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException:
+            pass  # Cookie of another domain - cant be set from this page
+    driver.execute_script(RESTORE_STORAGE_JS % (json.dumps(origin), json.dumps(checkpoint["local_storage"]),
+                                                json.dumps(checkpoint["session_storage"])))
+    driver.get(checkpoint["url"])
+    mark_navigation(driver)
@@ -0,0 +1,102 @@
+"""
+Chromedriver / Chrome location cache - resolved once, then reused without Selenium Manager
+Selenium Manager runs a subprocess (and may go online to check versions) on every browser start.
+The paths it finds are pinned in .driver_cache.json and only looked up again when a file is
+gone or Chrome was updated. Works offline once the cache exists
+"""
+
+import json
+import os
+import shutil
+import time
+
+from locators import RunSettings
+
+# How the last lookup was answered - run_test.py reports it with the cold start time
+last_resolution = {"source": None, "seconds": 0.0}
+
+
+def pinned_paths():
+    """Paths set by hand - VARSOME_CHROMEDRIVER / VARSOME_CHROME_BINARY or RunSettings"""
+    driver_path = os.environ.get("VARSOME_CHROMEDRIVER", RunSettings.CHROMEDRIVER_PATH)
+    browser_path = os.environ.get("VARSOME_CHROME_BINARY", RunSettings.CHROME_BINARY)
+    return driver_path or None, browser_path or None
+
+
+def _fingerprint(path):
+    """Size and modification time - changes when Chrome updates itself"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def load_cache(path=None):
+    try:
+        with open(path or RunSettings.DRIVER_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_is_current(cache):
+    if not cache or not os.path.isfile(cache.get("driver_path") or ""):
+        return False
+    browser_path = cache.get("browser_path")
+    return not browser_path or _fingerprint(browser_path) == cache.get("browser_fingerprint")
+
+
+def save_cache(driver_path, browser_path, path=None):
+    cache = {
+        "driver_path": driver_path,
+        "browser_path": browser_path,
+        "browser_fingerprint": _fingerprint(browser_path),
+        "resolved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    try:
+        with open(path or RunSettings.DRIVER_CACHE_FILE, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"Could not save driver cache: {e}")
+
+
+def _ask_selenium_manager():
+    """What webdriver.Chrome() would do on its own - returns (driver_path, browser_path)"""
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+    options = Options()
+    driver_path = SeleniumManager().driver_location(options)
+    return driver_path, options.binary_location or None
+
+
+def resolve_driver_paths(refresh=False):
+    """Chromedriver and Chrome paths to start the browser with - (driver_path, browser_path)
+    Either can be None, then Selenium looks it up itself as before"""
+    started = time.perf_counter()
+    source = None
+    driver_path, browser_path = pinned_paths()
+    if driver_path:
+        source = "pinned"
+    else:
+        cache = load_cache()
+        if cache and not refresh and _cache_is_current(cache):
+            driver_path, browser_path, source = cache["driver_path"], cache.get("browser_path"), "cache"
+        else:
+            try:
+                driver_path, browser_path = _ask_selenium_manager()
+                source = "selenium-manager"
+                save_cache(driver_path, browser_path)
+            except Exception as e:
+                # Offline or Selenium Manager missing - an old cache is still better than nothing
+                if cache and os.path.isfile(cache.get("driver_path") or ""):
+                    driver_path, browser_path, source = cache["driver_path"], cache.get("browser_path"), "stale-cache"
+                else:
+                    driver_path, browser_path = shutil.which("chromedriver"), None
+                    source = "path" if driver_path else None
+                print(f"Selenium Manager not available ({str(e).splitlines()[0] if str(e) else e!r}), "
+                      f"using {source or 'Selenium default'}")
+
+    last_resolution.update(source=source, seconds=round(time.perf_counter() - started, 3))
+    return driver_path, browser_path
@@ -0,0 +1,109 @@
+"""
+Driver factory - builds Chrome the same way for the test and the matrix runner
+selenium.webdriver is imported inside the functions - it loads every browser's module and
+run_test.py imports this file before it needs a browser
+"""
+
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.driver_cache import resolve_driver_paths
+from framework.browser_profile import profile_template, clone_profile, remove_clone, load_seed, apply_seed
+from locators import RunSettings
+
+
+def build_chrome_options(profile=None, profile_dir=None, background_tabs=False):
+    """Build Chrome options used by every run
+    profile "default" is the normal maximized browser, "lean" is headless with a fixed viewport
+    profile_dir is a Chrome user-data directory to start from (see framework.browser_profile)
+    background_tabs is for multi-tab runs: Chrome doesnt slow down tabs that are not in front and
+    page loads dont block the session (see framework.tab_manager)"""
+    from selenium.webdriver.chrome.options import Options
+
+    profile = profile or current_profile()
+    chrome_options = Options()
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    if profile == "lean":
+        chrome_options.add_argument("--headless=new")
+        width, height = RunSettings.LEAN_WINDOW_SIZE
+        chrome_options.add_argument(f"--window-size={width},{height}")  # Same layout on every machine
+    else:
+        chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Hide that its automated
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-popup-blocking")
+    chrome_options.add_argument("--log-level=3")  # Reduce console noise
+    if background_tabs:
+        # Timers and rendering in hidden tabs are throttled by default - our waits depend on both
+        for flag in RunSettings.BACKGROUND_TAB_FLAGS:
+            chrome_options.add_argument(flag)
+        # A page load would block the whole session - the tab manager waits for each tab's load itself
+        chrome_options.page_load_strategy = "none"
+    # Page console messages for failure artifacts (framework.failure_capture)
+    logging_prefs = {"browser": "ALL"}
+    if RunSettings.CAPTURE_NETWORK:
+        # Network events for framework.network_monitor - page events are not needed
+        logging_prefs["performance"] = "ALL"
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    chrome_options.set_capability("goog:loggingPrefs", logging_prefs)
+    return chrome_options
+
+
+def current_profile():
+    """Profile from VARSOME_PROFILE environment variable, or the default in RunSettings"""
+    return os.environ.get("VARSOME_PROFILE", RunSettings.BROWSER_PROFILE)
+
+
+def block_urls(driver, patterns=None):
+    """Stop Chrome from downloading URLs matching the patterns (images, fonts, analytics...)
+    Uses DevTools so the page itself doesnt know anything was blocked"""
+    patterns = RunSettings.LEAN_BLOCKED_URL_PATTERNS if patterns is None else patterns
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        driver._blocked_urls = list(patterns)  # New tabs need the same (framework.tab_manager)
+        return True
+    except WebDriverException as e:
+        print(f"Could not block URLs: {e}")
+        return False
+
+
+def create_driver(profile=None, block_requests=True, profile_dir=None, use_template=True, background_tabs=False):
+    """Start a new Chrome browser
+    Chromedriver and Chrome come from the driver cache (framework.driver_cache), so Selenium
+    Manager only runs the first time or after Chrome updates.
+    With the lean profile heavy third-party requests are blocked unless block_requests is False.
+    If a profile template is configured the browser starts from its own copy of it, with
+    cookie consent and the update popup already dismissed"""
+    profile = profile or current_profile()
+    template = profile_template() if use_template and not profile_dir else ""
+    seed = None
+    if template:
+        profile_dir = clone_profile(template)
+        seed = load_seed(template)
+        if profile_dir is None and seed is None:
+            print(f"Profile template {template} not found - starting a fresh browser")
+
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+    options = build_chrome_options(profile, profile_dir, background_tabs)
+    driver_path, browser_path = resolve_driver_paths()
+    if browser_path:
+        options.binary_location = browser_path
+    try:
+        driver = Chrome(options=options, service=Service(executable_path=driver_path))
+    except Exception:
+        if template and profile_dir:
+            remove_clone(profile_dir)
+        raise
+    if profile == "lean" and block_requests:
+        block_urls(driver)
+    if template:
+        driver._profile_clone = profile_dir  # Removed by the driver pool when the browser quits
+        driver._profile_seed = seed
+        apply_seed(driver, seed)
+    return driver
@@ -0,0 +1,244 @@
+"""
+Driver pool - keeps browsers warm between journeys instead of starting Chrome every time
+Browsers are reset (cookies, storage, extra tabs) before they are handed out again
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+
+from framework.browser_profile import set_seed_cookies, remove_clone
+from framework.driver_factory import create_driver
+from framework.memory_watchdog import MemoryWatchdog
+from framework.network_monitor import NetworkMonitor
+from locators import TestData, RunSettings
+
+
+def reset_driver_state(driver):
+    """Clear everything one journey could leak into the next
+    Closes extra tabs, deletes cookies and site storage and leaves the browser on about:blank"""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    # Storage of the page we are on, then everything Chrome keeps for the site
+    driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+    driver.delete_all_cookies()
+    clear_site_data(driver)
+    driver.get("about:blank")
+    seed = getattr(driver, "_profile_seed", None)
+    if seed:
+        # Browser started from a profile template - put its consent cookies back
+        set_seed_cookies(driver, seed)
+    if RunSettings.CAPTURE_NETWORK:
+        # Drop network events of the last journey so they dont pile up in chromedriver
+        NetworkMonitor.for_driver(driver).reset()
+
+
+def clear_site_data(driver):
+    """All cookies and everything Chrome keeps for the site (localStorage, IndexedDB, caches...)
+    Browser wide - every tab of the browser loses it"""
+    parsed = urlparse(TestData.BASE_URL)
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                               {"origin": f"{parsed.scheme}://{parsed.netloc}", "storageTypes": "all"})
+    except (WebDriverException, AttributeError):
+        pass  # Not Chrome - cookies and current page storage are already cleared
+
+
+def abandon_driver(driver):
+    """A command sent to this browser never came back - kill its chromedriver so the hung call
+    ends with an error, and mark it so the pool quits it instead of handing it out again.
+    For a tab (framework.tab_manager) the whole browser is abandoned"""
+    real = getattr(getattr(driver, "_tab_manager", None), "driver", driver)
+    real._abandoned = True
+    process = getattr(getattr(real, "service", None), "process", None)
+    if process is not None:
+        # Not service.stop() - its shutdown request would hang on the same chromedriver
+        process.kill()
+
+
+def is_abandoned(driver):
+    return getattr(driver, "_abandoned", False)
+
+
+class DriverPool:
+    """Pool of warm Chrome browsers
+    checkout() gives a browser (starting one only if none is idle), checkin() resets it for the
+    next journey. After max_uses journeys, or once it uses more than memory_limit_mb, a browser
+    is quit and replaced on next checkout"""
+
+    def __init__(self, size=1, max_uses=None, factory=None, memory_limit_mb=None):
+        self.size = size
+        self.max_uses = max_uses or RunSettings.DRIVER_MAX_USES
+        self.factory = factory or create_driver
+        self.watchdog = MemoryWatchdog(limit_mb=memory_limit_mb)
+        self._idle = []
+        self._uses = {}  # id(driver) -> journeys done with it
+        self._all = []
+        self._lock = threading.Condition()
+
+        # Stats for the run report
+        self.checkouts = 0
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.retired_for_memory = 0
+        self.wait_times = []
+        self.start_times = []  # Seconds each Chrome start took
+
+    def checkout(self):
+        """Get a browser - reuses an idle one if possible, waits if the pool is full and busy"""
+        started = time.time()
+        with self._lock:
+            while not self._idle and len(self._all) >= self.size:
+                self._lock.wait()
+            if self._idle:
+                driver = self._idle.pop()
+                self.hits += 1
+            else:
+                driver = None
+                self._all.append(None)  # Reserve the slot while Chrome starts
+                self.misses += 1
+            self.checkouts += 1
+
+        if driver is None:
+            driver = self._start_reserved()
+
+        self.wait_times.append(time.time() - started)
+        return driver
+
+    def warm(self):
+        """Start a browser now and keep it idle, so the first checkout doesnt wait for Chrome
+        Meant to run in a background thread while tests are imported. Does nothing if the pool is full"""
+        with self._lock:
+            if len(self._all) >= self.size:
+                return None
+            self._all.append(None)
+        driver = self._start_reserved()
+        with self._lock:
+            self._idle.append(driver)
+            self._lock.notify()
+        return driver
+
+    def _start_reserved(self):
+        """Start Chrome for a slot reserved with None in self._all"""
+        started = time.time()
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._lock:
+                self._all.remove(None)
+                self._lock.notify()
+            raise
+        self.start_times.append(time.time() - started)
+        self.watchdog.watch(driver)
+        with self._lock:
+            self._all[self._all.index(None)] = driver
+            self._uses[id(driver)] = 0
+        return driver
+
+    def checkin(self, driver, healthy=True):
+        """Give a browser back - it is reset, or quit if its used up or broken"""
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        retire = not healthy or is_abandoned(driver) or self._uses[id(driver)] >= self.max_uses
+        if not retire and self.watchdog.over_limit(driver):
+            # Between journeys is the only safe time - nothing is running in this browser now
+            print(f"Browser uses more than {self.watchdog.limit_mb} MB, replacing it")
+            self.retired_for_memory += 1
+            retire = True
+
+        if not retire:
+            try:
+                reset_driver_state(driver)
+            except WebDriverException as e:
+                print(f"Could not reset browser, replacing it: {e}")
+                retire = True
+
+        if retire:
+            self._quit(driver)
+            self.recycled += 1
+            with self._lock:
+                self._all.remove(driver)
+                self._uses.pop(id(driver), None)
+                self._lock.notify()
+            return
+
+        with self._lock:
+            self._idle.append(driver)
+            self._lock.notify()
+
+    @contextmanager
+    def driver(self):
+        """with pool.driver() as driver: ... - checks the browser back in even if the journey fails"""
+        driver = self.checkout()
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.checkin(driver, healthy=healthy)
+
+    def stats(self):
+        """Checkout wait times and how often a warm browser was reused"""
+        return {
+            "checkouts": self.checkouts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / self.checkouts, 3) if self.checkouts else 0,
+            "recycled": self.recycled,
+            "wait_total": round(sum(self.wait_times), 2),
+            "wait_avg": round(sum(self.wait_times) / len(self.wait_times), 3) if self.wait_times else 0,
+            "wait_max": round(max(self.wait_times), 3) if self.wait_times else 0,
+            "start_avg": round(sum(self.start_times) / len(self.start_times), 3) if self.start_times else 0,
+            "retired_for_memory": self.retired_for_memory,
+            "memory": self.watchdog.stats(),
+        }
+
+    def close(self):
+        """Quit every browser in the pool"""
+        with self._lock:
+            drivers = [d for d in self._all if d is not None]
+            self._all = []
+            self._idle = []
+        for driver in drivers:
+            self._quit(driver)
+        self.watchdog.stop()
+
+    def _quit(self, driver):
+        self.watchdog.unwatch(driver)
+        self._quit_driver(driver)
+
+    @staticmethod
+    def _quit_driver(driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass  # Browser already gone
+        clone = getattr(driver, "_profile_clone", None)
+        if clone:
+            remove_clone(clone)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool():
+    """One pool per process - test classes share warm browsers through it
+    Locked because run_test.py warms it from a thread while the test may ask for it too"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
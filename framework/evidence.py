@@ -0,0 +1,208 @@
+"""
+Evidence writer - screenshots are taken in memory and written to disk by a background thread
+Supports element-only crops, smaller formats (needs Pillow), duplicate detection by content
+hash and a retention policy so the evidence folder doesnt grow forever
+"""
+
+import atexit
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+
+from framework.state_file import load_json, update_json, write_atomic
+from locators import RunSettings
+
+INDEX_FILE = "index.json"
+
+
+class EvidenceWriter:
+    """Background writer for screenshots
+    capture() only grabs the PNG bytes from the browser and returns the final path right away -
+    encoding, writing and cleaning up old files happen on the writer thread"""
+
+    def __init__(self, output_dir=None, image_format=None, quality=None, max_width=None,
+                 max_files=None, max_age_days=None, max_total_mb=None):
+        self.output_dir = output_dir or RunSettings.EVIDENCE_DIR
+        self.image_format = (image_format or RunSettings.EVIDENCE_FORMAT).lower()
+        self.quality = quality or RunSettings.EVIDENCE_QUALITY
+        self.max_width = max_width if max_width is not None else RunSettings.EVIDENCE_MAX_WIDTH
+        self.max_files = max_files if max_files is not None else RunSettings.EVIDENCE_MAX_FILES
+        self.max_age_days = max_age_days if max_age_days is not None else RunSettings.EVIDENCE_MAX_AGE_DAYS
+        self.max_total_mb = max_total_mb if max_total_mb is not None else RunSettings.EVIDENCE_MAX_TOTAL_MB
+
+        if self.image_format != "png" and not _pillow_available():
+            print(f"Pillow not installed - saving evidence as png instead of {self.image_format}")
+            self.image_format = "png"
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = self._load_index()  # content hash -> file name
+        self._new_index = {}
+        self._pending = set()  # Queued but not on disk yet
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+        self.written = 0
+        self.duplicates = 0
+        self.removed = 0
+
+    def capture(self, driver, name, element=None):
+        """Take a screenshot (of the whole window or just element) and queue it for writing
+        Returns the path the file will have - for duplicates its the already existing file"""
+        png = element.screenshot_as_png if element is not None else driver.get_screenshot_as_png()
+        return self.submit(png, name)
+
+    def submit(self, png_bytes, name):
+        """Queue PNG bytes for writing, returns the final path"""
+        digest = hashlib.sha256(png_bytes).hexdigest()
+        with self._lock:
+            existing = self._index.get(digest)
+            if existing and (existing in self._pending or
+                             os.path.exists(os.path.join(self.output_dir, existing))):
+                self.duplicates += 1
+                return os.path.join(self.output_dir, existing)
+            # Hash prefix in the name - two workers can pick the same name (same second) for different images
+            base = os.path.splitext(os.path.basename(name))[0]
+            file_name = f"{base}_{digest[:12]}.{self.image_format}"
+            self._index[digest] = file_name
+            self._new_index[digest] = file_name
+            self._pending.add(file_name)
+
+        self._queue.put((png_bytes, file_name))
+        return os.path.join(self.output_dir, file_name)
+
+    def flush(self):
+        """Wait until everything queued so far is on disk"""
+        self._queue.join()
+
+    def close(self):
+        """Finish writing, apply retention and save the hash index"""
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self.apply_retention()
+        self._save_index()
+
+    def stats(self):
+        return {"written": self.written, "duplicates": self.duplicates, "removed": self.removed}
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                png_bytes, file_name = job
+                self._write(self._encode(png_bytes), file_name)
+                with self._lock:
+                    self._pending.discard(file_name)
+                self.written += 1
+                if self.written % 20 == 0:
+                    self.apply_retention()
+            except Exception as e:
+                print(f"Could not write evidence: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _encode(self, png_bytes):
+        """Convert to the configured format and size - plain PNG needs no work at all"""
+        if self.image_format == "png" and not self.max_width:
+            return png_bytes
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(png_bytes))
+        if self.max_width and image.width > self.max_width:
+            height = int(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height))
+        out = io.BytesIO()
+        if self.image_format in ("jpeg", "jpg"):
+            image.convert("RGB").save(out, "JPEG", quality=self.quality, optimize=True)
+        elif self.image_format == "webp":
+            image.save(out, "WEBP", quality=self.quality)
+        else:
+            image.save(out, "PNG", optimize=True)
+        return out.getvalue()
+
+    def _write(self, data, file_name):
+        write_atomic(os.path.join(self.output_dir, file_name), data)
+
+    def apply_retention(self):
+        """Delete evidence that is too old, then the oldest files over the count/size limits"""
+        files = []
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            if name == INDEX_FILE or name.endswith((".tmp", ".lock")) or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()  # Oldest first
+
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        keep = []
+        for mtime, size, path in files:
+            too_old = self.max_age_days and now - mtime > self.max_age_days * 86400
+            if too_old:
+                self._remove(path)
+                total -= size
+            else:
+                keep.append((mtime, size, path))
+
+        while keep and ((self.max_files and len(keep) > self.max_files) or
+                        (self.max_total_mb and total > self.max_total_mb * 1024 * 1024)):
+            _, size, path = keep.pop(0)
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            self.removed += 1
+        except OSError:
+            pass
+
+    def _load_index(self):
+        return self._existing(load_json(os.path.join(self.output_dir, INDEX_FILE)))
+
+    def _existing(self, index):
+        # Files removed by retention cant be reused as duplicates
+        return {digest: name for digest, name in index.items()
+                if os.path.exists(os.path.join(self.output_dir, name))}
+
+    def _save_index(self):
+        """Merge our new hashes with whatever other processes saved meanwhile"""
+        update_json(os.path.join(self.output_dir, INDEX_FILE),
+                    lambda on_disk: self._existing({**on_disk, **self._new_index}), "evidence index")
+
+
+def _pillow_available():
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+_writer = None
+
+
+def get_evidence_writer():
+    """Shared writer for this process - flushed and closed automatically at exit"""
+    global _writer
+    if _writer is None:
+        _writer = EvidenceWriter()
+        atexit.register(_writer.close)
+    return _writer
+
+
+def close_evidence_writer():
+    """Close the shared writer now instead of at exit, if there is one"""
+    global _writer
+    if _writer is not None:
+        atexit.unregister(_writer.close)
+        _writer.close()
+        _writer = None
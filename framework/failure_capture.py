@@ -0,0 +1,187 @@
+"""
+Failure capture - saves what is needed to understand a failed journey
+DOM snapshot, browser console, network log (HAR-like JSON) and the current URL are collected
+in parallel, each capped in size, and the whole capture is capped in time so a hung page
+cant stall the run. Files go to artifacts/<run_id>/<variant>/
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from locators import RunSettings
+
+# One run id per process unless the runner passes its own
+_process_run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def current_run_id():
+    """Run id from VARSOME_RUN_ID, or the time this process started"""
+    return os.environ.get("VARSOME_RUN_ID", _process_run_id)
+
+
+def artifact_dir(run_id, variant, genome=None):
+    """artifacts/<run_id>/<variant>_<genome> - a second failure of the same variant gets _2, _3..."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{variant}_{genome}" if genome else variant).strip("_")
+    base = os.path.join(RunSettings.ARTIFACTS_DIR, run_id, slug)
+    path, attempt = base, 1
+    while os.path.exists(path):
+        attempt += 1
+        path = f"{base}_{attempt}"
+    os.makedirs(path)
+    return path
+
+
+def _truncate(text, max_bytes):
+    """Cut text to max_bytes (utf-8), returns (text, truncated)"""
+    data = text.encode("utf-8", errors="replace")
+    if len(data) <= max_bytes:
+        return text, False
+    return data[:max_bytes].decode("utf-8", errors="ignore") + "\n<!-- truncated -->", True
+
+
+def _collect_dom(driver):
+    text, truncated = _truncate(driver.page_source or "", RunSettings.FAILURE_MAX_DOM_KB * 1024)
+    return "dom.html", text, {"truncated": truncated}
+
+
+def _collect_console(driver):
+    entries = driver.get_log("browser")
+    limit = RunSettings.FAILURE_MAX_LOG_ENTRIES
+    kept = entries[-limit:]  # Last entries are the ones closest to the failure
+    return "console.json", json.dumps(kept, indent=2), {"entries": len(kept), "dropped": len(entries) - len(kept)}
+
+
+def _collect_network(driver, network):
+    driver.check()  # The monitor polls through its own driver reference
+    network.poll()
+    entries = har_entries(network)
+    limit = RunSettings.FAILURE_MAX_LOG_ENTRIES
+    kept = entries[-limit:]
+    har = {"log": {"version": "1.2", "creator": {"name": "varsome-test-automation", "version": "1.0"},
+                   "entries": kept}}
+    return "network.har.json", json.dumps(har, indent=2), {"entries": len(kept), "dropped": len(entries) - len(kept)}
+
+
+def _collect_location(driver):
+    location = {"url": driver.current_url, "title": driver.title}
+    return "location.json", json.dumps(location, indent=2), location
+
+
+class _StoppableDriver:
+    """What a collector gets instead of the driver - every command checks the stop event first,
+    so a collector that ran past the deadline sends nothing more to a browser being reused"""
+
+    def __init__(self, driver, stop):
+        self._driver = driver
+        self._stop = stop
+
+    def check(self):
+        if self._stop.is_set():
+            raise RuntimeError("capture stopped")
+
+    def __getattr__(self, name):
+        self.check()
+        return getattr(self._driver, name)
+
+
+def har_entries(network):
+    """HAR-like entries from a NetworkMonitor - request, response status/type, size and timing
+    Chrome timestamps are monotonic so the wall clock start comes from requestWillBeSent"""
+    wall_times = {e["params"].get("requestId"): e["params"].get("wallTime")
+                  for e in network.events if e["method"] == "Network.requestWillBeSent"}
+    entries = []
+    for info in network.requests.values():
+        wall_time = wall_times.get(info["request_id"])
+        started = (datetime.fromtimestamp(wall_time, timezone.utc).isoformat()
+                   if wall_time else None)
+        duration = ((info["finished"] - info["started"]) * 1000
+                    if info["finished"] and info["started"] else -1)
+        entries.append({
+            "startedDateTime": started,
+            "time": round(duration, 1),
+            "request": {"method": info["method"], "url": info["url"]},
+            "response": {"status": info["status"] or 0, "content": {"mimeType": info["mime_type"] or "",
+                                                                     "size": info["size"]}},
+            "_resourceType": info["type"],
+            "_failed": info["failed"],
+            "_finished": bool(info["finished"]),
+        })
+    return entries
+
+
+def capture_failure(driver, variant, genome=None, run_id=None, reason=None, network=None, timeout=None):
+    """Collect DOM, console, network log and URL in parallel and write them to the artifact dir
+    Waits at most timeout seconds - anything slower is left out and listed in manifest.json.
+    A late collector sends no further command and gets FAILURE_CAPTURE_GRACE seconds to finish -
+    if it doesnt, the browser is abandoned (framework.driver_pool.abandon_driver) and not reused.
+    Returns the artifact directory, or None if nothing could be written"""
+    timeout = timeout or RunSettings.FAILURE_CAPTURE_TIMEOUT
+    try:
+        path = artifact_dir(run_id or current_run_id(), variant, genome)
+    except OSError as e:
+        print(f"Could not create artifact folder: {e}")
+        return None
+
+    stop = threading.Event()
+    target = _StoppableDriver(driver, stop)
+    collectors = {"dom": (_collect_dom, target), "console": (_collect_console, target),
+                  "location": (_collect_location, target)}
+    if network is not None:
+        collectors["network"] = (lambda d: _collect_network(d, network), target)
+
+    manifest = {"variant": variant, "genome": genome, "reason": reason,
+                "captured_at": datetime.now().isoformat(timespec="seconds"), "artifacts": {}}
+    lock = threading.Lock()
+
+    def run(name, collect, target):
+        started = time.perf_counter()
+        try:
+            file_name, text, details = collect(target)
+            with lock:
+                if stop.is_set():
+                    return  # Too late, the manifest is written - dont write stale state
+                with open(os.path.join(path, file_name), "w", encoding="utf-8") as f:
+                    f.write(text)
+                manifest["artifacts"][name] = dict(details, file=file_name,
+                                                   seconds=round(time.perf_counter() - started, 3))
+        except Exception as e:
+            with lock:
+                if stop.is_set():
+                    return
+                manifest["artifacts"][name] = {"error": str(e).splitlines()[0] if str(e) else repr(e)}
+
+    # Threads instead of an executor - the manifest is written at the deadline even if a call hangs
+    threads = [threading.Thread(target=run, args=(name, collect, target), daemon=True)
+               for name, (collect, target) in collectors.items()]
+    deadline = time.time() + timeout
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0, deadline - time.time()))
+
+    with lock:
+        stop.set()
+        for name in collectors:
+            manifest["artifacts"].setdefault(name, {"error": f"timed out after {timeout}s"})
+        with open(os.path.join(path, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+    print(f"Failure artifacts saved in: {path}")
+
+    # The driver goes back to the pool after this - a late collector sends no new command now,
+    # but one may still be waiting on its last. Selenium has no client timeout, so a hung call
+    # would wait forever - after the grace period the browser is given up instead
+    late = [thread for thread in threads if thread.is_alive()]
+    if late:
+        print(f"Waiting for {len(late)} late failure collector(s) to finish their last command")
+        grace_end = time.time() + RunSettings.FAILURE_CAPTURE_GRACE
+        for thread in late:
+            thread.join(max(0, grace_end - time.time()))
+        if any(thread.is_alive() for thread in late):
+            from framework.driver_pool import abandon_driver
+            print("A failure collector is stuck in a browser command - dropping the browser")
+            abandon_driver(driver)
+    return path
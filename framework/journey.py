@@ -0,0 +1,241 @@
+"""
+Variant journey - the same steps as test_germline_variant.py but for any variant
+Returns a result dict instead of asserting so the matrix runner can collect results
+"""
+
+import time
+from pages.home_page import HomePage
+from pages.sample_info_modal import SampleInfoModal
+from pages.results_page import ResultsPage
+from framework.network_monitor import NetworkMonitor
+from framework.failure_capture import capture_failure
+from framework.checkpoints import take_checkpoint, restore_checkpoint
+from framework.sample_profiles import load_profile
+from framework.tracing import TRACER
+from locators import TestData, RunSettings
+
+
+_direct_mode_warned = False
+
+
+class VariantCase:
+    """One row of the variant matrix - what to search and what we expect to see
+    A "direct" case runs as "full" unless RunSettings.DIRECT_MODE is on"""
+
+    def __init__(self, variant, genome=None, expected_verdict=None, expected_color=None, mode=None, profile=None):
+        global _direct_mode_warned
+        self.variant = variant
+        self.genome = genome or TestData.GENOME
+        self.expected_verdict = expected_verdict or TestData.EXPECTED_VERDICT
+        self.expected_color = expected_color or ""  # Empty means dont check color
+        self.mode = (mode or RunSettings.JOURNEY_MODE).lower()  # "full" or "direct"
+        if self.mode == "direct" and not RunSettings.DIRECT_MODE:
+            if not _direct_mode_warned:
+                print("Direct mode is off until its URL parameters are confirmed (see tools/compare_modes.py) - "
+                      "running direct variants as full journeys")
+                _direct_mode_warned = True
+            self.mode = "full"
+        self.profile = profile or RunSettings.SAMPLE_PROFILE  # Sample information, see framework.sample_profiles
+
+    def __repr__(self):
+        return f"VariantCase({self.variant}, {self.genome}, {self.expected_verdict}, {self.mode})"
+
+
+class JourneyStepFailed(Exception):
+    """Raised inside the journey when one step doesnt work"""
+
+    def __init__(self, step, message):
+        super().__init__(message)
+        self.step = step
+
+
+def _check(condition, step, message):
+    """Small helper so the journey reads like the test with its assertTrue calls"""
+    if not condition:
+        raise JourneyStepFailed(step, message)
+
+
+def run_variant_journey(driver, case, run_id=None, retries=None):
+    """Run HomePage -> SampleInfoModal -> ResultsPage for one variant
+    In "direct" mode steps 1-3 are replaced by opening the results URL with the sample in it
+    Browser state is saved once the results page and its URL have loaded. When step 5 or 6 fails
+    the journey is retried (up to retries times, default RunSettings.JOURNEY_RETRIES) from there,
+    earlier steps are retried from the start
+    Never raises - everything ends up in the returned result dict
+    On failure DOM, console and network log are saved under artifacts/<run_id>/"""
+    home_page = HomePage(driver)
+    modal = SampleInfoModal(driver)
+    network = NetworkMonitor.for_driver(driver) if RunSettings.CAPTURE_NETWORK else None
+    results_page = ResultsPage(driver, network=network)
+    if network:
+        network.reset()  # Only this journey's requests
+    sample = load_profile(case.profile) or load_profile("default")
+
+    result = {
+        "variant": case.variant,
+        "genome": case.genome,
+        "mode": case.mode,
+        "profile": case.profile,
+        "expected_verdict": case.expected_verdict,
+        "expected_color": case.expected_color,
+        "verdict": None,
+        "color": None,
+        "passed": False,
+        "failed_step": None,
+        "error": None,
+        "step_times": {},
+        "time_to_results": None,
+        "retries": [],
+        "time_saved_by_resume": 0,
+        "security_check": False,  # Seen at any point - a sign the site is throttling us
+    }
+    started = time.time()
+    current_step = {}
+    checkpoints = {}  # step a resume continues with -> checkpoint
+
+    def begin_step(number, name):
+        """Close the previous step's timer and start the next one"""
+        end_step()
+        current_step.update(number=number, started=time.time())
+        TRACER.start_step(f"STEP {number} {name}", variant=case.variant)
+
+    def end_step():
+        if current_step:
+            result["step_times"][current_step["number"]] = round(time.time() - current_step["started"], 2)
+            current_step.clear()
+        TRACER.end_step()
+
+    def save_checkpoint(name, next_step):
+        checkpoint = take_checkpoint(driver, name, next_step, time.time() - started)
+        if checkpoint:
+            checkpoints[next_step] = checkpoint
+
+    def run_steps(first_step):
+        """Steps first_step..6 - raises JourneyStepFailed"""
+        if first_step <= 3:
+            if case.mode == "direct":
+                # STEP 1: Open the results page directly - no search, no modal
+                begin_step(1, "Open results page directly")
+                _check(results_page.open_direct(case.variant, case.genome, sample), 1,
+                       "Failed to open results page URL")
+                if modal.handle_security_validation():
+                    result["security_check"] = True
+            else:
+                # STEP 1: Launch VarSome Website
+                begin_step(1, "Launch VarSome Website")
+                _check(home_page.navigate_to_homepage(), 1, "Failed to load VarSome homepage")
+
+                # STEP 2: Search for the variant
+                begin_step(2, "Search for the variant")
+                _check(home_page.enter_variant(case.variant), 2, "Failed to enter variant in search box")
+                _check(home_page.select_genome(case.genome), 2, f"Could not select genome {case.genome}")
+                _check(home_page.click_search(), 2, "Failed to click search button")
+
+                # STEP 3: Optional Sample Information Modal
+                begin_step(3, "Optional Sample Information Modal")
+                if modal.check_if_modal_appears():
+                    _check(modal.select_germline_tab(), 3, "Failed to select Germline tab")
+                    if not modal.fill_profile(sample):
+                        print(f"Sample information not confirmed for {case.variant}: {modal.last_fill['values']}")
+                    _check(modal.click_search_in_modal(), 3, "Failed to submit modal")
+                    _check(modal.wait_for_modal_to_close(), 3, "Modal did not close properly")
+                if modal.handle_security_validation():
+                    result["security_check"] = True
+
+        if first_step <= 4:
+            # STEP 4: Results page
+            begin_step(4, "Results page")
+            _check(results_page.wait_for_results_page(case.variant, case.genome), 4, "Results page did not load")
+            result["api_responses"] = {
+                name: {"url": info["url"], "status": info["status"],
+                       "ms": round((info["finished"] - info["started"]) * 1000)}
+                for name, info in results_page.api_responses.items()
+            }
+            sections = results_page.verify_page_sections(print_results=False,
+                                                         required=["Germline Classification"])
+            _check(sections.get("Germline Classification", False), 4, "Germline Classification section missing")
+            if result["time_to_results"] is None:
+                result["time_to_results"] = round(time.time() - started, 2)  # What direct mode saves is before here
+            # Only a results URL brings the results back on reload - right after the search click
+            # or the modal the browser is still on the homepage or navigating, so no checkpoint there
+            if results_page.wait_for_url_contains("/variant/", timeout=TestData.TIMEOUT_SHORT):
+                save_checkpoint("results", 5)
+
+        # STEP 5: Expand Germline Classification
+        begin_step(5, "Expand Germline Classification")
+        if first_step == 5:
+            # Resumed on a reloaded results page - its data has to arrive again
+            _check(results_page.wait_for_results_page(case.variant, case.genome), 5, "Results page did not load")
+        _check(results_page.expand_germline_classification(), 5, "Could not expand Germline Classification")
+
+        # STEP 6: Verify verdict
+        begin_step(6, "Verify verdict")
+        snapshot = results_page.get_verdict_snapshot() or {}
+        verdict, color = snapshot.get("verdict_text"), snapshot.get("color")
+        result["verdict"] = verdict
+        result["color"] = color
+        result["criteria"] = snapshot.get("criteria", [])
+        _check(verdict, 6, "Could not find verdict text")
+        _check(verdict.strip().lower() == case.expected_verdict.lower(), 6,
+               f"Expected '{case.expected_verdict}' but got '{verdict}'")
+        if case.expected_color:
+            _check(color == case.expected_color, 6,
+                   f"Expected {case.expected_color} color but got '{color}'")
+
+    def resume_after(step):
+        """Restore the last checkpoint before the failed step. Returns the step to continue with"""
+        usable = [n for n in checkpoints if n <= step]
+        checkpoint = checkpoints[max(usable)] if usable else None
+        restore_started = time.time()
+        if network:
+            network.reset()  # The restored page makes its API calls again
+        if checkpoint and not restore_checkpoint(driver, checkpoint):
+            checkpoint = None
+        restore_seconds = time.time() - restore_started
+        result["retries"].append({
+            "failed_step": step,
+            "error": result["error"],
+            "resumed_from": checkpoint["name"] if checkpoint else None,
+            "restore_seconds": round(restore_seconds, 2),
+            # Getting to the checkpoint the first time minus putting it back
+            "saved_seconds": round(max(0, checkpoint["elapsed"] - restore_seconds), 2) if checkpoint else 0,
+        })
+        result["time_saved_by_resume"] = round(sum(r["saved_seconds"] for r in result["retries"]), 2)
+        print(f"Step {step} failed for {case.variant} - retrying from "
+              f"{'checkpoint ' + checkpoint['name'] if checkpoint else 'the start'}")
+        return checkpoint["next_step"] if checkpoint else 1
+
+    retries_left = RunSettings.JOURNEY_RETRIES if retries is None else retries
+    first_step = 1
+    try:
+        while True:
+            try:
+                run_steps(first_step)
+                result["passed"] = True
+                result["failed_step"] = None
+                result["error"] = None
+                break
+            except JourneyStepFailed as e:
+                end_step()
+                result["failed_step"] = e.step
+                result["error"] = str(e)
+                if retries_left <= 0:
+                    break
+                retries_left -= 1
+                first_step = resume_after(e.step)
+    except Exception as e:
+        # Browser crashed or something unexpected - still report it
+        result["error"] = f"Unexpected error: {e}"
+    finally:
+        end_step()
+
+    # The background watcher may have clicked through one after the last handle_security_validation
+    if any(entry["name"] == "security_check" for entry in modal.overlay_watcher_log(clear=False)):
+        result["security_check"] = True
+
+    if not result["passed"]:
+        result["artifacts"] = capture_failure(driver, case.variant, case.genome, run_id=run_id,
+                                              reason=result["error"], network=network)
+
+    result["duration"] = round(time.time() - started, 2)
+    return result
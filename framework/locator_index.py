@@ -0,0 +1,79 @@
+"""
+Locator index - resolves all locators of a page in one script call and keeps the matches in the page
+Later lookups are answered from the index, without another document-wide XPath scan. A
+MutationObserver counts DOM changes (the generation). When it moves on, the next lookup
+rebuilds the index first. Lookups never wait - use the BasePage waits for that
+"""
+
+from locators import CompositeLocator
+
+# Runs after BasePage's DOM_HELPERS_JS
+# args: [0] {name: [locator, ...]} (alternatives in order), [1] index key, [2] name, [3] state
+LOCATOR_INDEX_JS = """
+var locators = arguments[0], key = arguments[1], name = arguments[2], state = arguments[3];
+if (!window.__domObserver) {
+    window.__domGeneration = 0;
+    window.__domObserver = new MutationObserver(function() { window.__domGeneration++; });
+    window.__domObserver.observe(document.documentElement || document,
+                                 {childList: true, subtree: true, attributes: true, characterData: true});
+}
+var indexes = window.__locatorIndexes = window.__locatorIndexes || {};
+var index = indexes[key];
+var rebuilt = false;
+if (!index || index.generation !== window.__domGeneration) {
+    index = indexes[key] = {generation: window.__domGeneration, builds: (index ? index.builds : 0) + 1, matches: {}};
+    for (var n in locators) {
+        var found = [];
+        for (var i = 0; i < locators[n].length && !found.length; i++) { found = findAll(locators[n][i]); }
+        index.matches[n] = found;
+    }
+    rebuilt = true;
+}
+var element = null, all = index.matches[name] || [];
+for (var j = 0; j < all.length && !element; j++) {
+    var el = all[j];
+    if (state === 'present') { element = el; }
+    else if (isVisible(el) && !(state === 'clickable' && el.disabled)) { element = el; }
+}
+return {element: element, count: all.length, rebuilt: rebuilt, builds: index.builds};
+"""
+
+
+def _alternatives(locator):
+    if isinstance(locator, CompositeLocator):
+        return [list(alt) for alt in locator.alternatives]
+    return [list(locator)]
+
+
+class LocatorIndex:
+    """Index of one page object's locators (name -> locator or CompositeLocator)
+    The index lives in the browser page, so it is gone after navigation and rebuilt on first use"""
+
+    def __init__(self, driver, locators, key="page"):
+        self.driver = driver
+        self.key = key
+        self.locators = {name: _alternatives(locator) for name, locator in locators.items()}
+        # Imported here - pages import the framework, not the other way round
+        from pages.base_page import DOM_HELPERS_JS
+        self._script = DOM_HELPERS_JS + LOCATOR_INDEX_JS
+        self.lookups = 0
+        self.rebuilds = 0
+
+    def lookup(self, name, state="visible"):
+        """One script call - returns {"element", "count", "rebuilt", "builds"}
+        state is present, visible or clickable"""
+        if name not in self.locators:
+            raise KeyError(f"{name} is not in the {self.key} locator index")
+        found = self.driver.execute_script(self._script, self.locators, self.key, name, state)
+        self.lookups += 1
+        if found["rebuilt"]:
+            self.rebuilds += 1
+        return found
+
+    def find(self, name, state="visible"):
+        """First matching element in the given state, or None - no waiting"""
+        return self.lookup(name, state)["element"]
+
+    def stats(self):
+        return {"lookups": self.lookups, "rebuilds": self.rebuilds,
+                "served_from_index": self.lookups - self.rebuilds}
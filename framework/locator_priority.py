@@ -0,0 +1,88 @@
+"""
+Locator priority store - remembers which alternative of a CompositeLocator matched
+So if the primary locator stops working on the site we dont pay for it on every run
+The preference only moves to a fallback once it won most of the recent races - broad fallbacks
+like input[type='text'] can win once when the primary renders late, that shouldnt stick
+"""
+
+import atexit
+
+from framework.state_file import load_json, update_json
+from locators import RunSettings
+
+
+def _key(locator):
+    """Turn a (By, value) tuple into a string we can use as JSON key"""
+    return f"{locator[0]}={locator[1]}"
+
+
+class LocatorPriorityStore:
+    """Win counts and the preferred alternative for each composite locator, saved as JSON
+    Several worker processes share the file so we merge with whats on disk when saving"""
+
+    def __init__(self, path=None):
+        self.path = path or RunSettings.LOCATOR_PRIORITY_FILE
+        self.data = self._load()
+        self._new_wins = {}  # Wins since last save, merged into the file on save
+
+    def _load(self):
+        return load_json(self.path)
+
+    def ordered(self, composite):
+        """Alternatives in the order they should be tried - preferred one first (the primary until
+        a fallback took over), then the rest by wins"""
+        entry = self.data.get(composite.name, {})
+        preferred = entry.get("preferred") or _key(composite.alternatives[0])
+        wins = entry.get("wins", {})
+        position = {_key(alt): i for i, alt in enumerate(composite.alternatives)}
+        return sorted(composite.alternatives,
+                      key=lambda alt: (_key(alt) != preferred, -wins.get(_key(alt), 0), position[_key(alt)]))
+
+    def record_win(self, composite, alternative):
+        """Remember that this alternative matched
+        The preferred alternative changes once one holds a majority of the last LOCATOR_PRIORITY_WINDOW
+        wins (and at least LOCATOR_PRIORITY_MIN_WINS of them). The file is written then, other wins
+        are saved when the process exits"""
+        key = _key(alternative)
+        entry = self.data.setdefault(composite.name, {"preferred": None, "wins": {}})
+        entry["wins"][key] = entry["wins"].get(key, 0) + 1
+        entry["recent"] = (entry.get("recent", []) + [key])[-RunSettings.LOCATOR_PRIORITY_WINDOW:]
+        pending = self._new_wins.setdefault(composite.name, {})
+        pending[key] = pending.get(key, 0) + 1
+
+        current = entry["preferred"] or _key(composite.alternatives[0])
+        recent_wins = entry["recent"].count(key)
+        if key != current and recent_wins >= RunSettings.LOCATOR_PRIORITY_MIN_WINS \
+                and recent_wins * 2 > len(entry["recent"]):
+            entry["preferred"] = key
+            self.save()
+
+    def save(self):
+        """Merge our new wins into the file and write it atomically"""
+        if not self._new_wins:
+            return
+        def merge(on_disk):
+            for name, wins in self._new_wins.items():
+                disk_entry = on_disk.setdefault(name, {"preferred": None, "wins": {}})
+                for key, count in wins.items():
+                    disk_entry["wins"][key] = disk_entry["wins"].get(key, 0) + count
+                disk_entry["recent"] = self.data[name].get("recent", [])
+                disk_entry["preferred"] = self.data[name]["preferred"]
+            return on_disk
+
+        saved = update_json(self.path, merge, "locator priorities", indent=2)
+        if saved is not None:
+            self._new_wins = {}
+            self.data = saved
+
+
+_store = None
+
+
+def get_priority_store():
+    """Shared store for this process - loaded once on first use, wins are saved when the process exits"""
+    global _store
+    if _store is None:
+        _store = LocatorPriorityStore()
+        atexit.register(_store.save)
+    return _store
@@ -0,0 +1,80 @@
+"""
+Memory watchdog - follows how much RAM each pool browser uses over a long run
+The results page is heavy and Chrome's memory keeps growing from journey to journey, so the
+driver pool asks the watchdog between journeys whether a browser should be replaced
+"""
+
+import threading
+import time
+
+from framework.browser_memory import browser_rss_mb
+from locators import RunSettings
+
+
+class MemoryWatchdog:
+    """Samples each watched browser's process tree in a background thread
+    Every sample goes into a timeline for the run report: [time, browser number, MB]"""
+
+    def __init__(self, limit_mb=None, interval=None):
+        self.limit_mb = limit_mb if limit_mb is not None else RunSettings.BROWSER_MEMORY_LIMIT_MB
+        self.interval = interval if interval is not None else RunSettings.MEMORY_SAMPLE_INTERVAL
+        self.timeline = []
+        self.peak_mb = 0
+        self._browsers = {}  # id(driver) -> (browser number, driver)
+        self._next_number = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, driver):
+        """Start sampling a browser - the sampling thread starts with the first one"""
+        with self._lock:
+            self._browsers[id(driver)] = (self._next_number, driver)
+            self._next_number += 1
+            if self._thread is None and self.interval:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def unwatch(self, driver):
+        with self._lock:
+            self._browsers.pop(id(driver), None)
+
+    def sample(self, driver, event=None):
+        """Measure one browser now and add it to the timeline. Returns MB or None"""
+        with self._lock:
+            number = self._browsers.get(id(driver), (None,))[0]
+        rss_mb = browser_rss_mb(driver)
+        if rss_mb is None:
+            return None
+        entry = [round(time.time(), 1), number, rss_mb]
+        if event:
+            entry.append(event)
+        with self._lock:
+            self.timeline.append(entry)
+            self.peak_mb = max(self.peak_mb, rss_mb)
+        return rss_mb
+
+    def over_limit(self, driver):
+        """True when the browser uses more than limit_mb - checked at a safe point between journeys"""
+        if not self.limit_mb:
+            return False
+        rss_mb = self.sample(driver, event="checkin")
+        return rss_mb is not None and rss_mb > self.limit_mb
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                drivers = [driver for _, driver in self._browsers.values()]
+            for driver in drivers:
+                try:
+                    self.sample(driver)
+                except Exception:
+                    pass  # Browser quit between listing and sampling
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        return {"limit_mb": self.limit_mb, "peak_mb": self.peak_mb, "timeline": list(self.timeline)}
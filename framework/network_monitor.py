@@ -0,0 +1,148 @@
+"""
+Network monitor - follows the browser's XHRs through Chrome's performance log
+Lets pages wait for the API responses they depend on instead of guessing from the DOM
+"""
+
+import base64
+import json
+import re
+import time
+from urllib.parse import quote
+
+from selenium.common.exceptions import WebDriverException
+
+from locators import TestData
+
+
+def endpoint_pattern(template, variant=None, genome=None):
+    """Build a regex from an ApiEndpoints template like r"/api/lookup/{variant}"
+    The variant can show up raw (BRAF:V600E) or url encoded (BRAF%3AV600E) so both are accepted"""
+    values = {}
+    for key, value in (("variant", variant), ("genome", genome)):
+        if value is None:
+            values[key] = "[^/?]+"
+        else:
+            forms = {re.escape(value), re.escape(quote(value, safe="")), re.escape(quote(value))}
+            values[key] = "(?:" + "|".join(sorted(forms)) + ")"
+    return re.compile(template.format(**values), re.IGNORECASE)
+
+
+class NetworkMonitor:
+    """Collects Network.* events for one driver
+    Needs the performance log enabled (framework.driver_factory does this when
+    RunSettings.CAPTURE_NETWORK is on). One monitor per driver because reading the log empties it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.requests = {}  # requestId -> info dict, in the order requests started
+        self.events = []  # Raw events for the failure report (HAR-like network log)
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Monitor attached to this driver - created on first use"""
+        monitor = getattr(driver, "_network_monitor", None)
+        if monitor is None:
+            monitor = cls(driver)
+            driver._network_monitor = monitor
+        return monitor
+
+    def poll(self):
+        """Read new events from the browser and update request info"""
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            return  # Performance log not enabled for this browser
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method", "")
+            if method.startswith("Network."):
+                self._handle(method, message.get("params", {}))
+
+    def _handle(self, method, params):
+        request_id = params.get("requestId")
+        if not request_id:
+            return
+        self.events.append({"method": method, "params": params})
+
+        if method == "Network.requestWillBeSent":
+            request = params.get("request", {})
+            self.requests[request_id] = {
+                "request_id": request_id,
+                "url": request.get("url"),
+                "method": request.get("method"),
+                "type": params.get("type"),
+                "started": params.get("timestamp"),
+                "status": None,
+                "mime_type": None,
+                "finished": None,
+                "failed": False,
+                "size": 0,
+            }
+            return
+
+        info = self.requests.get(request_id)
+        if info is None:
+            return  # Request started before we began listening
+        if method == "Network.responseReceived":
+            response = params.get("response", {})
+            info["status"] = response.get("status")
+            info["mime_type"] = response.get("mimeType")
+        elif method == "Network.loadingFinished":
+            info["finished"] = params.get("timestamp")
+            info["size"] = params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed":
+            info["finished"] = params.get("timestamp")
+            info["failed"] = True
+
+    def reset(self):
+        """Forget everything seen so far - call before the step whose requests we want"""
+        self.poll()
+        self.requests = {}
+        self.events = []
+
+    def find_completed(self, pattern):
+        """First finished, successful request whose url matches the regex, or None"""
+        for info in self.requests.values():
+            if info["finished"] and not info["failed"] and info["url"] and pattern.search(info["url"]):
+                return info
+        return None
+
+    def wait_for_responses(self, patterns, timeout=None, until=None, until_interval=0.25):
+        """Wait until every pattern (name -> compiled regex) has a completed response
+        until is an optional check (e.g. the page already shows the data) called every until_interval
+        seconds - the wait stops early once it returns something truthy
+        Returns name -> request info for the ones that completed, even on timeout"""
+        deadline = time.time() + (timeout or TestData.TIMEOUT_LONG)
+        next_check = time.time() + until_interval
+        found = {}
+        while True:
+            self.poll()
+            for name, pattern in patterns.items():
+                if name not in found:
+                    info = self.find_completed(pattern)
+                    if info:
+                        found[name] = info
+            if len(found) == len(patterns) or time.time() >= deadline:
+                return found
+            if until and time.time() >= next_check:
+                if until():
+                    return found
+                next_check = time.time() + until_interval
+            time.sleep(0.05)  # Performance log has no push API, 50ms keeps it cheap
+
+    def response_body(self, info):
+        """Body of a completed response - parsed JSON when possible, text otherwise"""
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": info["request_id"]})
+        except WebDriverException:
+            return None  # Body already evicted from the browser cache
+        text = body.get("body", "")
+        if body.get("base64Encoded"):
+            text = base64.b64decode(text).decode("utf-8", errors="replace")
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
@@ -0,0 +1,67 @@
+"""
+Sample profiles - the patient information typed into the Optional Sample Information modal
+(or put into a direct results URL), kept as JSON files in profiles/ so a variant can use
+something other than the TestData values
+"""
+
+import json
+import os
+
+from locators import TestData, RunSettings
+
+# Fields a profile can have - anything else in the file is ignored (e.g. "description")
+PROFILE_FIELDS = ("annotation_mode", "phenotype", "phenotype_code", "sex", "age", "ethnicity")
+
+_loaded = {}
+
+
+def default_profile():
+    """The TestData values - used when profiles/default.json is missing"""
+    return {
+        "name": "default",
+        "annotation_mode": "germline",
+        "phenotype": TestData.PHENOTYPE,
+        "phenotype_code": TestData.PHENOTYPE_CODE,
+        "sex": TestData.SEX,
+        "age": TestData.AGE,
+        "ethnicity": TestData.ETHNICITY,
+    }
+
+
+def profile_path(name):
+    """A name like "default" is looked up in PROFILES_DIR, a path to a .json file is used as is"""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(RunSettings.PROFILES_DIR, f"{name}.json")
+
+
+def load_profile(name=None):
+    """Profile dict by name or path (default RunSettings.SAMPLE_PROFILE)
+    Fields that are missing or empty are left blank in the modal. Returns None if the file
+    cant be read, except for "default" which falls back to the TestData values"""
+    name = name or RunSettings.SAMPLE_PROFILE
+    if name in _loaded:
+        return dict(_loaded[name])
+
+    path = profile_path(name)
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        if name == "default":
+            return default_profile()
+        print(f"Could not load sample profile {path}: {e}")
+        return None
+
+    profile = {"name": data.get("name") or os.path.splitext(os.path.basename(path))[0]}
+    profile.update({field: str(data[field]) for field in PROFILE_FIELDS if data.get(field) not in (None, "")})
+    _loaded[name] = profile
+    return dict(profile)
+
+
+def list_profiles():
+    """Names of the profiles in PROFILES_DIR"""
+    try:
+        return sorted(f[:-len(".json")] for f in os.listdir(RunSettings.PROFILES_DIR) if f.endswith(".json"))
+    except OSError:
+        return []
@@ -0,0 +1,185 @@
+"""
+Scheduler for run_matrix.py - orders variants by how long they took in earlier runs
+Longest expected journeys go first (LPT), spread over per-worker queues so every worker
+should finish at about the same time. A worker whose queue runs dry steals from the end of
+the queue with the most expected work left, so a wrong guess doesnt leave it idle.
+Historically flaky variants can go first, so their retries overlap with the rest of the run.
+The list is planned a window at a time, so ordering is longest first within each window
+"""
+
+import heapq
+from collections import deque
+
+from framework.state_file import load_json, update_json
+from locators import RunSettings
+
+
+def history_key(variant, genome, mode):
+    return f"{genome}|{variant}|{mode}"
+
+
+class JourneyHistory:
+    """Duration and failures of past journeys per variant (genome and mode included), saved as JSON
+    Only the parent process of a run writes it"""
+
+    def __init__(self, path=None):
+        self.path = path or RunSettings.SCHEDULE_HISTORY_FILE
+        self.data = self._load()  # key -> {"durations": [seconds, ...], "runs": n, "failures": n}
+        known = sorted(self._median(entry["durations"]) for entry in self.data.values() if entry["durations"])
+        # Variants never seen before are expected to take as long as a typical known one
+        self.default_duration = known[len(known) // 2] if known else RunSettings.SCHEDULE_DEFAULT_DURATION
+
+    def _load(self):
+        return load_json(self.path)
+
+    @staticmethod
+    def _median(values):
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+    def entry(self, case):
+        return self.data.get(history_key(case.variant, case.genome, case.mode))
+
+    def expected_duration(self, case):
+        """Median of the last durations, or default_duration for a variant without history"""
+        entry = self.entry(case)
+        if not entry or not entry["durations"]:
+            return self.default_duration
+        return self._median(entry["durations"])
+
+    def failure_rate(self, case):
+        entry = self.entry(case)
+        return entry["failures"] / entry["runs"] if entry and entry["runs"] else 0.0
+
+    def is_flaky(self, case):
+        entry = self.entry(case)
+        return (entry is not None and entry["runs"] >= RunSettings.FLAKY_MIN_RUNS
+                and self.failure_rate(case) >= RunSettings.FLAKY_FAILURE_RATE)
+
+    def record(self, results):
+        """Add the duration and outcome of every journey in a run's results"""
+        for r in results:
+            if not r.get("duration"):
+                continue  # Never ran - its worker stopped first
+            key = history_key(r["variant"], r["genome"], r.get("mode") or RunSettings.JOURNEY_MODE)
+            entry = self.data.setdefault(key, {"durations": [], "runs": 0, "failures": 0})
+            entry["durations"] = (entry["durations"] + [r["duration"]])[-RunSettings.SCHEDULE_HISTORY_SIZE:]
+            entry["runs"] += 1
+            entry["failures"] += 0 if r["passed"] else 1
+
+    def save(self):
+        """Write the history atomically - it holds everything since it was loaded, so it replaces the file"""
+        update_json(self.path, lambda on_disk: self.data, "journey history", indent=1)
+
+
+class Scheduler:
+    """Plans (index, case) tasks over workers and hands them out during the run
+    cases can be any iterable - it is planned in windows of SCHEDULE_WINDOW variants, the next
+    window once the current one is handed out, so a big VCF is never read into memory at once.
+    Every worker has slots (its tabs) - a worker's predicted finish is its planned work / slots"""
+
+    def __init__(self, cases, workers, slots=1, history=None, flaky_first=False, window=None):
+        self.history = history or JourneyHistory()
+        self.workers = workers
+        self.slots = slots
+        self.flaky_first = flaky_first
+        self.window = window or RunSettings.SCHEDULE_WINDOW
+        self._source = enumerate(cases)
+        self.exhausted = False
+        self.error = None  # Why reading the cases stopped early, if it did
+        self.queues = [deque() for _ in range(workers)]
+        self.remaining = [0.0] * workers  # Expected seconds still in each worker's queue
+        self.expected = {}  # index -> expected seconds, for tasks not handed out yet
+        self.planned = [0.0] * workers  # Predicted busy seconds per worker, all windows so far
+        self.predicted = 0.0  # Sum of the windows' makespans
+        self.windows = 0
+        self.steals = 0
+        self.actual_makespan = None  # Set by run_matrix - first worker started until the last result
+        self.total = 0
+        self.known = 0
+        self.flaky = 0
+        self._next_window()
+
+    def _next_window(self):
+        """Read and plan the next window of cases. Returns False when there are none left"""
+        if self.exhausted:
+            return False
+        tasks = []
+        try:
+            for task in self._source:
+                tasks.append(task)
+                if len(tasks) >= self.window:
+                    break
+            else:
+                self.exhausted = True
+        except Exception as e:
+            print(f"Stopped reading the variant list: {e}")
+            self.error = str(e)
+            self.exhausted = True
+        if tasks:
+            self._plan(tasks)
+        return bool(tasks)
+
+    def _plan(self, tasks):
+        """LPT - longest expected first, each to the worker that would finish earliest so far"""
+        flaky = set()
+        for index, case in tasks:
+            self.expected[index] = self.history.expected_duration(case)
+            self.known += 1 if self.history.entry(case) else 0
+            if self.flaky_first and self.history.is_flaky(case):
+                flaky.add(index)
+        self.total += len(tasks)
+        self.flaky += len(flaky)
+        tasks.sort(key=lambda task: (task[0] not in flaky, -self.expected[task[0]]))
+
+        loads = [(0.0, worker) for worker in range(self.workers)]
+        for index, case in tasks:
+            load, worker = heapq.heappop(loads)
+            self.queues[worker].append((index, case))
+            self.remaining[worker] += self.expected[index]
+            heapq.heappush(loads, (load + self.expected[index] / self.slots, worker))
+        for load, worker in loads:
+            self.planned[worker] += load
+        self.predicted += max(load for load, _ in loads)
+        self.windows += 1
+
+    def next_task(self, worker):
+        """Next (index, case) for a free slot of worker, or None when nothing is left anywhere
+        Takes from the front of its own queue, else steals from the back of the busiest one"""
+        if not self.has_tasks():
+            return None
+        source = worker
+        if not self.queues[worker]:
+            others = [w for w in range(self.workers) if self.queues[w]]
+            source = max(others, key=lambda w: self.remaining[w])
+            self.steals += 1
+        task = self.queues[source].popleft() if source == worker else self.queues[source].pop()
+        self.remaining[source] -= self.expected.pop(task[0])
+        return task
+
+    def has_tasks(self):
+        """True while anything is left - plans the next window when the current one is handed out"""
+        return any(self.queues) or self._next_window()
+
+    def predicted_makespan(self):
+        return round(self.predicted, 1)
+
+    def report(self, results):
+        """Predicted vs actual, total and per worker (sum of journey durations / slots)"""
+        busy = [0.0] * self.workers
+        for r in results:
+            if r.get("worker") is not None:
+                busy[r["worker"]] += r.get("duration", 0)
+        return {
+            "order": "flaky first, then longest first" if self.flaky_first else "longest first",
+            "window": self.window,
+            "windows": self.windows,
+            "predicted_makespan": self.predicted_makespan(),
+            "actual_makespan": round(self.actual_makespan, 1) if self.actual_makespan is not None else None,
+            "with_history": self.known,
+            "without_history": self.total - self.known,
+            "flaky_first": self.flaky,
+            "steals": self.steals,
+            "workers": [{"worker": w, "predicted": round(self.planned[w], 1), "actual": round(busy[w] / self.slots, 1)}
+                        for w in range(self.workers)],
+        }
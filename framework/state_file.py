@@ -0,0 +1,80 @@
+"""
+State files - the JSON the framework keeps between runs (timeout history, locator priorities,
+journey history, evidence index) and the files it writes next to them
+Worker processes save the same files when they exit, so reading, merging and writing a file
+back happens under a lock file, and every write goes to a temp file that then replaces the real one
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """with file_lock(path): ... - exclusive lock on path.lock, waits until other processes let go
+    Raises OSError if the lock file cant be created (e.g. the folder is gone)"""
+    with open(path + ".lock", "a+") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # Gives up after 10 seconds
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_json(path):
+    """Contents of a JSON state file, {} if it is missing or broken"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_atomic(path, data):
+    """Write str or bytes to path through a temp file in the same folder - readers never see half a file
+    Raises OSError, nothing is left behind then"""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def update_json(path, merge, what, indent=None):
+    """Read path, write back merge(on_disk) - both under the lock, so processes saving at the same
+    time dont lose each others updates. what names the file in the error message
+    Returns the data written, or None if it couldnt be saved (printed, not raised)"""
+    try:
+        with file_lock(path):
+            data = merge(load_json(path))
+            write_atomic(path, json.dumps(data, indent=indent))
+    except OSError as e:
+        print(f"Could not save {what}: {e}")
+        return None
+    return data
@@ -0,0 +1,232 @@
+"""
+Tab manager - several variant journeys in one Chrome, one tab each
+A WebDriver session only talks to one window at a time, so every tab gets its own driver object
+(a TabDriver) whose commands go through the manager: it takes a lock, switches to the tab's
+window if another tab was active, and runs the command. Page objects just get the TabDriver
+instead of the real driver and never notice the other tabs.
+The browser is started with page load strategy "none" (create_driver(background_tabs=True)) so
+a get() only holds the lock while the navigation starts - the wait for the page to load is done
+in short turns, and the other tabs keep working and loading meanwhile
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.mobile import Mobile
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from locators import RunSettings
+
+# Set on the old document before a get() - a page without it is the new one
+NAVIGATION_MARK = "__tabManagerNavigation"
+
+# Per-browser state the framework keeps on the driver object - each tab needs its own
+FRAMEWORK_DRIVER_ATTRIBUTES = (
+    "execute",  # Tracer wrapper (framework.tracing)
+    "_tracer_attached",
+    "_network_monitor",
+    "_overlay_watcher_installed",
+    "_wait_engine_script_timeout",
+    "_profile_clone",
+    "_profile_seed",
+    "_blocked_urls",
+    "_navigated_at",  # framework.timeout_policy.mark_navigation
+)
+
+
+class TabDriverMixin:
+    """Methods a TabDriver overrides on top of the real driver class"""
+
+    def execute(self, driver_command, params=None):
+        return self._tab_manager.run(self.tab_handle, driver_command, params)
+
+    def get_log(self, log_type):
+        if log_type == "performance":
+            # One log for the whole browser - the manager hands each tab its own entries
+            return self._tab_manager.performance_log(self.tab_handle)
+        return super().get_log(log_type)
+
+    def close(self):
+        self._tab_manager.close_tab(self)
+
+    def quit(self):
+        """Closing a journey's driver only closes its tab - the browser is quit by whoever started it"""
+        self._tab_manager.close_tab(self)
+
+    def exclusive(self):
+        """Keep other tabs out for several commands in a row, e.g. while inside an iframe"""
+        return self._tab_manager.lock
+
+
+def hold_tab(driver):
+    """with hold_tab(driver): ... - exclusive use of the browser for a TabDriver, no-op otherwise"""
+    exclusive = getattr(driver, "exclusive", None)
+    return exclusive() if exclusive else nullcontext()
+
+
+class TabManager:
+    """Owns one real driver and hands out a TabDriver per tab"""
+
+    def __init__(self, driver, wait_slice=None):
+        self.driver = driver
+        self.wait_slice = wait_slice or RunSettings.TAB_WAIT_SLICE
+        self.lock = threading.RLock()
+        self._current = driver.current_window_handle
+        self._first_tab_free = True
+        self._tabs = []
+        self._busy = set()  # Handles of tabs that went to a page since their last reset_tab
+        # Page loads dont block the session, so run() waits for them per tab
+        self._wait_for_loads = (getattr(driver, "caps", None) or {}).get("pageLoadStrategy") == "none"
+        self.page_load_timeout = driver.timeouts.page_load if self._wait_for_loads else None
+        self._logs = {}  # handle -> performance log entries not read by that tab yet
+        self._tab_class = type(f"Tab{type(driver).__name__}", (TabDriverMixin, type(driver)), {})
+
+    def open_tab(self):
+        """New tab (the browser's first tab is used first) and a driver object bound to it"""
+        with self.lock:
+            if self._first_tab_free:
+                self._first_tab_free = False
+                handle = self._current
+                new_tab = False
+            else:
+                handle = self.driver.execute(Command.NEW_WINDOW, {"type": "tab"})["value"]["handle"]
+                self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+                self._current = handle
+                new_tab = True
+            self._logs[handle] = []
+
+        tab = object.__new__(self._tab_class)
+        tab.__dict__.update({key: value for key, value in self.driver.__dict__.items()
+                             if key not in FRAMEWORK_DRIVER_ATTRIBUTES})
+        tab._switch_to = SwitchTo(tab)
+        tab._mobile = Mobile(tab)
+        tab._tab_manager = self
+        tab.tab_handle = handle
+        tab.wait_slice = self.wait_slice  # BasePage.wait_for_dom waits in slices so tabs take turns
+        self._tabs.append(tab)
+        if new_tab:
+            self._setup_new_tab(tab)
+        return tab
+
+    def _setup_new_tab(self, tab):
+        """DevTools settings are per tab - repeat what create_driver did for the first one"""
+        from framework.browser_profile import install_storage_seed
+        from framework.driver_factory import block_urls
+
+        patterns = getattr(self.driver, "_blocked_urls", None)
+        if patterns:
+            block_urls(tab, patterns)
+        seed = getattr(self.driver, "_profile_seed", None)
+        if seed:
+            install_storage_seed(tab, seed)
+
+    def run(self, handle, driver_command, params=None):
+        """Run one command on the tab's window
+        The lock is only held for the switch and the command - a get() waits for its page outside it"""
+        navigating = driver_command == Command.GET and self._wait_for_loads
+        with self.lock:
+            self._switch(handle)
+            if driver_command == Command.GET and params.get("url") != "about:blank":
+                self._busy.add(handle)
+            if navigating:
+                try:
+                    self._execute_script(f"window.{NAVIGATION_MARK} = true")
+                except WebDriverException:
+                    pass  # No scripts on this page (e.g. a Chrome error page) - the readyState check still runs
+            response = self.driver.execute(driver_command, params)
+        if navigating:
+            self._wait_for_load(handle, params.get("url"))
+        return response
+
+    def _switch(self, handle):
+        if self._current != handle:
+            self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self._current = handle
+
+    def _execute_script(self, script):
+        return self.driver.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": []})["value"]
+
+    def _wait_for_load(self, handle, url):
+        """What get() does with the normal page load strategy, one short check at a time"""
+        deadline = time.time() + self.page_load_timeout
+        script = f"return window.{NAVIGATION_MARK} ? 'navigating' : document.readyState"
+        while True:
+            with self.lock:
+                self._switch(handle)
+                state = self._execute_script(script)
+            if state == "complete":
+                return
+            if time.time() > deadline:
+                raise TimeoutException(f"{url} did not load within {self.page_load_timeout}s (last state: {state})")
+            time.sleep(RunSettings.TIMEOUT_POLL_MIN)
+
+    def performance_log(self, handle):
+        """Entries of the shared performance log that belong to this tab
+        Each entry says which page (webview) it came from, which is the tab's window handle"""
+        with self.lock:
+            for entry in self.driver.get_log("performance"):
+                try:
+                    webview = json.loads(entry["message"]).get("webview")
+                except (KeyError, ValueError):
+                    continue
+                targets = [h for h in self._logs if h.upper().endswith(str(webview).upper())] if webview else []
+                for target in targets or list(self._logs):
+                    self._logs[target].append(entry)
+            entries = self._logs.get(handle, [])
+            self._logs[handle] = []
+            return entries
+
+    def reset_tab(self, tab):
+        """Get a tab ready for the next journey
+        Cookies and localStorage belong to the site, so every tab shares them. They are cleared when no
+        other tab is in a journey - clearing them under a running journey would break it. Otherwise the
+        next journey starts with what earlier ones left, so --tabs results are not fully isolated"""
+        from framework.browser_profile import set_seed_cookies
+        from framework.driver_pool import clear_site_data
+
+        with self.lock:
+            self._busy.discard(tab.tab_handle)
+            if self._busy:
+                tab.execute_script("try { sessionStorage.clear(); } catch (e) {}")
+            else:
+                tab.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+                clear_site_data(tab)
+                seed = getattr(self.driver, "_profile_seed", None)
+                if seed:
+                    set_seed_cookies(tab, seed)
+        tab.get("about:blank")
+        monitor = getattr(tab, "_network_monitor", None)
+        if monitor:
+            monitor.reset()
+
+    def close_tab(self, tab):
+        with self.lock:
+            if tab not in self._tabs:
+                return
+            self._tabs.remove(tab)
+            self._logs.pop(tab.tab_handle, None)
+            self._busy.discard(tab.tab_handle)
+            if not self._tabs:
+                return  # Keep the last window, closing it would end the session
+            self.run(tab.tab_handle, Command.CLOSE)
+            self._current = None  # Next command switches to its own tab first
+
+    def close(self):
+        """Forget all tabs - the browser itself is quit by whoever created it (e.g. the driver pool)"""
+        with self.lock:
+            self._tabs = []
+            self._logs = {}
+            self._busy = set()
+
+    @contextmanager
+    def tab(self):
+        """with manager.tab() as driver: ... - a tab for one worker thread, closed afterwards"""
+        tab = self.open_tab()
+        try:
+            yield tab
+        finally:
+            self.close_tab(tab)
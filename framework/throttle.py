@@ -0,0 +1,157 @@
+"""
+Throttle controller for run_matrix.py - decides how many journeys run at once across all workers
+Lives in the parent process, which hands out every task, so it is shared by all workers.
+A token bucket spaces out journey starts and an AIMD limit caps how many are in flight:
++1 after a full limit's worth of clean journeys, x THROTTLE_BACKOFF on a congestion signal
+(security check page, timeout, slow response). Completed journeys per minute are measured
+per limit so the increase stops at the limit that did best instead of probing forever
+"""
+
+import threading
+import time
+
+from locators import RunSettings
+
+
+class ThrottleController:
+    """acquire() / try_acquire() before a task goes to a worker, finished(result) for every result"""
+
+    def __init__(self, max_concurrency, rate_per_minute=None):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.max_rate = rate_per_minute or RunSettings.THROTTLE_RATE_PER_MIN
+        self.rate = float(self.max_rate)
+        self.tokens = float(max_concurrency)  # Full bucket - the first wave starts at once
+        self.in_flight = 0
+        self.started = time.time()
+        self._refilled = self.started
+        self._last_cut = 0
+        self._level_since = self.started
+        self._lock = threading.Condition()
+        self.levels = {}  # int(limit) -> {"seconds": time spent there, "completed": journeys finished}
+        self.signals = {"security_check": 0, "timeout": 0, "slow": 0}
+        self.cuts = 0
+        self.timeline = [[0.0, max_concurrency, round(self.rate, 1), "start"]]
+        self._recent = []  # time_to_results of clean journeys - what counts as slow
+
+    def _refill(self, now):
+        self.tokens = min(max(1.0, self.limit), self.tokens + (now - self._refilled) * self.rate / 60)
+        self._refilled = now
+
+    def _account_level(self, now):
+        level = self.levels.setdefault(int(self.limit), {"seconds": 0.0, "completed": 0})
+        level["seconds"] += now - self._level_since
+        self._level_since = now
+        return level
+
+    def _can_start(self, now):
+        self._refill(now)
+        return self.in_flight < int(self.limit) and self.tokens >= 1
+
+    def try_acquire(self):
+        """Take a slot if the limit and the bucket allow it. Returns True if the task may start"""
+        with self._lock:
+            if not self._can_start(time.time()):
+                return False
+            self.tokens -= 1
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        """Block until a task may start"""
+        with self._lock:
+            while not self._can_start(time.time()):
+                self._lock.wait(timeout=max(0.05, 60 / self.rate / 4))
+            self.tokens -= 1
+            self.in_flight += 1
+
+    def release(self, count):
+        """Give back slots of journeys that will never report a result (their worker died)"""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - count)
+            self._lock.notify_all()
+
+    def congestion(self, result):
+        """Which congestion signal a result shows, or None
+        A failed check in the journey is a wait that ran out - except a wrong verdict (step 6),
+        which is a real answer from the site. The same goes for retried steps"""
+        if result.get("security_check"):
+            return "security_check"
+        timed_out = [retry for retry in result.get("retries", []) if retry.get("failed_step") != 6]
+        if timed_out or (not result.get("passed") and result.get("failed_step") not in (None, 6)):
+            return "timeout"
+        seconds = result.get("time_to_results")
+        if seconds is not None and len(self._recent) >= RunSettings.THROTTLE_MIN_SAMPLES:
+            typical = sorted(self._recent)[len(self._recent) // 2]
+            if seconds > typical * RunSettings.THROTTLE_SLOW_FACTOR:
+                return "slow"
+        return None
+
+    def finished(self, result):
+        """A journey ended - release its slot and adjust the limit"""
+        with self._lock:
+            now = time.time()
+            self.in_flight = max(0, self.in_flight - 1)
+            self._account_level(now)["completed"] += 1
+            signal = self.congestion(result)
+            if signal:
+                self.signals[signal] += 1
+                # Journeys that started before the last cut ran at the old limit - one cut per episode
+                if now - result.get("duration", 0) >= self._last_cut:
+                    self._decrease(now, signal)
+            else:
+                if result.get("time_to_results") is not None:
+                    self._recent = (self._recent + [result["time_to_results"]])[-RunSettings.THROTTLE_HISTORY_SIZE:]
+                self._increase(now)
+            self._lock.notify_all()
+
+    def _decrease(self, now, reason):
+        self._account_level(now)
+        self.limit = max(1.0, self.limit * RunSettings.THROTTLE_BACKOFF)
+        self.rate = max(RunSettings.THROTTLE_MIN_RATE_PER_MIN, self.rate * RunSettings.THROTTLE_BACKOFF)
+        self._last_cut = now
+        self.cuts += 1
+        self.timeline.append([round(now - self.started, 1), round(self.limit, 2), round(self.rate, 1), reason])
+        print(f"Throttle: {reason} - {int(self.limit)} journeys at once, {self.rate:.0f} starts/min")
+
+    def _increase(self, now):
+        ceiling = self.max_concurrency
+        best = self.best_limit()
+        above = self.levels.get(best + 1) if best else None
+        if best and above and above["seconds"] >= RunSettings.THROTTLE_LEVEL_SECONDS \
+                and self._per_minute(above) < self._per_minute(self.levels[best]):
+            ceiling = best  # One more was tried and did worse - stay at the best limit
+        before = int(self.limit)
+        self._account_level(now)
+        self.limit = min(float(ceiling), self.limit + 1 / self.limit) if self.limit < ceiling else float(ceiling)
+        self.rate = min(float(self.max_rate), self.rate + RunSettings.THROTTLE_RATE_STEP)
+        if int(self.limit) != before:
+            reason = "increase" if int(self.limit) > before else "settle"
+            self.timeline.append([round(now - self.started, 1), round(self.limit, 2), round(self.rate, 1), reason])
+
+    @staticmethod
+    def _per_minute(level):
+        return level["completed"] / level["seconds"] * 60 if level["seconds"] else 0
+
+    def best_limit(self):
+        """Limit with the most completed journeys per minute, among limits used long enough to tell"""
+        measured = {limit: self._per_minute(level) for limit, level in self.levels.items()
+                    if level["seconds"] >= RunSettings.THROTTLE_LEVEL_SECONDS}
+        return max(measured, key=measured.get) if measured else None
+
+    def state(self):
+        """Everything the run report needs"""
+        with self._lock:
+            self._account_level(time.time())
+            return {
+                "max_concurrency": self.max_concurrency,
+                "limit": round(self.limit, 2),
+                "rate_per_minute": round(self.rate, 1),
+                "best_limit": self.best_limit(),
+                "cuts": self.cuts,
+                "signals": dict(self.signals),
+                "per_limit": {str(limit): {"seconds": round(level["seconds"], 1), "completed": level["completed"],
+                                           "per_minute": round(self._per_minute(level), 2)}
+                              for limit, level in sorted(self.levels.items())},
+                "timeline": self.timeline,
+            }
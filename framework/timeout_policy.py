@@ -0,0 +1,130 @@
+"""
+Timeout policy - deadlines and poll intervals learned from how long each wait took before
+The TestData constants stay as upper bounds. Once a wait has enough history its deadline is
+p99 x margin, so a step that normally takes 0.4s fails after a few seconds instead of 20,
+and polling starts fast and backs off so fast pages are noticed sooner than every 0.5s
+"""
+
+import atexit
+import math
+import os
+import time
+
+from framework.state_file import load_json, update_json
+from locators import RunSettings
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def mark_navigation(driver):
+    """Call right after something that loads a new page (driver.get, a submit that navigates)"""
+    driver._navigated_at = time.time()
+
+
+def wait_phase(driver):
+    """"load" within TIMEOUT_LOAD_PHASE seconds of the last navigation, else "ready"
+    A driver without a mark counts as loading - its waits get the cautious history"""
+    navigated_at = getattr(driver, "_navigated_at", None)
+    if navigated_at is None or time.time() - navigated_at < RunSettings.TIMEOUT_LOAD_PHASE:
+        return "load"
+    return "ready"
+
+
+class TimeoutPolicy:
+    """Latency history per wait key (like "visible:search_input@load"), saved as JSON
+    Several worker processes share the file so new samples are merged with whats on disk"""
+
+    def __init__(self, path=None, enabled=None):
+        self.path = path or RunSettings.TIMEOUT_HISTORY_FILE
+        if enabled is None:
+            enabled = os.environ.get("VARSOME_ADAPTIVE_TIMEOUTS", "1" if RunSettings.ADAPTIVE_TIMEOUTS else "0") != "0"
+        self.enabled = enabled
+        self.data = self._load()  # key -> {"samples": [seconds, ...], "timeouts": n}
+        self._new = {}  # Samples and timeouts since last save
+
+    def _load(self):
+        return load_json(self.path)
+
+    def deadline(self, key, ceiling):
+        """Seconds to wait for key - p99 x margin of past waits, never more than ceiling
+        Falls back to the ceiling until there are enough samples"""
+        samples = self.data.get(key, {}).get("samples", [])
+        if not self.enabled or len(samples) < RunSettings.TIMEOUT_MIN_SAMPLES:
+            return ceiling
+        learned = percentile(samples, 0.99) * RunSettings.TIMEOUT_MARGIN
+        return min(ceiling, max(RunSettings.TIMEOUT_FLOOR, learned))
+
+    def poll_intervals(self, key):
+        """Sleep times between checks for a polled wait - starts at a fraction of the usual
+        latency and grows by TIMEOUT_POLL_BACKOFF up to the old fixed 0.5s"""
+        samples = self.data.get(key, {}).get("samples", [])
+        if self.enabled and samples:
+            interval = percentile(samples, 0.5) / 5
+        else:
+            interval = RunSettings.TIMEOUT_POLL_MIN
+        interval = min(RunSettings.TIMEOUT_POLL_MAX, max(RunSettings.TIMEOUT_POLL_MIN, interval))
+        while True:
+            yield interval
+            interval = min(RunSettings.TIMEOUT_POLL_MAX, interval * RunSettings.TIMEOUT_POLL_BACKOFF)
+
+    def record(self, key, seconds):
+        """A wait for key finished after seconds"""
+        entry = self.data.setdefault(key, {"samples": [], "timeouts": 0})
+        entry["samples"] = (entry["samples"] + [round(seconds, 3)])[-RunSettings.TIMEOUT_HISTORY_SIZE:]
+        self._new.setdefault(key, {"samples": [], "timeouts": 0})["samples"].append(round(seconds, 3))
+
+    def record_timeout(self, key):
+        """A wait for key gave up - counted for the report, not used for the deadline"""
+        entry = self.data.setdefault(key, {"samples": [], "timeouts": 0})
+        entry["timeouts"] += 1
+        self._new.setdefault(key, {"samples": [], "timeouts": 0})["timeouts"] += 1
+
+    def wait_until(self, condition, key, ceiling):
+        """Call condition() until it returns something truthy, with learned deadline and polling
+        Returns the value, or None on timeout"""
+        started = time.time()
+        deadline = started + self.deadline(key, ceiling)
+        intervals = self.poll_intervals(key)
+        while True:
+            value = condition()
+            if value:
+                self.record(key, time.time() - started)
+                return value
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.record_timeout(key)
+                return None
+            time.sleep(min(next(intervals), remaining))
+
+    def save(self):
+        """Merge new samples into the file and write it atomically"""
+        if not self._new:
+            return
+        def merge(on_disk):
+            for key, new in self._new.items():
+                entry = on_disk.setdefault(key, {"samples": [], "timeouts": 0})
+                entry["samples"] = (entry["samples"] + new["samples"])[-RunSettings.TIMEOUT_HISTORY_SIZE:]
+                entry["timeouts"] += new["timeouts"]
+            return on_disk
+
+        saved = update_json(self.path, merge, "timeout history", indent=1)
+        if saved is not None:
+            self._new = {}
+            self.data = saved
+
+
+_policy = None
+
+
+def get_timeout_policy():
+    """Shared policy for this process - history is saved when the process exits"""
+    global _policy
+    if _policy is None:
+        _policy = TimeoutPolicy()
+        atexit.register(_policy.save)
+    return _policy
@@ -0,0 +1,163 @@
+"""
+Timing instrumentation - how long each journey step, BasePage primitive and WebDriver command takes
+Off by default. Turn on with VARSOME_TRACE=1 (or run_matrix.py --trace)
+Exports JSON with totals plus a Chrome trace-event file that opens in chrome://tracing or Perfetto
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Tracer:
+    """Collects spans (name, start, duration, WebDriver round trips) for one process
+    When disabled every hook is a single attribute check, so leaving it in the code costs nothing"""
+
+    def __init__(self):
+        self.enabled = os.environ.get("VARSOME_TRACE", "") not in ("", "0")
+        self.spans = []
+        self._local = threading.local()
+
+    def _round_trips(self):
+        return getattr(self._local, "round_trips", 0)
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        self.spans = []
+
+    @contextmanager
+    def span(self, name, category="step", **args):
+        """with TRACER.span("STEP 1"): ... - records time and WebDriver round trips inside"""
+        if not self.enabled:
+            yield
+            return
+        round_trips_before = self._round_trips()
+        started = time.time()
+        perf_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({
+                "name": name,
+                "category": category,
+                "start": started,
+                "duration": time.perf_counter() - perf_started,
+                "round_trips": self._round_trips() - round_trips_before,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def start_step(self, name, **args):
+        """Start a step span that runs until the next start_step or end_step
+        Handy for long tests where wrapping every step in a with block would reindent everything"""
+        if not self.enabled:
+            return
+        self.end_step()
+        span = self.span(name, category="step", **args)
+        span.__enter__()
+        self._local.open_step = span
+
+    def end_step(self):
+        """Close the step span opened by start_step, if any"""
+        span = getattr(self._local, "open_step", None)
+        if span is not None:
+            self._local.open_step = None
+            span.__exit__(None, None, None)
+
+    def attach(self, driver):
+        """Count and time every command this driver sends to chromedriver
+        Wraps driver.execute on this instance only. Safe to call more than once"""
+        if not self.enabled or getattr(driver, "_tracer_attached", False):
+            return
+        original_execute = driver.execute
+        tracer = self
+
+        def execute(driver_command, params=None):
+            with tracer.span(driver_command, category="webdriver"):
+                tracer._local.round_trips = tracer._round_trips() + 1
+                return original_execute(driver_command, params)
+
+        driver.execute = execute
+        driver._tracer_attached = True
+
+    def summary(self):
+        """Totals per span name - count, total/avg/max seconds and round trips"""
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span["name"], {"category": span["category"], "count": 0,
+                                                     "total": 0.0, "max": 0.0, "round_trips": 0})
+            entry["count"] += 1
+            entry["total"] += span["duration"]
+            entry["max"] = max(entry["max"], span["duration"])
+            entry["round_trips"] += span["round_trips"]
+        for entry in totals.values():
+            entry["avg"] = round(entry["total"] / entry["count"], 4)
+            entry["total"] = round(entry["total"], 4)
+            entry["max"] = round(entry["max"], 4)
+        return totals
+
+    def trace_events(self):
+        """Spans in Chrome trace-event format (complete events, microseconds)"""
+        return [{
+            "name": span["name"],
+            "cat": span["category"],
+            "ph": "X",
+            "ts": int(span["start"] * 1_000_000),
+            "dur": int(span["duration"] * 1_000_000),
+            "pid": span["pid"],
+            "tid": span["tid"],
+            "args": dict(span["args"], round_trips=span["round_trips"]),
+        } for span in self.spans]
+
+    def export(self, path_prefix):
+        """Write <prefix>.json (spans and totals) and <prefix>.trace.json (trace viewer)
+        Returns the two paths, or None if tracing is off"""
+        if not self.enabled:
+            return None
+        os.makedirs(os.path.dirname(path_prefix) or ".", exist_ok=True)
+        json_path = f"{path_prefix}.json"
+        trace_path = f"{path_prefix}.trace.json"
+        with open(json_path, "w") as f:
+            json.dump({"summary": self.summary(), "spans": self.spans}, f, indent=2, default=str)
+        with open(trace_path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f, default=str)
+        return json_path, trace_path
+
+
+# One tracer per process, shared by pages, journey and runners
+TRACER = Tracer()
+
+
+def traced(method):
+    """Decorator for BasePage primitives - records a span named Class.method with the locator"""
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not TRACER.enabled:
+            return method(self, *args, **kwargs)
+        TRACER.attach(self.driver)
+        with TRACER.span(name, category="primitive", target=str(args[0])[:120] if args else ""):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def merge_trace_files(paths, output_path):
+    """Combine trace files from several worker processes into one for the whole run"""
+    events = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                events.extend(json.load(f)["traceEvents"])
+        except (OSError, ValueError, KeyError):
+            continue
+    with open(output_path, "w") as f:
+        json.dump({"traceEvents": sorted(events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}, f)
+    return output_path
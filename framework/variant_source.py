@@ -0,0 +1,267 @@
+"""
+Variant source - reads a variant list lazily and yields VariantCase objects one at a time
+Works with the CSV/TSV lists of run_matrix.py and with VCF files (plain or gzipped), so a big
+VCF never has to be loaded into memory. Records can be filtered by gene and by region
+on the way through
+"""
+
+import csv
+import gzip
+import itertools
+import os
+import re
+
+from locators import RunSettings
+
+JOURNEY_MODES = ("full", "direct")
+
+# Verdicts as VarSome shows them - VCF values like Likely_pathogenic are matched against these
+VERDICTS = ("Pathogenic", "Likely Pathogenic", "Uncertain Significance", "Likely Benign", "Benign")
+
+# ##reference / ##contig assembly names -> VarSome genome
+ASSEMBLIES = {"grch38": "hg38", "hg38": "hg38", "grch37": "hg19", "hg19": "hg19", "b37": "hg19", "hs37d5": "hg19"}
+
+# A search string with coordinates, like chr7:140753336:A:T or 7-140753336-A-T
+GENOMIC_VARIANT = re.compile(r"^(?:chr)?([0-9]{1,2}|[XYM]|MT)[:\-](\d+)", re.IGNORECASE)
+
+
+def normalize_chrom(chrom):
+    """chr7 -> 7, chrX -> X, chrMT -> M"""
+    chrom = chrom.strip()
+    if chrom.lower().startswith("chr"):
+        chrom = chrom[3:]
+    chrom = chrom.upper()
+    return "M" if chrom == "MT" else chrom
+
+
+def parse_regions(value):
+    """"7:140700000-140800000,chr17" -> [("7", 140700000, 140800000), ("17", None, None)]
+    A single position ("7:140753336") is a region of one base. Returns None for no filter"""
+    if not value:
+        return None
+    regions = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        chrom, _, span = part.partition(":")
+        start = end = None
+        if span:
+            first, _, last = span.partition("-")
+            start = int(first)
+            end = int(last) if last else start
+        regions.append((normalize_chrom(chrom), start, end))
+    return regions or None
+
+
+def parse_genes(value):
+    """Comma separated gene symbols, or a file with one symbol per line. Returns None for no filter"""
+    if not value:
+        return None
+    if os.path.isfile(value):
+        with open(value) as f:
+            names = [line.split("#")[0] for line in f]
+    else:
+        names = value.split(",")
+    return {name.strip().upper() for name in names if name.strip()} or None
+
+
+def in_regions(regions, chrom, pos):
+    for region_chrom, start, end in regions:
+        if chrom == region_chrom and (start is None or start <= pos <= end):
+            return True
+    return False
+
+
+def normalize_verdict(value):
+    """ClinVar style CLNSIG (Likely_pathogenic) -> Likely Pathogenic
+    Returns None for anything that isnt exactly one VarSome verdict (e.g. Pathogenic/Likely_pathogenic)"""
+    if not isinstance(value, str):
+        return None  # Missing, or a flag without a value
+    text = " ".join(value.replace("_", " ").split()).lower()
+    return next((verdict for verdict in VERDICTS if verdict.lower() == text), None)
+
+
+def genome_from_header(line):
+    """hg19 / hg38 from a ##reference or ##contig line, or None"""
+    if line.startswith("##reference="):
+        value = line[len("##reference="):]
+    else:
+        match = re.search(r"assembly=([^,>]+)", line)
+        if not match:
+            return None
+        value = match.group(1)
+    value = value.lower()
+    return next((genome for name, genome in ASSEMBLIES.items() if name in value), None)
+
+
+def open_text(path):
+    """Text stream for plain and gzipped (.gz / .bgz) files alike"""
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    if gzipped:
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+class VariantSource:
+    """Iterate over it to get VariantCase objects - the file is read as you go, one line at a time
+    genes is a set of symbols, regions comes from parse_regions. genome is used for rows / VCFs that
+    dont say which genome they are. Counters of what was read and skipped are in stats()"""
+
+    def __init__(self, path, genes=None, regions=None, default_mode=None, genome=None):
+        self.path = path
+        self.genes = {gene.upper() for gene in genes} if genes else None
+        self.regions = regions
+        self.default_mode = default_mode
+        self.genome = genome
+        self.format = None
+        self.read = 0
+        self.yielded = 0
+        self.skipped = {}
+
+    def __iter__(self):
+        with open_text(self.path) as f:
+            lines = (line for line in f if line.strip())
+            first = next(lines, None)
+            if first is None:
+                return
+            lines = itertools.chain([first], lines)
+            if first.startswith("##fileformat=VCF") or first.startswith("#CHROM"):
+                self.format = "vcf"
+                records = self._vcf_cases(lines)
+            else:
+                self.format = "table"
+                records = self._table_cases(lines)
+            for case in records:
+                self.yielded += 1
+                yield case
+
+    def _skip(self, reason):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def _mode(self, value, variant):
+        mode = value.lower() or self.default_mode
+        if mode and mode not in JOURNEY_MODES:
+            print(f"Unknown mode '{value}' for {variant} - using default")
+            mode = self.default_mode
+        return mode
+
+    def _table_cases(self, lines):
+        """run_matrix.py list - variant, genome, expected_verdict, expected_color, mode, profile
+        Gene and region filters work on the variant column (BRAF:V600E, chr7:140753336:A:T)"""
+        from framework.journey import VariantCase
+
+        lines = (line for line in lines if not line.lstrip().startswith("#"))
+        first = next(lines, None)
+        if first is None:
+            return
+        delimiter = "\t" if "\t" in first else ","
+        for row in csv.reader(itertools.chain([first], lines), delimiter=delimiter):
+            row = [cell.strip() for cell in row]
+            if not row or row[0].lower() == "variant":
+                continue  # Header row
+            self.read += 1
+            row += [""] * (6 - len(row))
+            variant = row[0]
+            coordinates = GENOMIC_VARIANT.match(variant)
+            if self.regions:
+                if not coordinates:
+                    self._skip("no coordinates for region filter")
+                    continue
+                if not in_regions(self.regions, normalize_chrom(coordinates.group(1)), int(coordinates.group(2))):
+                    self._skip("outside region")
+                    continue
+            if self.genes:
+                gene = variant.split(":")[0].upper() if ":" in variant and not coordinates else None
+                if gene not in self.genes:
+                    self._skip("gene not in list")
+                    continue
+            yield VariantCase(variant, row[1] or self.genome, row[2], row[3], self._mode(row[4], variant), row[5])
+
+    def _vcf_cases(self, lines):
+        """One case per ALT allele - searched by coordinates (RunSettings.VCF_SEARCH_FORMAT)
+        The expected verdict / color and the gene come from the INFO keys in RunSettings.
+        Records without a verdict are skipped - there would be nothing to check"""
+        from framework.journey import VariantCase
+
+        genome = self.genome
+        for line in lines:
+            if line.startswith("##"):
+                if not genome and line.startswith(("##reference=", "##contig=")):
+                    genome = genome_from_header(line)
+                continue
+            if line.startswith("#"):
+                continue  # #CHROM column header
+            fields = line.rstrip("\r\n").split("\t")
+            if len(fields) < 8:
+                self._skip("malformed line")
+                continue
+            self.read += 1
+            try:
+                cases = self._vcf_record(fields, genome)
+            except (ValueError, TypeError, AttributeError, IndexError):
+                # A bad record must not stop the run - the rest of the file may be fine
+                self._skip("malformed line")
+                continue
+            for variant, verdict, color in cases:
+                yield VariantCase(variant, genome, verdict, color, self._mode("", variant))
+
+    def _vcf_record(self, fields, genome):
+        """(variant, verdict, color) for every ALT allele of a record that passes the filters
+        Raises ValueError etc. for records that cant be read"""
+        chrom, pos = normalize_chrom(fields[0]), int(fields[1])
+        # Region first - it needs no INFO parsing, so most records of a big file are dropped cheaply
+        if self.regions and not in_regions(self.regions, chrom, pos):
+            self._skip("outside region")
+            return []
+        info = parse_info(fields[7])
+        if self.genes and not (info_genes(info) & self.genes):
+            self._skip("gene not in list")
+            return []
+        verdict = next((normalize_verdict(info.get(key)) for key in RunSettings.VCF_VERDICT_KEYS
+                        if info.get(key)), None)
+        if not verdict:
+            self._skip("no verdict in INFO")
+            return []
+        color = info.get(RunSettings.VCF_COLOR_KEY)
+        if not isinstance(color, str):
+            color = RunSettings.VERDICT_COLORS.get(verdict, "")
+        cases = []
+        for alt in fields[4].split(","):
+            if alt in (".", "*") or alt.startswith("<") or "[" in alt or "]" in alt:
+                self._skip("symbolic allele")
+                continue
+            cases.append((RunSettings.VCF_SEARCH_FORMAT.format(chrom=chrom, pos=pos, ref=fields[3], alt=alt),
+                          verdict, color))
+        return cases
+
+    def stats(self):
+        return {"path": self.path, "format": self.format, "read": self.read,
+                "cases": self.yielded, "skipped": dict(self.skipped)}
+
+
+def parse_info(text):
+    """VCF INFO column -> dict, flags get True"""
+    info = {}
+    if text == ".":
+        return info
+    for item in text.split(";"):
+        key, sep, value = item.partition("=")
+        info[key] = value if sep else True
+    return info
+
+
+def info_genes(info):
+    """Gene symbols named in the INFO keys of RunSettings.VCF_GENE_KEYS
+    GENEINFO is BRAF:673|..., ANN (snpEff) has the gene as its 4th | field"""
+    genes = set()
+    for key in RunSettings.VCF_GENE_KEYS:
+        value = info.get(key)
+        if not value or value is True:
+            continue
+        if key == "ANN":
+            genes.update(ann.split("|")[3] for ann in value.split(",") if ann.count("|") >= 3)
+        else:
+            genes.update(part.split(":")[0] for part in re.split(r"[|,&]", value))
+    return {gene.upper() for gene in genes if gene}
@@ -3,9 +3,22 @@ Locators for VarSome Website - All locators in one place for easy maintenance
 I keep all locators here so if website changes, I only need to update one file
 """
 
+import os
 from selenium.webdriver.common.by import By
 
 
+class CompositeLocator:
+    """Several locators for the same element - BasePage races them and uses whichever matches first
+    The winner is remembered on disk so next runs try it first (see framework/locator_priority.py)"""
+    
+    def __init__(self, name, *alternatives):
+        self.name = name
+        self.alternatives = list(alternatives)
+    
+    def __repr__(self):
+        return f"CompositeLocator({self.name})"
+
+
 class Locators:
     """Central repository for all element locators
     Organized by page section for easy finding"""
@@ -13,11 +26,14 @@ class Locators:
     # Homepage search elements
     SEARCH_INPUT = (By.XPATH, "//input[contains(@placeholder, 'Enter gene') or contains(@placeholder, 'variant')]")
     SEARCH_INPUT_ALT = (By.CSS_SELECTOR, "input[type='text']:not([type='hidden'])")  # Backup selector
+    SEARCH_INPUT_ANY = CompositeLocator("search_input", SEARCH_INPUT, SEARCH_INPUT_ALT)
     GENOME_DROPDOWN = (By.XPATH, "//select[@name='genome' or @id='genome']")
     GENOME_DROPDOWN_ALT = (By.CSS_SELECTOR, "select.genome-select, select[data-testid='genome']")
+    GENOME_DROPDOWN_ANY = CompositeLocator("genome_dropdown", GENOME_DROPDOWN, GENOME_DROPDOWN_ALT)
     GENOME_HG38_OPTION = (By.XPATH, "//option[@value='hg38' or contains(text(), 'hg38')]")
     SEARCH_BUTTON = (By.XPATH, "//button[contains(text(), 'Search') or contains(@aria-label, 'Search')]")
     SEARCH_BUTTON_ALT = (By.CSS_SELECTOR, "button[type='submit'], button.search-btn")
+    SEARCH_BUTTON_ANY = CompositeLocator("search_button", SEARCH_BUTTON, SEARCH_BUTTON_ALT)
     
     # Modal elements
     MODAL_CONTAINER = (By.XPATH, "//form[@tabindex='-1']")  # The modal form
@@ -29,12 +45,14 @@ class Locators:
     SEX_DROPDOWN = (By.ID, "react-select-6-input")
     AGE_INPUT = (By.XPATH, "//div[@id='germline-modal-onset-age']//input[@placeholder]")
     AGE_INPUT_ALT = (By.CSS_SELECTOR, "input[name*='age'], input[placeholder*='age']")
+    AGE_INPUT_ANY = CompositeLocator("age_input", AGE_INPUT, AGE_INPUT_ALT)
     ETHNICITY_DROPDOWN = (By.ID, "react-select-7-input")
     ETHNICITY_DROPDOWN_ALT = (By.CSS_SELECTOR, "select[name='ethnicity'], select[data-field='ethnicity']")
     
     # Modal buttons
     MODAL_SEARCH_BUTTON = (By.XPATH, "//form//button[2]")  # Second button is search
     MODAL_SEARCH_BUTTON_ALT = (By.CSS_SELECTOR, ".modal-footer button.btn-primary, .modal button[type='submit']")
+    MODAL_SEARCH_BUTTON_ANY = CompositeLocator("modal_search_button", MODAL_SEARCH_BUTTON, MODAL_SEARCH_BUTTON_ALT)
     
     # Security validation page (sometimes appears)
     SECURITY_PROCEED_BUTTON = (By.ID, "proceedBtn")
@@ -56,6 +74,9 @@ class Locators:
     # Classification verdict elements - the key elements we're testing
     PATHOGENIC_VERDICT = (By.XPATH, "//div[contains(@class, 'ColoredPill')]//span[text()='Pathogenic']")
     PATHOGENIC_VERDICT_ALT = (By.XPATH, "//span[text()='Pathogenic']")  # Simpler backup
+    PATHOGENIC_VERDICT_ANY = CompositeLocator("pathogenic_verdict", PATHOGENIC_VERDICT, PATHOGENIC_VERDICT_ALT)
+    VERDICT_PILL_TEXT = (By.XPATH, "//div[@id='acmg']//div[contains(@class, 'ColoredPill')]//span")  # Any verdict, not only Pathogenic
+    VERDICT_TEXT_ANY = CompositeLocator("verdict_text", VERDICT_PILL_TEXT, PATHOGENIC_VERDICT, PATHOGENIC_VERDICT_ALT)
     
     # Loading indicators to wait for
     LOADING_SPINNER = (By.CSS_SELECTOR, ".spinner, .loading, .loader, [class*='load']")
@@ -66,13 +87,50 @@ class Locators:
     
     # Update popup that sometimes shows
     VERSION_POPUP_CLOSE = (By.ID, "interactive-close-button")
+    
+    # Everything that can interrupt the journey - BasePage.dismiss_overlays clicks these in one pass
+    INTERRUPTION_OVERLAYS = {
+        "cookie_consent": COOKIE_ACCEPT_BUTTON,
+        "update_popup": VERSION_POPUP_CLOSE,
+        "warning": WARNING_UNDERSTAND_BUTTON,
+        "security_check": SECURITY_PROCEED_BUTTON,
+    }
+
+
+class ApiEndpoints:
+    """URL patterns (regex) of the API calls the results page makes
+    {variant} and {genome} are filled in by framework.network_monitor.endpoint_pattern.
+    Same idea as Locators - if the site changes its API only this needs updating
+    These match the stand-in server (tools/stand_in_server.py). They are not checked against
+    varsome.com yet, so the API wait is off unless RunSettings.NETWORK_READINESS is set"""
+    
+    ANNOTATION = r"/api/lookup/{variant}"
+    CLASSIFICATION = r"/api/acmg/{variant}"
+
+
+class ResultsUrl:
+    """How the results page URL is built for direct (deep-link) navigation
+    Search on the homepage ends up on PATH, sample information goes in the query string.
+    Only parameters in SAMPLE_PARAMS are sent. They are not confirmed on varsome.com yet, so direct
+    mode is off (RunSettings.DIRECT_MODE) - python -m tools.compare_modes --live checks them"""
+    
+    PATH = "/variant/{genome}/{variant}"
+    
+    # Sample profile field -> query parameter name
+    SAMPLE_PARAMS = {
+        "annotation_mode": "annotation-mode",
+        "phenotype_code": "patient-phenotypes",
+        "sex": "patient-sex",
+        "age": "patient-age",
+        "ethnicity": "patient-ethnicity",
+    }
 
 
 class TestData:
     """Test data values - keeping them separate from code"""
     
-    # Website URL
-    BASE_URL = "https://varsome.com"
+    # Website URL - VARSOME_BASE_URL points the tests at a local stand-in server instead
+    BASE_URL = os.environ.get("VARSOME_BASE_URL", "https://varsome.com")
     
     # Variant to test
     VARIANT = "BRAF:V600E"
@@ -93,4 +151,165 @@ class TestData:
     TIMEOUT_SHORT = 5
     TIMEOUT_MEDIUM = 10
     TIMEOUT_LONG = 20
-    TIMEOUT_EXTRA_LONG = 30
\ No newline at end of file
+    TIMEOUT_EXTRA_LONG = 30
+
+
+class RunSettings:
+    """Settings for running many variants at once (run_matrix.py)
+    Kept next to test data so everything configurable lives in one file"""
+    
+    # Rough memory one Chrome instance needs on the results page - used to size workers
+    BROWSER_MEMORY_MB = 700
+    
+    # Never start more workers than this even on big machines
+    MAX_WORKERS = 16
+    
+    # Browser profile: "default" is a normal maximized window, "lean" is headless with request blocking
+    # Can be changed per run with the VARSOME_PROFILE environment variable
+    BROWSER_PROFILE = "default"
+    LEAN_WINDOW_SIZE = (1366, 900)
+    
+    # Requests the lean profile never downloads - nothing in them matters for the verdict checks
+    LEAN_BLOCKED_URL_PATTERNS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*googlesyndication.com*", "*hotjar.com*", "*facebook.net*", "*linkedin.com*",
+    ]
+    
+    # Where chromedriver / Chrome were found last time (framework/driver_cache.py)
+    # Set the paths to pin them, or use VARSOME_CHROMEDRIVER / VARSOME_CHROME_BINARY
+    DRIVER_CACHE_FILE = ".driver_cache.json"
+    CHROMEDRIVER_PATH = ""
+    CHROME_BINARY = ""
+    
+    # Pre-seeded profile template (framework/browser_profile.py) - consent and popups already done
+    # Empty means every browser starts fresh. Also set with VARSOME_PROFILE_TEMPLATE
+    PROFILE_TEMPLATE = ""
+    DEFAULT_PROFILE_TEMPLATE = ".profile_template"
+    
+    # Multi-tab runs (framework/tab_manager.py, run_matrix.py --tabs) - one browser, one tab per journey
+    TAB_WAIT_SLICE = 0.25  # Seconds one tab may block the browser with a DOM wait before others get a turn
+    BACKGROUND_TAB_FLAGS = [
+        "--disable-background-timer-throttling",
+        "--disable-backgrounding-occluded-windows",
+        "--disable-renderer-backgrounding",
+    ]
+    
+    # Record network events (Chrome performance log) so pages can wait for API responses
+    CAPTURE_NETWORK = True
+    # Wait for the ApiEndpoints responses before checking the results page. Off until the patterns
+    # are confirmed from a performance log of varsome.com - they only match the stand-in server.
+    # VARSOME_NETWORK_READINESS=1 turns it on
+    NETWORK_READINESS = os.environ.get("VARSOME_NETWORK_READINESS", "0") != "0"
+    
+    # A warm browser is quit and replaced after this many journeys
+    DRIVER_MAX_USES = 20
+    
+    # ...or once it uses more memory than this (checked between journeys, 0 = never)
+    # Also set with VARSOME_MEMORY_LIMIT_MB or run_matrix.py --memory-limit
+    BROWSER_MEMORY_LIMIT_MB = int(os.environ.get("VARSOME_MEMORY_LIMIT_MB", "1500"))
+    MEMORY_SAMPLE_INTERVAL = 5  # Seconds between samples for the memory timeline in the report
+    
+    # "full" journey searches on the homepage and fills the modal, "direct" opens the results URL
+    # Default for variants whose list row has no mode column (VARSOME_JOURNEY_MODE or run_matrix.py --mode)
+    JOURNEY_MODE = os.environ.get("VARSOME_JOURNEY_MODE", "full")
+    # Direct journeys are off - they run as full ones - until ResultsUrl.SAMPLE_PARAMS are confirmed on
+    # the live site and tools.compare_modes shows both modes reach the same verdict.
+    # VARSOME_DIRECT_MODE=1 or run_matrix.py --allow-direct turns them on
+    DIRECT_MODE = os.environ.get("VARSOME_DIRECT_MODE", "0") != "0"
+    
+    # Sample information profiles (framework/sample_profiles.py) - JSON files in PROFILES_DIR
+    # SAMPLE_PROFILE is used for variants without a profile column (or set VARSOME_SAMPLE_PROFILE)
+    PROFILES_DIR = "profiles"
+    SAMPLE_PROFILE = os.environ.get("VARSOME_SAMPLE_PROFILE", "default")
+    
+    # VCF variant lists (framework/variant_source.py) - a record is searched by its coordinates
+    # The expected verdict comes from the first of VCF_VERDICT_KEYS in INFO (ClinVar's CLNSIG etc.),
+    # the color from VCF_COLOR_KEY or else VERDICT_COLORS. VCF_GENE_KEYS are used by the gene filter
+    VCF_SEARCH_FORMAT = "chr{chrom}:{pos}:{ref}:{alt}"
+    VCF_VERDICT_KEYS = ["VARSOME_VERDICT", "CLNSIG"]
+    VCF_COLOR_KEY = "VARSOME_COLOR"
+    VCF_GENE_KEYS = ["GENE", "SYMBOL", "GENEINFO", "ANN"]
+    VERDICT_COLORS = {"Pathogenic": "red", "Benign": "green"}
+    
+    # Scheduling (framework/scheduler.py) - "lpt" runs the longest expected journeys first, from the
+    # durations in SCHEDULE_HISTORY_FILE; "fifo" keeps list order. VARSOME_SCHEDULE or run_matrix.py --schedule
+    SCHEDULE = os.environ.get("VARSOME_SCHEDULE", "lpt")
+    SCHEDULE_HISTORY_FILE = ".journey_history.json"
+    SCHEDULE_HISTORY_SIZE = 20  # Durations kept per variant
+    SCHEDULE_WINDOW = 2000  # Variants read and ordered at a time - bounds memory for big VCFs
+    SCHEDULE_DEFAULT_DURATION = 30  # Expected seconds for a variant when there is no history at all
+    # --flaky-first: variants that failed in at least FLAKY_FAILURE_RATE of FLAKY_MIN_RUNS+ runs go first
+    SCHEDULE_FLAKY_FIRST = False
+    FLAKY_FAILURE_RATE = 0.2
+    FLAKY_MIN_RUNS = 3
+    
+    # Throttle (framework/throttle.py) - journeys in flight across all workers. A token bucket of
+    # THROTTLE_RATE_PER_MIN starts, and a limit that grows by one per limit's worth of clean journeys
+    # and is multiplied by THROTTLE_BACKOFF on a security check, timeout or a time to results over
+    # THROTTLE_SLOW_FACTOR x the usual. VARSOME_THROTTLE=0 or run_matrix.py --no-throttle turns it off
+    THROTTLE = os.environ.get("VARSOME_THROTTLE", "1") != "0"
+    THROTTLE_RATE_PER_MIN = 120
+    THROTTLE_MIN_RATE_PER_MIN = 2
+    THROTTLE_RATE_STEP = 1  # Starts/min added back after every clean journey
+    THROTTLE_BACKOFF = 0.5
+    THROTTLE_SLOW_FACTOR = 2.5
+    THROTTLE_MIN_SAMPLES = 5  # Clean journeys needed before anything counts as slow
+    THROTTLE_HISTORY_SIZE = 30
+    THROTTLE_LEVEL_SECONDS = 120  # Time at a limit before its journeys per minute are compared
+    
+    # A failed journey step is retried this many times, from the last checkpoint before it
+    # (after search, after the modal, after results load) - VARSOME_JOURNEY_RETRIES or run_matrix.py --retries
+    JOURNEY_RETRIES = int(os.environ.get("VARSOME_JOURNEY_RETRIES", "1"))
+    
+    # Offline benchmarks (benchmarks/run_benchmarks.py) - a median slower than the baseline by more
+    # than BENCHMARK_TOLERANCE (and by more than BENCHMARK_NOISE_FLOOR seconds) is a regression
+    BENCHMARK_BASELINE = "benchmarks/baseline.json"
+    BENCHMARK_REPEAT = 5
+    BENCHMARK_TOLERANCE = 0.2
+    BENCHMARK_NOISE_FLOOR = 0.01
+    
+    # Where run reports are written
+    RESULTS_DIR = "results"
+    
+    # Timing traces (VARSOME_TRACE=1) - JSON plus Chrome trace-event files
+    TRACE_DIR = "traces"
+    
+    # Adaptive timeouts (framework/timeout_policy.py) - the TestData TIMEOUT_* values stay the upper bound
+    # Once a wait has TIMEOUT_MIN_SAMPLES past durations its deadline is p99 x TIMEOUT_MARGIN
+    # Turn off with VARSOME_ADAPTIVE_TIMEOUTS=0
+    ADAPTIVE_TIMEOUTS = True
+    TIMEOUT_HISTORY_FILE = ".timeout_history.json"
+    TIMEOUT_HISTORY_SIZE = 200  # Durations kept per wait
+    TIMEOUT_MIN_SAMPLES = 20
+    TIMEOUT_MARGIN = 3.0
+    TIMEOUT_FLOOR = 2.0  # Never wait less than this, however fast the wait used to be
+    # Waits that start this many seconds after a navigation (mark_navigation) have their own history -
+    # a locator that is instant on a loaded page must not shrink the deadline for a cold load
+    TIMEOUT_LOAD_PHASE = 15
+    TIMEOUT_POLL_MIN = 0.05  # Polled waits start checking this often...
+    TIMEOUT_POLL_MAX = 0.5  # ...and back off to the old WebDriverWait interval
+    TIMEOUT_POLL_BACKOFF = 1.5
+    
+    # Which alternative of each CompositeLocator is tried first - shared by all runs
+    # A fallback only takes over after winning a majority of the last LOCATOR_PRIORITY_WINDOW races
+    LOCATOR_PRIORITY_FILE = ".locator_priority.json"
+    LOCATOR_PRIORITY_WINDOW = 20
+    LOCATOR_PRIORITY_MIN_WINS = 5
+    
+    # Screenshots (framework/evidence.py) - written in the background, oldest removed first
+    EVIDENCE_DIR = "evidence"
+    EVIDENCE_FORMAT = "png"  # "jpeg" or "webp" are much smaller but need Pillow
+    EVIDENCE_QUALITY = 80
+    EVIDENCE_MAX_WIDTH = None  # e.g. 1280 to downscale big full window screenshots (needs Pillow)
+    EVIDENCE_MAX_FILES = 500
+    EVIDENCE_MAX_AGE_DAYS = 14
+    EVIDENCE_MAX_TOTAL_MB = 200
+    
+    # Failure artifacts (framework/failure_capture.py) - artifacts/<run_id>/<variant>/
+    ARTIFACTS_DIR = "artifacts"
+    FAILURE_CAPTURE_TIMEOUT = 5  # Seconds - a hung page only costs this much
+    FAILURE_CAPTURE_GRACE = 5  # Seconds a late collector gets to finish its last command, then the browser is dropped
+    FAILURE_MAX_DOM_KB = 2048
+    FAILURE_MAX_LOG_ENTRIES = 1000  # Console and network entries, newest kept
\ No newline at end of file
@@ -2,56 +2,283 @@
 Base Page class with common methods for all pages
 """
 
+import json
 import time
-from selenium.webdriver.support.ui import WebDriverWait
+import zlib
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.select import Select
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
-from locators import TestData
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException, StaleElementReferenceException, JavascriptException, WebDriverException
+from locators import TestData, RunSettings, CompositeLocator
+from framework.locator_index import LocatorIndex
+from framework.locator_priority import get_priority_store
+from framework.evidence import get_evidence_writer
+from framework.tab_manager import hold_tab
+from framework.timeout_policy import get_timeout_policy, wait_phase
+from framework.tracing import traced
+
+
+# JavaScript helpers available inside every wait_for_dom condition
+# findAll(locator) understands the same (By, value) tuples as Selenium
+DOM_HELPERS_JS = """
+var findAll = function(locator, root) {
+    var by = locator[0], value = locator[1];
+    root = root || document;
+    var doc = root.ownerDocument || root;
+    if (by === 'id' && root === doc) {
+        var el = doc.getElementById(value);
+        return el ? [el] : [];
+    }
+    if (by === 'id') { return Array.prototype.slice.call(root.querySelectorAll('[id="' + value + '"]')); }
+    if (by === 'xpath') {
+        var snapshot = doc.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var found = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { found.push(snapshot.snapshotItem(i)); }
+        return found;
+    }
+    var css = value;
+    if (by === 'name') { css = '[name="' + value + '"]'; }
+    if (by === 'class name') { css = '.' + value; }
+    if (by === 'tag name') { css = value; }
+    return Array.prototype.slice.call(root.querySelectorAll(css));
+};
+var isVisible = function(el) {
+    if (!el || !el.isConnected) { return false; }
+    var style = el.ownerDocument.defaultView.getComputedStyle(el);
+    if (style.visibility === 'hidden' || style.display === 'none' || style.opacity === '0') { return false; }
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+};
+var firstVisible = function(locator) {
+    var all = findAll(locator);
+    for (var i = 0; i < all.length; i++) { if (isVisible(all[i])) { return all[i]; } }
+    return null;
+};
+"""
+
+# Wait engine - checks the condition right away, then again on every DOM mutation
+# The 100ms interval catches things mutations dont report like CSS transitions, scrolling or URL changes
+WAIT_FOR_DOM_JS = """
+var args = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+%s
+var lastMutation = Date.now();
+var quietFor = function() { return Date.now() - lastMutation; };
+var condition = function(args) { %s };
+var finished = false, observer = null, timer = null, poll = null;
+var finish = function(value) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearInterval(poll);
+    done(value === undefined ? null : value);
+};
+var check = function() {
+    try {
+        var value = condition(args);
+        if (value) { finish(value); }
+    } catch (e) { /* page is changing under us - try again on the next mutation */ }
+};
+check();
+if (!finished) {
+    observer = new MutationObserver(function() { lastMutation = Date.now(); check(); });
+    observer.observe(document.documentElement || document,
+                     {childList: true, subtree: true, attributes: true, characterData: true});
+    poll = setInterval(check, 100);
+    timer = setTimeout(function() { finish(null); }, timeoutMs);
+}
+"""
+
+# One pass over the page and its same-origin iframes that clicks every visible overlay button
+# Cross-origin iframes cant be read from JavaScript so we return their index for a Selenium fallback
+OVERLAY_SWEEP_JS = DOM_HELPERS_JS + """
+var overlays = arguments[0];
+var dismissed = [], blockedFrames = [];
+var sweep = function(root) {
+    for (var i = 0; i < overlays.length; i++) {
+        var all = findAll(overlays[i][1], root);
+        for (var j = 0; j < all.length; j++) {
+            if (isVisible(all[j])) { all[j].click(); dismissed.push(overlays[i][0]); break; }
+        }
+    }
+};
+sweep(document);
+var frames = document.getElementsByTagName('iframe');
+for (var f = 0; f < frames.length; f++) {
+    var frameDoc = null;
+    try { frameDoc = frames[f].contentDocument; } catch (e) {}
+    if (frameDoc) { sweep(frameDoc); }
+    else if (isVisible(frames[f])) { blockedFrames.push(f); }
+}
+return {dismissed: dismissed, blocked_frames: blockedFrames};
+"""
+
+# Background version of the sweep - runs in the page and clicks overlays the moment they show up
+# Installed for every new document so it keeps working after navigation. Clicks are logged
+# in sessionStorage so the test can still see what happened (e.g. a security check)
+OVERLAY_WATCHER_JS = """
+(function() {
+    if (window.__overlayWatcher) { return; }
+    window.__overlayWatcher = true;
+    %s
+    var overlays = %s;
+    var clicked = new WeakSet(), pending = false;
+    var log = function(name) {
+        try {
+            var entries = JSON.parse(sessionStorage.getItem('__overlayWatcherLog') || '[]');
+            entries.push({name: name, time: Date.now(), url: location.href});
+            sessionStorage.setItem('__overlayWatcherLog', JSON.stringify(entries));
+        } catch (e) { /* sandboxed frame without storage */ }
+    };
+    var sweep = function() {
+        pending = false;
+        for (var i = 0; i < overlays.length; i++) {
+            var all = findAll(overlays[i][1]);
+            for (var j = 0; j < all.length; j++) {
+                if (!clicked.has(all[j]) && isVisible(all[j])) {
+                    clicked.add(all[j]);
+                    all[j].click();
+                    log(overlays[i][0]);
+                    break;
+                }
+            }
+        }
+    };
+    var schedule = function() {
+        if (!pending) { pending = true; setTimeout(sweep, 50); }
+    };
+    new MutationObserver(schedule).observe(document, {childList: true, subtree: true, attributes: true,
+                                                      attributeFilter: ['style', 'class', 'hidden']});
+    schedule();
+})();
+"""
+
+# Conditions used by wait_for_locator
+LOCATOR_STATE_CONDITIONS = {
+    "present": "var all = findAll(args[0]); return all.length ? all[0] : null;",
+    "visible": "return firstVisible(args[0]);",
+    "hidden": "return firstVisible(args[0]) === null;",
+    "clickable": "var el = firstVisible(args[0]); return el && !el.disabled ? el : null;",
+}
+
+# Races the alternatives of a CompositeLocator - returns [index, element] of the first one that matches
+# args[0] is the list of locators in priority order, args[1] is the state we need, args[2] is where
+# the primary locator is in that list - if it matches in the same poll it wins over any fallback
+RACE_LOCATORS_JS = """
+var matches = function(locator, state) {
+    if (state === 'present') { var all = findAll(locator); return all.length ? all[0] : null; }
+    var el = firstVisible(locator);
+    if (state === 'clickable' && el && el.disabled) { return null; }
+    return el;
+};
+for (var i = 0; i < args[0].length; i++) {
+    var el = matches(args[0][i], args[1]);
+    if (el) {
+        var primary = i < args[2] ? matches(args[0][args[2]], args[1]) : null;
+        return primary ? [args[2], primary] : [i, el];
+    }
+}
+return null;
+"""
+
+
+# What chromedriver says when the page goes away under a running script - a JavascriptException
+# too, but it means navigation, not a broken condition
+NAVIGATION_ERRORS = ("document unloaded", "execution context was destroyed", "target navigated or closed")
+
+
+def is_navigation_error(error):
+    message = (getattr(error, "msg", None) or str(error)).lower()
+    return any(text in message for text in NAVIGATION_ERRORS)
 
 
 class BasePage:
     """Base class to initialize the base page that will be inherited by all pages"""
     
+    # Locators the page looks up often without waiting - resolved together by find_indexed
+    INDEXED_LOCATORS = {}
+    
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, TestData.TIMEOUT_MEDIUM)
-        self.wait_short = WebDriverWait(driver, TestData.TIMEOUT_SHORT)
-        self.wait_long = WebDriverWait(driver, TestData.TIMEOUT_LONG)
+        self.timeouts = get_timeout_policy()
+        self._locator_index = None
+    
+    @property
+    def locator_index(self):
+        """framework.locator_index.LocatorIndex of INDEXED_LOCATORS, made on first use"""
+        if self._locator_index is None:
+            self._locator_index = LocatorIndex(self.driver, self.INDEXED_LOCATORS, key=type(self).__name__)
+        return self._locator_index
+    
+    @traced
+    def find_indexed(self, name, state="visible"):
+        """Element from the page's locator index, or None - doesnt wait
+        All INDEXED_LOCATORS are resolved in one call and reused until the DOM changes"""
+        try:
+            return self.locator_index.find(name, state)
+        except WebDriverException:
+            return None  # Page is navigating
+    
+    @staticmethod
+    def _wait_key(state, locator):
+        """Name a wait is remembered under in the timeout history"""
+        if isinstance(locator, CompositeLocator):
+            return f"{state}:{locator.name}"
+        return f"{state}:{locator[0]}={locator[1]}"
+    
+    def _phase_key(self, key):
+        """Key plus the page-load phase - waits right after a navigation are learned apart from
+        lookups on a page that is already there, which would otherwise shrink the cold-load deadline"""
+        return f"{key}@{wait_phase(self.driver)}"
+    
+    def _wait_for(self, condition, key, timeout):
+        """Poll an expected condition like WebDriverWait, but with the learned deadline
+        (timeout is only the upper bound) and short first polls that back off to 0.5s"""
+        def check():
+            try:
+                return condition(self.driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                return False
+        return self.timeouts.wait_until(check, self._phase_key(key), timeout)
         
+    @traced
     def get_element(self, locator, timeout=None):
         """Wait for element to be present in DOM and return it
         I use this method everywhere to avoid hardcoded waits"""
-        wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_MEDIUM)
-        try:
-            return wait.until(EC.presence_of_element_located(locator))
-        except TimeoutException:
+        if isinstance(locator, CompositeLocator):
+            return self.race_locator(locator, "present", timeout)
+        element = self._wait_for(EC.presence_of_element_located(locator), self._wait_key("present", locator),
+                                 timeout or TestData.TIMEOUT_MEDIUM)
+        if element is None:
             print(f"Element not found with locator: {locator}")
-            return None
+        return element
     
+    @traced
     def get_visible_element(self, locator, timeout=None):
         """Get element only when its visible on page
         Sometimes element exists in DOM but not visible yet"""
-        wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_MEDIUM)
-        try:
-            return wait.until(EC.visibility_of_element_located(locator))
-        except TimeoutException:
+        if isinstance(locator, CompositeLocator):
+            return self.race_locator(locator, "visible", timeout)
+        element = self._wait_for(EC.visibility_of_element_located(locator), self._wait_key("visible", locator),
+                                 timeout or TestData.TIMEOUT_MEDIUM)
+        if element is None:
             print(f"Element not visible: {locator}")
-            return None
+        return element
     
+    @traced
     def get_clickable_element(self, locator, timeout=None):
         """Wait until element is ready to be clicked
         Important for buttons that might be disabled initially"""
-        wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_MEDIUM)
-        try:
-            return wait.until(EC.element_to_be_clickable(locator))
-        except TimeoutException:
+        if isinstance(locator, CompositeLocator):
+            return self.race_locator(locator, "clickable", timeout)
+        element = self._wait_for(EC.element_to_be_clickable(locator), self._wait_key("clickable", locator),
+                                 timeout or TestData.TIMEOUT_MEDIUM)
+        if element is None:
             print(f"Element not clickable: {locator}")
-            return None
+        return element
     
+    @traced
     def click(self, locator, timeout=None):
         """Click element with retry logic
         Sometimes regular click doesnt work so I added JavaScript click as backup"""
@@ -66,6 +293,7 @@ class BasePage:
                 return True
         return False
     
+    @traced
     def type_text(self, locator, text, clear_first=True, timeout=None):
         """Type text into input field
         Usually we want to clear field first to avoid mixing old and new text"""
@@ -77,6 +305,7 @@ class BasePage:
             return True
         return False
     
+    @traced
     def select_dropdown_by_text(self, locator, text, timeout=None):
         """Select dropdown option by typing the text
         I found that typing works better than using Select class sometimes"""
@@ -92,61 +321,156 @@ class BasePage:
                 return True
         return False
     
+    @traced
     def get_text(self, locator, timeout=None):
         """Get text content from element"""
         element = self.get_visible_element(locator, timeout)
         return element.text if element else ""
     
+    @traced
     def get_attribute(self, locator, attribute, timeout=None):
         """Get any attribute value from element like value, class, id etc"""
         element = self.get_element(locator, timeout)
         return element.get_attribute(attribute) if element else None
     
+    @traced
     def is_element_present(self, locator, timeout=None):
         """Check if element exists in DOM (doesnt have to be visible)"""
-        try:
-            wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_SHORT)
-            wait.until(EC.presence_of_element_located(locator))
-            return True
-        except TimeoutException:
-            return False
+        if isinstance(locator, CompositeLocator):
+            return self.race_locator(locator, "present", timeout or TestData.TIMEOUT_SHORT, quiet=True) is not None
+        return self._wait_for(EC.presence_of_element_located(locator), self._wait_key("present", locator),
+                              timeout or TestData.TIMEOUT_SHORT) is not None
     
+    @traced
     def is_element_visible(self, locator, timeout=None):
         """Check if element is actually visible on screen"""
-        try:
-            wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_SHORT)
-            wait.until(EC.visibility_of_element_located(locator))
-            return True
-        except TimeoutException:
-            return False
+        if isinstance(locator, CompositeLocator):
+            return self.race_locator(locator, "visible", timeout or TestData.TIMEOUT_SHORT, quiet=True) is not None
+        return self._wait_for(EC.visibility_of_element_located(locator), self._wait_key("visible", locator),
+                              timeout or TestData.TIMEOUT_SHORT) is not None
     
+    @traced
     def wait_for_element_to_disappear(self, locator, timeout=None):
         """Wait for loading spinners or popups to disappear"""
-        try:
-            wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_MEDIUM)
-            wait.until(EC.invisibility_of_element_located(locator))
-            return True
-        except TimeoutException:
-            return False
+        if isinstance(locator, CompositeLocator):
+            return bool(self.wait_for_dom(
+                "for (var i = 0; i < args[0].length; i++) { if (firstVisible(args[0][i])) { return false; } }"
+                "return true;",
+                [list(alt) for alt in locator.alternatives], timeout=timeout or TestData.TIMEOUT_MEDIUM,
+                key=self._wait_key("hidden", locator)))
+        return self._wait_for(EC.invisibility_of_element_located(locator), self._wait_key("hidden", locator),
+                              timeout or TestData.TIMEOUT_MEDIUM) is not None
     
+    @traced
     def wait_for_url_contains(self, text, timeout=None):
         """Wait for URL to contain specific text - useful for navigation checks"""
+        return self._wait_for(EC.url_contains(text), f"url:{text}", timeout or TestData.TIMEOUT_MEDIUM) is not None
+    
+    @traced
+    def wait_for_dom(self, condition_js, *args, timeout=None, key=None):
+        """Wait until a JavaScript condition is true inside the browser
+        The condition is a function body that gets args and returns something truthy when done.
+        It is checked on every DOM mutation so we return as soon as the page is ready
+        instead of sleeping a fixed time. Returns the condition result or None on timeout,
+        a JavaScript error in the condition is raised (JavascriptException).
+        timeout is the upper bound - the deadline is learned per key (see framework.timeout_policy)"""
+        key = self._phase_key(key or f"dom:{zlib.crc32(condition_js.encode()):08x}")
+        started = time.time()
+        deadline = started + self.timeouts.deadline(key, timeout or TestData.TIMEOUT_MEDIUM)
+        script = WAIT_FOR_DOM_JS % (DOM_HELPERS_JS, condition_js)
+        
+        # A tab of a shared browser (framework.tab_manager) waits in short slices so the
+        # other tabs get their commands in between - an async script blocks the whole browser
+        wait_slice = getattr(self.driver, "wait_slice", None)
+        
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.timeouts.record_timeout(key)
+                return None
+            if wait_slice:
+                remaining = min(remaining, wait_slice)
+            self._ensure_script_timeout(remaining)
+            try:
+                result = self.driver.execute_async_script(script, list(args), int(remaining * 1000))
+            except StaleElementReferenceException:
+                raise  # An element we passed in is gone - caller decides what that means
+            except WebDriverException as e:
+                if isinstance(e, JavascriptException) and not is_navigation_error(e):
+                    raise  # A bug in the condition - retrying it until the timeout wont help
+                # Page navigated while we were waiting - observer is gone, start again on new page
+                # once it had a moment to load, instead of hammering the browser with new scripts
+                time.sleep(min(RunSettings.TIMEOUT_POLL_MIN, max(0, deadline - time.time())))
+                result = None
+            if result:
+                self.timeouts.record(key, time.time() - started)
+                return result
+    
+    @traced
+    def wait_for_locator(self, locator, state="visible", timeout=None):
+        """Wait until element reaches a state: present, visible, hidden or clickable
+        Returns the element (or True for hidden) as soon as it happens, None on timeout"""
+        return self.wait_for_dom(LOCATOR_STATE_CONDITIONS[state], list(locator), timeout=timeout,
+                                 key=self._wait_key(state, locator))
+    
+    @traced
+    def race_locator(self, composite, state="visible", timeout=None, quiet=False):
+        """Wait for any alternative of a CompositeLocator in one go and return the element
+        Alternatives are checked in learned priority order; the winner is recorded for next time"""
+        store = get_priority_store()
+        ordered = store.ordered(composite)
+        found = self.wait_for_dom(RACE_LOCATORS_JS, [list(alt) for alt in ordered], state,
+                                  ordered.index(composite.alternatives[0]),
+                                  timeout=timeout or TestData.TIMEOUT_MEDIUM, key=self._wait_key(state, composite))
+        if not found:
+            if not quiet:
+                print(f"Element not {state} with any locator of: {composite}")
+            return None
+        
+        index, element = found
+        store.record_win(composite, ordered[index])
+        return element
+    
+    @traced
+    def wait_for_element_gone(self, element, timeout=None):
+        """Wait until a specific element is removed or hidden - e.g. a popup after clicking close"""
         try:
-            wait = WebDriverWait(self.driver, timeout or TestData.TIMEOUT_MEDIUM)
-            wait.until(EC.url_contains(text))
-            return True
-        except TimeoutException:
-            return False
+            return bool(self.wait_for_dom("return !isVisible(args[0]);", element, timeout=timeout))
+        except StaleElementReferenceException:
+            return True  # Already removed from the page
     
+    @traced
+    def wait_for_dom_quiet(self, quiet_ms=500, timeout=None):
+        """Wait until the page stops changing for quiet_ms milliseconds
+        Replaces 'sleep and hope all data loaded' - returns early when the page is already settled"""
+        return bool(self.wait_for_dom("return quietFor() >= args[0];", quiet_ms, timeout=timeout,
+                                      key=f"quiet:{quiet_ms}"))
+    
+    def _ensure_script_timeout(self, seconds):
+        """Make sure Selenium doesnt kill our async wait script before its own timeout
+        Only sends the command when the current limit is too low"""
+        needed = int(seconds) + 5
+        if getattr(self.driver, "_wait_engine_script_timeout", 0) < needed:
+            self.driver.set_script_timeout(max(needed, TestData.TIMEOUT_EXTRA_LONG + 5))
+            self.driver._wait_engine_script_timeout = max(needed, TestData.TIMEOUT_EXTRA_LONG + 5)
+    
+    @traced
     def scroll_to_element(self, locator, timeout=None):
-        """Scroll to element - sometimes elements are not in viewport"""
+        """Scroll to element - sometimes elements are not in viewport
+        Waits until the element stopped moving inside the viewport (smooth scroll animations)"""
         element = self.get_element(locator, timeout)
         if element:
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            self.wait_short.until(lambda driver: True)  # Small wait for scroll
+            self.wait_for_dom(
+                "var rect = args[0].getBoundingClientRect();"
+                "var settled = args.lastTop === rect.top;"
+                "args.lastTop = rect.top;"
+                "return settled && rect.top < window.innerHeight && rect.bottom > 0;",
+                element, timeout=TestData.TIMEOUT_SHORT)
             return True
         return False
     
+    @traced
     def press_key(self, locator, key, timeout=None):
         """Press specific key on element"""
         element = self.get_element(locator, timeout)
@@ -155,54 +479,105 @@ class BasePage:
             return True
         return False
     
+    @traced
     def press_enter(self, locator, timeout=None):
         """Press Enter key - useful for form submissions"""
         return self.press_key(locator, Keys.ENTER, timeout)
     
-    def take_screenshot(self, filename):
-        """Take screenshot for test evidence"""
-        self.driver.save_screenshot(filename)
-        print(f"Screenshot saved as: {filename}")
+    @traced
+    def take_screenshot(self, filename, element=None):
+        """Take screenshot for test evidence - of the whole window or just one element
+        Writing happens in the background, returns the path the file ends up at"""
+        path = get_evidence_writer().capture(self.driver, filename, element)
+        print(f"Screenshot saved as: {path}")
+        return path
     
+    @traced
     def get_current_url(self):
         """Get current page URL"""
         return self.driver.current_url
     
+    @traced
     def wait_for_page_load(self):
         """Wait for page to load completely by checking document state"""
-        self.wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+        loaded = self._wait_for(lambda driver: driver.execute_script("return document.readyState") == "complete",
+                                "page_load", TestData.TIMEOUT_MEDIUM)
+        if not loaded:
+            raise TimeoutException("Page did not finish loading")
     
-    def close_update_popup(self):
-        """Close VarSome update popup that sometimes appears in iframe
-        This popup can block our test so we need to handle it"""
+    @traced
+    def dismiss_overlays(self):
+        """Find and close every known popup (cookies, update, warning, security) in one go
+        One script call covers the page and same-origin iframes, so popups that are not
+        there cost nothing. Returns names of the overlays that were dismissed"""
         from locators import Locators
         
-        time.sleep(2)  # Give popup time to appear
-        
+        overlays = [[name, list(locator)] for name, locator in Locators.INTERRUPTION_OVERLAYS.items()]
         try:
-            # Look for iframes since popup might be inside one
-            iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
-            
-            for iframe in iframes:
-                try:
-                    self.driver.switch_to.frame(iframe)
-                    
-                    # Try to find and click close button
-                    element = WebDriverWait(self.driver, 2).until(
-                        EC.element_to_be_clickable(Locators.VERSION_POPUP_CLOSE)
-                    )
-                    
-                    if element:
-                        element.click()
-                        print("Update popup closed successfully")
+            outcome = self.driver.execute_script(OVERLAY_SWEEP_JS, overlays)
+        except WebDriverException:
+            return []  # Page is navigating - watcher will catch anything that shows up
+        dismissed = outcome["dismissed"]
+        
+        # Update popup can live in a cross-origin iframe that JavaScript cant look into
+        # Other tabs of a shared browser must not switch windows while we are inside a frame
+        if outcome["blocked_frames"]:
+            with hold_tab(self.driver):
+                iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
+                for index in outcome["blocked_frames"]:
+                    try:
+                        self.driver.switch_to.frame(iframes[index])
+                        buttons = self.driver.find_elements(*Locators.VERSION_POPUP_CLOSE)  # No wait here
+                        if buttons and buttons[0].is_displayed():
+                            buttons[0].click()
+                            dismissed.append("update_popup")
+                    except (WebDriverException, IndexError):
+                        pass
+                    finally:
                         self.driver.switch_to.default_content()
-                        time.sleep(1)
-                        return True
-                except:
-                    self.driver.switch_to.default_content()
-                    continue
-                    
-        except:
-            self.driver.switch_to.default_content()
         
+        for name in dismissed:
+            print(f"Dismissed overlay: {name}")
+        return dismissed
+    
+    @traced
+    def install_overlay_watcher(self):
+        """Keep dismissing popups in the background while the test runs
+        Uses Chrome DevTools to add the watcher to every new page, and also starts it on the current one"""
+        from locators import Locators
+        
+        if getattr(self.driver, "_overlay_watcher_installed", False):
+            return True
+        
+        overlays = [[name, list(locator)] for name, locator in Locators.INTERRUPTION_OVERLAYS.items()]
+        script = OVERLAY_WATCHER_JS % (DOM_HELPERS_JS, json.dumps(overlays))
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
+            self.driver.execute_script(script)
+        except (WebDriverException, AttributeError):
+            print("Could not install overlay watcher - popups will be handled one by one")
+            return False
+        
+        self.driver._overlay_watcher_installed = True
+        return True
+    
+    @traced
+    def overlay_watcher_log(self, clear=True):
+        """Get the overlays the background watcher clicked on this tab
+        Each entry has name, time and url"""
+        script = "var log = sessionStorage.getItem('__overlayWatcherLog') || '[]';"
+        if clear:
+            script += "sessionStorage.removeItem('__overlayWatcherLog');"
+        try:
+            return json.loads(self.driver.execute_script(script + "return log;"))
+        except (WebDriverException, ValueError):
+            return []
+    
+    @traced
+    def close_update_popup(self):
+        """Close VarSome update popup that sometimes appears in iframe
+        This popup can block our test so we need to handle it"""
+        if "update_popup" in self.dismiss_overlays():
+            print("Update popup closed successfully")
+            return True
         return False
\ No newline at end of file
@@ -4,6 +4,7 @@ HomePage Page Object for VarSome website
 
 from pages.base_page import BasePage
 from locators import Locators, TestData
+from framework.timeout_policy import mark_navigation
 from selenium.webdriver.common.by import By
 
 
@@ -16,61 +17,44 @@ class HomePage(BasePage):
     def navigate_to_homepage(self):
         """Navigate to VarSome homepage and handle initial popups"""
         print("Navigating to VarSome homepage...")
+        # Watcher clicks cookie banner, update popup etc. whenever they show up on any page
+        self.install_overlay_watcher()
         self.driver.get(TestData.BASE_URL)
+        mark_navigation(self.driver)
         self.wait_for_page_load()
         
-        # Handle cookie consent that usually appears
-        self.handle_cookie_consent()
-        self.close_update_popup()  # Sometimes theres an update popup
+        # One pass for anything that is already there (cookie consent usually is)
+        self.dismiss_overlays()
         
         return self.is_homepage_loaded()
     
     def is_homepage_loaded(self):
         """Check if homepage loaded properly by looking for search input"""
-        # Try both possible search input locators
-        return self.is_element_visible(Locators.SEARCH_INPUT) or \
-               self.is_element_visible(Locators.SEARCH_INPUT_ALT)
+        # Both possible search input locators are checked at the same time
+        return self.is_element_visible(Locators.SEARCH_INPUT_ANY)
     
     def handle_cookie_consent(self):
         """Handle cookie consent popup if it appears
-        The cookie banner uses OneTrust and has a specific accept button ID"""
-        try:
-            # Wait a bit for cookie banner to appear
-            import time
-            time.sleep(2)
-            
-            # Try to click the accept cookies button
-            cookie_accept_btn = (By.ID, "onetrust-accept-btn-handler")
-            if self.is_element_present(cookie_accept_btn, timeout=3):
-                if self.click(cookie_accept_btn):
-                    print("Cookie consent accepted")
-                    time.sleep(1)  # Wait for banner to disappear
-                    return True
-            
-            # If button not found, cookie banner might not be present
-            print("No cookie banner found or already accepted")
-                    
-        except Exception as e:
-            print(f"Cookie consent handling skipped: {e}")
-            
+        The cookie banner uses OneTrust - dismiss_overlays clicks it together with any other popup"""
+        if "cookie_consent" in self.dismiss_overlays():
+            print("Cookie consent accepted")
+            return True
+        
+        # If button not found, cookie banner might not be present
+        print("No cookie banner found or already accepted")
         return False
     
     def enter_variant(self, variant_text):
         """Enter the variant text in search box
-        The search input can have different selectors so I try both"""
+        The search input can have different selectors so I race both"""
         print(f"Entering variant: {variant_text}")
-        if not self.type_text(Locators.SEARCH_INPUT, variant_text):
-            # Try alternative selector if first one fails
-            return self.type_text(Locators.SEARCH_INPUT_ALT, variant_text)
-        return True
+        return self.type_text(Locators.SEARCH_INPUT_ANY, variant_text)
     
     def select_genome(self, genome_version):
         """Select reference genome from dropdown
         Usually hg38 is default but we can select it explicitly"""
-        if self.is_element_present(Locators.GENOME_DROPDOWN):
-            return self.select_dropdown_by_text(Locators.GENOME_DROPDOWN, genome_version)
-        elif self.is_element_present(Locators.GENOME_DROPDOWN_ALT):
-            return self.select_dropdown_by_text(Locators.GENOME_DROPDOWN_ALT, genome_version)
+        if self.is_element_present(Locators.GENOME_DROPDOWN_ANY):
+            return self.select_dropdown_by_text(Locators.GENOME_DROPDOWN_ANY, genome_version)
         else:
             print(f"Genome dropdown not found - assuming {genome_version} is default")
             return True
@@ -78,8 +62,8 @@ class HomePage(BasePage):
     def verify_genome_is_hg38(self):
         """Verify that hg38 is selected as reference genome
         This is important because results can differ between genome versions"""
-        if self.is_element_present(Locators.GENOME_DROPDOWN):
-            value = self.get_attribute(Locators.GENOME_DROPDOWN, "value")
+        if self.is_element_present(Locators.GENOME_DROPDOWN_ANY):
+            value = self.get_attribute(Locators.GENOME_DROPDOWN_ANY, "value")
             if value and "hg38" in value.lower():
                 return True
         
@@ -94,22 +78,27 @@ class HomePage(BasePage):
         """Click search button to start variant search
         Sometimes the button is blocked by cookie banner so I retry"""
         print("Clicking search button...")
-        
-        if self.click(Locators.SEARCH_BUTTON):
+        clicked = self._click_search_button()
+        if clicked:
+            mark_navigation(self.driver)  # Modal or results page loads from here
+        return clicked
+    
+    def _click_search_button(self):
+        if self.click(Locators.SEARCH_BUTTON_ANY):
             return True
             
         # Maybe cookie banner is blocking, try to handle it again
         self.handle_cookie_consent()
         
-        if self.click(Locators.SEARCH_BUTTON_ALT):
+        if self.click(Locators.SEARCH_BUTTON_ANY, timeout=TestData.TIMEOUT_SHORT):
             return True
             
         # If still not working, use JavaScript click
-        search_btn = self.get_element(Locators.SEARCH_BUTTON)
+        search_btn = self.get_element(Locators.SEARCH_BUTTON_ANY, timeout=TestData.TIMEOUT_SHORT)
         if search_btn:
             self.driver.execute_script("arguments[0].click();", search_btn)
             print("Used JavaScript click for search button")
             return True
             
         # Last resort - press Enter in search field
-        return self.press_enter(Locators.SEARCH_INPUT)
\ No newline at end of file
+        return self.press_enter(Locators.SEARCH_INPUT_ANY)
\ No newline at end of file
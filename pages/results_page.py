@@ -2,22 +2,166 @@
 ResultsPage Page Object for VarSome variant results page
 """
 from selenium.webdriver.common.by import By
-from pages.base_page import BasePage
-from locators import Locators, TestData
+from pages.base_page import BasePage, DOM_HELPERS_JS
+from locators import Locators, TestData, RunSettings, ApiEndpoints, ResultsUrl
+from framework.network_monitor import endpoint_pattern
+from framework.locator_priority import get_priority_store
+from framework.timeout_policy import mark_navigation
+from urllib.parse import quote, urlencode
 import re
 
+
+def build_results_url(variant, genome=None, sample=None, base_url=None):
+    """Results page URL for a variant, e.g. https://varsome.com/variant/hg38/BRAF%3AV600E
+    sample is a profile from framework.sample_profiles - empty values and unknown keys are left out"""
+    path = ResultsUrl.PATH.format(genome=quote(genome or TestData.GENOME, safe=""),
+                                  variant=quote(variant, safe=""))
+    url = (base_url or TestData.BASE_URL).rstrip("/") + path
+    params = [(ResultsUrl.SAMPLE_PARAMS[key], value) for key, value in (sample or {}).items()
+              if key in ResultsUrl.SAMPLE_PARAMS and value not in (None, "")]
+    if params:
+        url += "?" + urlencode(params)
+    return url
+
+
+def color_name(css_color):
+    """Turn a css color like rgba(230, 0, 0, 1) into a simple name
+    Returns the original string if the color doesnt match a known verdict color"""
+    if css_color and ("rgb" in css_color or "rgba" in css_color):
+        # Extract RGB values using regex
+        rgb_match = re.search(r'rgba?\((\d+),\s*(\d+),\s*(\d+)', css_color)
+        if rgb_match:
+            r, g, b = int(rgb_match.group(1)), int(rgb_match.group(2)), int(rgb_match.group(3))
+            # Check if color is red (high R, low G and B)
+            if r > 150 and g < 50 and b < 50:
+                return "red"
+            # Benign verdicts use green
+            if g > 120 and r < 100 and b < 120:
+                return "green"
+    return css_color
+
+
+# Verdict pill, its colors and the ACMG criteria in one go
+# args[0] are verdict text locators in priority order, args[1] is the classification card
+VERDICT_SNAPSHOT_JS = """
+var span = null, locatorIndex = -1;
+for (var i = 0; i < args[0].length && !span; i++) {
+    span = firstVisible(args[0][i]);
+    locatorIndex = i;
+}
+// The primary locator wins over a broad fallback that matched in the same poll
+var primary = span && locatorIndex < args[2] ? firstVisible(args[0][args[2]]) : null;
+if (primary) { span = primary; locatorIndex = args[2]; }
+if (!span || !span.textContent.trim()) { return null; }
+
+// Color sits on the ColoredPill wrapper - walk up until we find a real background
+var pill = span.parentElement, background = 'rgba(0, 0, 0, 0)';
+for (var el = pill, depth = 0; el && depth < 4; el = el.parentElement, depth++) {
+    var bg = window.getComputedStyle(el).backgroundColor;
+    if (bg && bg !== 'transparent' && bg !== 'rgba(0, 0, 0, 0)') { pill = el; background = bg; break; }
+}
+
+var criteria = [], seen = {};
+var card = findAll(args[1])[0];
+if (card) {
+    var pattern = /^(PVS1|PS[1-4]|PM[1-6]|PP[1-5]|BA1|BS[1-4]|BP[1-7])(_[A-Za-z]+)?$/;
+    var walker = document.createTreeWalker(card, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        var text = walker.currentNode.nodeValue.trim();
+        if (pattern.test(text) && !seen[text]) { seen[text] = true; criteria.push(text); }
+    }
+}
+
+return {
+    text: span.textContent.trim(),
+    pill: pill,
+    background: background,
+    foreground: window.getComputedStyle(span).color,
+    criteria: criteria,
+    locator_index: locatorIndex
+};
+"""
+
+# Visibility of every section card by name
+SECTIONS_STATUS_JS = """
+var sectionStatus = function(names, locators) {
+    var status = {};
+    for (var i = 0; i < names.length; i++) { status[names[i]] = !!firstVisible(locators[i]); }
+    return status;
+};
+"""
+
+
 class ResultsPage(BasePage):
     """Page Object for Variant Results Page
     This is where we verify the classification results"""
     
-    def __init__(self, driver):
+    # Information cards we report on, in the order they are printed
+    SECTION_CARDS = {
+        "General Information": Locators.GENERAL_INFO_CARD,
+        "Germline Classification": Locators.GERMLINE_CLASSIFICATION_CARD,
+        "PharmGKB": Locators.PHARMGKB_CARD,
+        "ClinVar": Locators.CLINVAR_CARD,
+        "LOVD": Locators.LOVD_CARD,
+        "Publications": Locators.PUBLICATIONS_CARD,
+    }
+    
+    INDEXED_LOCATORS = {
+        **SECTION_CARDS,
+        "verdict_text": Locators.VERDICT_TEXT_ANY,
+        "results_container": Locators.RESULTS_CONTAINER,
+    }
+    
+    def __init__(self, driver, network=None):
         super().__init__(driver)
+        self.network = network  # framework.network_monitor.NetworkMonitor, optional
+        self.api_responses = {}  # name -> request info of the API calls we waited for
+        self.api_payloads = {}  # name -> response body (parsed JSON) for verification code
+    
+    def wait_for_api_responses(self, variant, genome=None, timeout=None, until=None):
+        """Wait until the annotation and classification API calls for this variant finished
+        Needs a network monitor. Captured bodies end up in self.api_payloads
+        until stops the wait early (see NetworkMonitor.wait_for_responses)"""
+        if not self.network:
+            return False
+        patterns = {
+            "annotation": endpoint_pattern(ApiEndpoints.ANNOTATION, variant, genome),
+            "classification": endpoint_pattern(ApiEndpoints.CLASSIFICATION, variant, genome),
+        }
+        self.api_responses = self.network.wait_for_responses(patterns, timeout=timeout or TestData.TIMEOUT_LONG,
+                                                             until=until)
+        self.api_payloads = {name: self.network.response_body(info) for name, info in self.api_responses.items()}
+        return len(self.api_responses) == len(patterns)
         
-    def wait_for_results_page(self):
+    def open_direct(self, variant, genome=None, sample=None):
+        """Go straight to the results page of a variant, skipping homepage search and modal
+        Call wait_for_results_page afterwards like after a normal search"""
+        url = build_results_url(variant, genome, sample)
+        print(f"Opening results page directly: {url}")
+        self.install_overlay_watcher()
+        self.driver.get(url)
+        mark_navigation(self.driver)
+        self.wait_for_page_load()
+        self.dismiss_overlays()
+        return self.is_on_results_page()
+    
+    def wait_for_results_page(self, variant=None, genome=None):
         """Wait for results page to load after search
-        The page takes some time to load all the data"""
+        The page takes some time to load all the data. With a network monitor and the
+        variant we wait for its API responses, which is quicker and more reliable than the DOM.
+        The ApiEndpoints patterns are only known to match the stand-in server, so this needs
+        RunSettings.NETWORK_READINESS. The wait is also raced against the classification card - if the
+        patterns dont match, the page checks take over as soon as the card is there"""
         print("Waiting for results page to load...")
         
+        if self.network and variant and RunSettings.NETWORK_READINESS:
+            card_shown = lambda: self.find_indexed("Germline Classification", "present") is not None
+            if self.wait_for_api_responses(variant, genome, until=card_shown):
+                # Data has arrived - the classification card only needs to render
+                return self.wait_for_locator(Locators.GERMLINE_CLASSIFICATION_CARD, "present",
+                                             timeout=TestData.TIMEOUT_SHORT) is not None
+            print("Variant API responses not seen - falling back to page checks")
+        
         # Check if URL changed to include variant
         url_changed = self.wait_for_url_contains("variant", timeout=TestData.TIMEOUT_LONG)
         # Also check if results container is visible
@@ -39,17 +183,30 @@ class ResultsPage(BasePage):
         # Also check for results container element
         return self.is_element_visible(Locators.RESULTS_CONTAINER, timeout=TestData.TIMEOUT_SHORT)
     
-    def verify_page_sections(self, print_results=True):
+    def verify_page_sections(self, print_results=True, required=None, timeout=None):
         """Check if all expected sections are present on the page
-        Not all sections always load, especially LOVD needs premium access"""
-        sections_status = {
-            "General Information": self.is_element_visible(Locators.GENERAL_INFO_CARD, timeout=10),
-            "Germline Classification": self.is_element_visible(Locators.GERMLINE_CLASSIFICATION_CARD, timeout=10),
-            "PharmGKB": self.is_element_visible(Locators.PHARMGKB_CARD, timeout=10),
-            "ClinVar": self.is_element_visible(Locators.CLINVAR_CARD, timeout=10),
-            "LOVD": self.is_element_visible(Locators.LOVD_CARD, timeout=10),
-            "Publications": self.is_element_visible(Locators.PUBLICATIONS_CARD, timeout=10)
-        }
+        Not all sections always load, especially LOVD needs premium access.
+        All cards are checked together in the browser with one shared deadline, so a
+        missing card doesnt cost its own timeout. If required is given (list of section
+        names) we return as soon as those are visible instead of waiting for every card"""
+        names = list(self.SECTION_CARDS)
+        locators = [list(locator) for locator in self.SECTION_CARDS.values()]
+        wait_for = list(required) if required else names
+        
+        statuses = self.wait_for_dom(SECTIONS_STATUS_JS + """
+            var status = sectionStatus(args[0], args[1]);
+            for (var i = 0; i < args[2].length; i++) {
+                if (!status[args[2][i]]) { return null; }
+            }
+            return status;""", names, locators, wait_for, timeout=timeout or TestData.TIMEOUT_MEDIUM,
+            key="sections:required" if required else "sections:all")
+        
+        if statuses is None:
+            # Deadline passed - one last look to report what did load
+            statuses = self.driver.execute_script(DOM_HELPERS_JS + SECTIONS_STATUS_JS +
+                                                  "return sectionStatus(arguments[0], arguments[1]);",
+                                                  names, locators)
+        sections_status = {name: bool(statuses.get(name)) for name in names}
         
         if print_results:
             print("Checking page sections:")
@@ -62,7 +219,7 @@ class ResultsPage(BasePage):
     def verify_required_sections(self):
         """Check only the critical sections for our test
         Mainly we need Germline Classification section"""
-        sections = self.verify_page_sections(print_results=True)
+        sections = self.verify_page_sections(print_results=True, required=["Germline Classification"])
         
         germline_present = sections.get("Germline Classification", False)
         
@@ -78,19 +235,19 @@ class ResultsPage(BasePage):
         return germline_present
     
     def is_germline_classification_visible(self):
-        """Quick check if Germline Classification card is visible"""
+        """Quick check if Germline Classification card is visible
+        Answered from the locator index when the card is there, waits only when it isnt"""
+        if self.find_indexed("Germline Classification") is not None:
+            return True
         return self.is_element_visible(Locators.GERMLINE_CLASSIFICATION_CARD)
     
     def handle_warning_popup(self):
         """Handle 'I understand' warning popup that sometimes appears
         VarSome shows this for clinical interpretation disclaimer"""
-        from locators import Locators
-        
-        if self.is_element_present(Locators.WARNING_UNDERSTAND_BUTTON, timeout=3):
-            if self.click(Locators.WARNING_UNDERSTAND_BUTTON):
-                print("Handled 'I understand' warning popup")
-                self.wait_short.until(lambda driver: True)
-                return True
+        if "warning" in self.dismiss_overlays():
+            print("Handled 'I understand' warning popup")
+            self.wait_for_locator(Locators.WARNING_UNDERSTAND_BUTTON, "hidden", timeout=TestData.TIMEOUT_SHORT)
+            return True
         return False
     
     def expand_germline_classification(self):
@@ -98,10 +255,8 @@ class ResultsPage(BasePage):
         The section starts collapsed so we need to expand it"""
         print("Expanding Germline Classification section...")
         
-        # First scroll to the element
+        # First scroll to the element - this also waits for the scroll animation to finish
         self.scroll_to_element(Locators.GERMLINE_CLASSIFICATION_CARD)
-        import time
-        time.sleep(2)  # Wait for scroll animation
         
         # Click using JavaScript to avoid interception issues
         element = self.get_element(Locators.GERMLINE_CLASSIFICATION_CARD)
@@ -114,48 +269,50 @@ class ResultsPage(BasePage):
         
         return False
     
+    def get_verdict_snapshot(self, timeout=None):
+        """Everything we check about the verdict, read in one script call
+        Waits for the verdict pill, then returns a dict with verdict_text, pill (the element),
+        pill_id, background, foreground, color (simple name like "red") and the ACMG criteria.
+        Returns None if no verdict showed up in time"""
+        store = get_priority_store()
+        ordered = store.ordered(Locators.VERDICT_TEXT_ANY)
+        found = self.wait_for_dom(VERDICT_SNAPSHOT_JS, [list(alt) for alt in ordered],
+                                  list(Locators.GERMLINE_CLASSIFICATION_CARD),
+                                  ordered.index(Locators.VERDICT_TEXT_ANY.alternatives[0]),
+                                  timeout=timeout or TestData.TIMEOUT_MEDIUM, key="verdict_snapshot")
+        if not found:
+            print("Verdict not found on page")
+            return None
+        
+        store.record_win(Locators.VERDICT_TEXT_ANY, ordered[found["locator_index"]])
+        return {
+            "verdict_text": found["text"],
+            "pill": found["pill"],
+            "pill_id": found["pill"].id if found["pill"] else None,
+            "background": found["background"],
+            "foreground": found["foreground"],
+            "color": color_name(found["background"]),
+            "criteria": found["criteria"],
+        }
+    
     def get_verdict_text(self):
         """Get the classification verdict text (should be 'Pathogenic')"""
-        # Try primary locator first
-        verdict_text = self.get_text(Locators.PATHOGENIC_VERDICT)
-        if verdict_text:
-            return verdict_text
-            
-        # Try alternative locator if first doesnt work
-        verdict_text = self.get_text(Locators.PATHOGENIC_VERDICT_ALT)
-        if verdict_text:
-            return verdict_text
-            
-        return None
+        snapshot = self.get_verdict_snapshot()
+        return snapshot["verdict_text"] if snapshot else None
     
     def get_verdict_color(self):
         """Get the background color of verdict element
         We need to verify its red for Pathogenic classification"""
-        element = None
-        
-        # Find the verdict element
-        if self.is_element_present(Locators.PATHOGENIC_VERDICT, timeout=2):
-            element = self.get_element(Locators.PATHOGENIC_VERDICT)
-        elif self.is_element_present(Locators.PATHOGENIC_VERDICT_ALT, timeout=2):
-            element = self.get_element(Locators.PATHOGENIC_VERDICT_ALT)
-            
-        if element:
-            # Get parent element which has the background color
-            parent = element.find_element(By.XPATH, "..")
-            bg_color = parent.value_of_css_property("background-color")
-            
-            # Parse RGB values to check if its red
-            if bg_color and ("rgb" in bg_color or "rgba" in bg_color):
-                # Extract RGB values using regex
-                rgb_match = re.search(r'rgba?\((\d+),\s*(\d+),\s*(\d+)', bg_color)
-                if rgb_match:
-                    r, g, b = int(rgb_match.group(1)), int(rgb_match.group(2)), int(rgb_match.group(3))
-                    # Check if color is red (high R, low G and B)
-                    if r > 150 and g < 50 and b < 50:
-                        return "red"
-                return bg_color
-        
-        return None
+        snapshot = self.get_verdict_snapshot(timeout=TestData.TIMEOUT_SHORT)
+        return snapshot["color"] if snapshot else None
+    
+    def get_classification_verdict(self):
+        """Get verdict text and color for any classification
+        Used by the matrix runner where the expected verdict is not always Pathogenic"""
+        snapshot = self.get_verdict_snapshot()
+        if not snapshot:
+            return None, None
+        return snapshot["verdict_text"], snapshot["color"]
     
     def verify_pathogenic_classification(self):
         """Main verification method - check both text and color
@@ -164,14 +321,13 @@ class ResultsPage(BasePage):
         
         # First expand the section
         self.expand_germline_classification()
-        self.wait_short.until(lambda driver: True)
-        
-        # Get and check verdict text
-        verdict = self.get_verdict_text()
-        is_pathogenic = "pathogenic" in verdict.lower() if verdict else False
         
-        # Get and check color
-        color = self.get_verdict_color()
+        # Text, color and criteria come from one snapshot of the page
+        snapshot = self.get_verdict_snapshot() or {}
+        verdict = snapshot.get("verdict_text")
+        # Exact match like the journey - "Likely Pathogenic" contains "pathogenic" but isnt the verdict we want
+        is_pathogenic = verdict.strip().casefold() == TestData.EXPECTED_VERDICT.casefold() if verdict else False
+        color = snapshot.get("color")
         is_red = color == "red" if color else False
         
         # Return all the results
@@ -180,16 +336,17 @@ class ResultsPage(BasePage):
             "is_pathogenic": is_pathogenic,
             "color": color,
             "is_red": is_red,
+            "criteria": snapshot.get("criteria", []),
             "success": is_pathogenic and is_red  # Both must be true
         }
     
     def take_verdict_screenshot(self, filename="verdict_screenshot.png"):
         """Take screenshot of verdict section for evidence
-        Always good to have proof that test passed"""
+        Always good to have proof that test passed
+        Only the acmg card is captured - smaller file and the verdict is easy to spot"""
         # Scroll to verdict section first
         self.scroll_to_element(Locators.GERMLINE_CLASSIFICATION_CARD)
-        self.wait_short.until(lambda driver: True)
+        card = self.get_element(Locators.GERMLINE_CLASSIFICATION_CARD)
         
-        # Take the screenshot
-        self.take_screenshot(filename)
-        return filename
\ No newline at end of file
+        # Take the screenshot - whole window if the card is gone for some reason
+        return self.take_screenshot(filename, element=card)
\ No newline at end of file
@@ -2,15 +2,67 @@
 SampleInfoModal Page Object for Optional Sample Information modal
 """
 
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from pages.base_page import BasePage
-from locators import Locators, TestData
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+from pages.base_page import BasePage, DOM_HELPERS_JS
+from locators import Locators, TestData, CompositeLocator
+from framework.tracing import traced
+from framework.timeout_policy import mark_navigation
+
+
+# Finds the modal fields and the Germline toggle in one call
+# args: [0] {field: [locator, ...]}, [1] germline tab, [2] active germline tab
+LOCATE_FIELDS_JS = DOM_HELPERS_JS + """
+var fields = arguments[0], elements = {};
+for (var name in fields) {
+    var el = null;
+    for (var i = 0; i < fields[name].length && !el; i++) { el = firstVisible(fields[name][i]); }
+    elements[name] = el;
+}
+return {fields: elements, germline_tab: firstVisible(arguments[1]), germline_active: !!firstVisible(arguments[2])};
+"""
+
+# What the modal shows now - chosen react-select option(s) or the input value, plus the Germline toggle
+# Same arguments as LOCATE_FIELDS_JS
+READ_BACK_JS = LOCATE_FIELDS_JS.replace("return {fields", "var found = {fields") + """
+var chosen = function(input) {
+    // react-select shows the choice next to its input - stop before reaching another select
+    for (var el = input.parentElement; el; el = el.parentElement) {
+        if (el.querySelectorAll("input[id^='react-select-']").length > 1) { break; }
+        var values = el.querySelectorAll("[class*='singleValue'], [class*='single-value'], " +
+                                         "[class*='multiValue'] > div:first-child, [class*='multi-value__label']");
+        if (values.length) {
+            return Array.prototype.map.call(values, function(v) { return v.textContent.trim(); }).join(", ");
+        }
+    }
+    return "";
+};
+var values = {};
+for (var name in found.fields) {
+    var input = found.fields[name];
+    if (!input) { values[name] = null; }
+    else if ((input.id || "").indexOf("react-select-") === 0) { values[name] = chosen(input); }
+    else { values[name] = input.value; }
+}
+return {values: values, germline_active: found.germline_active};
+"""
 
 
 class SampleInfoModal(BasePage):
     """Page Object for the Optional Sample Information Modal
     This modal appears after search and asks for additional patient info"""
     
+    # Profile field -> its input, in the order fill_profile types them
+    # Phenotype is last - its options come from the server and react-select clears it on blur
+    PROFILE_INPUTS = {
+        "sex": Locators.SEX_DROPDOWN,
+        "age": Locators.AGE_INPUT_ANY,
+        "ethnicity": Locators.ETHNICITY_DROPDOWN,
+        "phenotype": Locators.PHENOTYPE_INPUT,
+    }
+    
     def __init__(self, driver):
         super().__init__(driver)
     
@@ -40,13 +92,22 @@ class SampleInfoModal(BasePage):
         # Handle autocomplete dropdown
         element = self.get_element(Locators.PHENOTYPE_INPUT)
         if element:
-            self.wait_short.until(lambda driver: True)  # Wait for dropdown
+            self.wait_for_dropdown_options(Locators.PHENOTYPE_INPUT)  # Autocomplete results come from server
             element.send_keys(Keys.ARROW_DOWN)  # Select first option
-            self.wait_short.until(lambda driver: True)
             element.send_keys(Keys.ENTER)
             return True
         return False
     
+    def wait_for_dropdown_options(self, input_locator, timeout=None):
+        """Wait until the react-select menu for this input shows its options
+        react-select gives options ids like react-select-2-option-0 for input react-select-2-input"""
+        by, value = input_locator
+        if by == By.ID and value.endswith("-input"):
+            options = (By.CSS_SELECTOR, f"[id^='{value[:-len('input')]}option-']")
+        else:
+            options = (By.CSS_SELECTOR, "[id^='react-select-'][id*='-option-']")
+        return self.wait_for_locator(options, "visible", timeout=timeout or TestData.TIMEOUT_SHORT) is not None
+    
     def select_sex(self, sex_value):
         """Select sex from dropdown using keyboard navigation
         I found keyboard navigation more reliable than Select class here"""
@@ -57,7 +118,7 @@ class SampleInfoModal(BasePage):
         element = self.get_element(Locators.SEX_DROPDOWN)
         if element:
             element.send_keys(sex_value)  # Type the value
-            self.wait_short.until(lambda driver: True)
+            self.wait_for_dropdown_options(Locators.SEX_DROPDOWN)
             element.send_keys(Keys.ENTER)  # Select it
             return True
             
@@ -65,10 +126,7 @@ class SampleInfoModal(BasePage):
     
     def enter_age(self, age_value):
         """Enter age at onset - simple text field"""
-        if not self.type_text(Locators.AGE_INPUT, str(age_value)):
-            # Try alternative locator if first one fails
-            return self.type_text(Locators.AGE_INPUT_ALT, str(age_value))
-        return True
+        return self.type_text(Locators.AGE_INPUT_ANY, str(age_value))
     
     def select_ethnicity(self, ethnicity_value):
         """Select ethnicity from dropdown
@@ -80,7 +138,7 @@ class SampleInfoModal(BasePage):
         element = self.get_element(Locators.ETHNICITY_DROPDOWN)
         if element:
             element.send_keys(ethnicity_value)
-            self.wait_short.until(lambda driver: True)
+            self.wait_for_dropdown_options(Locators.ETHNICITY_DROPDOWN)
             element.send_keys(Keys.ENTER)
             return True
             
@@ -88,10 +146,10 @@ class SampleInfoModal(BasePage):
     
     def click_search_in_modal(self):
         """Click Search button inside the modal to submit the form"""
-        if not self.click(Locators.MODAL_SEARCH_BUTTON):
-            # Try alternative button if first one doesnt work
-            return self.click(Locators.MODAL_SEARCH_BUTTON_ALT)
-        return True
+        clicked = self.click(Locators.MODAL_SEARCH_BUTTON_ANY)
+        if clicked:
+            mark_navigation(self.driver)  # Results page loads from here
+        return clicked
     
     def wait_for_modal_to_close(self):
         """Wait for modal to disappear after submitting"""
@@ -101,50 +159,103 @@ class SampleInfoModal(BasePage):
     def handle_security_validation(self):
         """Handle security validation page if it appears
         Sometimes VarSome shows a security check"""
-        import time
-        from locators import Locators
+        # Either we click it now or the background overlay watcher already did
+        dismissed = "security_check" in self.dismiss_overlays()
+        watcher_clicked = any(entry["name"] == "security_check" for entry in self.overlay_watcher_log())
         
-        if self.is_element_present(Locators.SECURITY_PROCEED_BUTTON, timeout=5):
-            if self.click(Locators.SECURITY_PROCEED_BUTTON):
-                print("Security validation handled - proceeding")
-                time.sleep(5)  # Wait for page to load after security check
-                return True
+        if dismissed or watcher_clicked:
+            print("Security validation handled - proceeding")
+            mark_navigation(self.driver)
+            # Wait for page to load after security check - done when the proceed button is gone
+            self.wait_for_dom("return document.readyState === 'complete' && !findAll(args[0]).length;",
+                              list(Locators.SECURITY_PROCEED_BUTTON), timeout=TestData.TIMEOUT_MEDIUM,
+                              key="security_check_done")
+            return True
         
         return False
     
-    def fill_sample_information(self, phenotype, sex, age, ethnicity):
-        """Fill all the sample information fields at once
-        This is a helper method to fill everything in one go"""
-        success = True
-        
-        print("Filling sample information form...")
-        
-        if not self.select_germline_tab():
-            print("Warning: Could not select Germline tab")
-            success = False
-        
-        if not self.fill_phenotype(phenotype):
-            print(f"Warning: Issue with phenotype field: {phenotype}")
-            success = False
-        else:
-            print(f"  Phenotype: {phenotype}")
+    @staticmethod
+    def _field_locators(fields):
+        return {field: [list(alt) for alt in (locator.alternatives if isinstance(locator, CompositeLocator)
+                                              else [locator])]
+                for field, locator in fields.items()}
+    
+    @traced
+    def read_sample_information(self):
+        """Values the modal shows right now, read in one script call
+        Returns {"values": {field: text or None}, "germline_active": bool}"""
+        return self.driver.execute_script(READ_BACK_JS, self._field_locators(self.PROFILE_INPUTS),
+                                          list(Locators.GERMLINE_TAB), list(Locators.GERMLINE_TAB_ACTIVE))
+    
+    @staticmethod
+    def _confirmed(field, expected, shown):
+        """react-select shows the option label, e.g. "Cancer (MONDO:0004992)" for "Cancer"
+        startswith, not "in" - otherwise Male would match Female"""
+        if shown is None:
+            return False
+        if field == "age":
+            return shown.strip() == expected
+        return shown.strip().lower().startswith(expected.lower())
+    
+    @traced
+    def fill_profile(self, profile):
+        """Fill the modal from a sample profile (framework.sample_profiles) with few round trips
+        One call finds every field, one action sequence clicks and types into all of them, one
+        wait for the phenotype suggestions and one call reads everything back. Fields that the
+        read-back doesnt confirm are filled again one at a time with the normal methods.
+        Details end up in self.last_fill. Returns True if every field shows its value"""
+        values = {field: str(profile[field]) for field in self.PROFILE_INPUTS if profile.get(field) not in (None, "")}
+        germline = profile.get("annotation_mode", "germline") == "germline"
+        print(f"Filling sample information from profile '{profile.get('name', '?')}'...")
         
-        if not self.select_sex(sex):
-            print(f"Warning: Issue with sex field: {sex}")
-            success = False
-        else:
-            print(f"  Sex: {sex}")
+        found = self.driver.execute_script(LOCATE_FIELDS_JS, self._field_locators(self.PROFILE_INPUTS),
+                                           list(Locators.GERMLINE_TAB), list(Locators.GERMLINE_TAB_ACTIVE))
+        elements = found["fields"]
         
-        if not self.enter_age(age):
-            print(f"Warning: Issue with age field: {age}")
-            success = False
-        else:
-            print(f"  Age at onset: {age}")
+        actions = ActionChains(self.driver)
+        if germline and not found["germline_active"] and found["germline_tab"]:
+            actions.click(found["germline_tab"])
+        for field, value in values.items():
+            element = elements.get(field)
+            if element is None or field == "phenotype":
+                continue
+            actions.click(element)
+            if field == "age":
+                actions.key_down(Keys.CONTROL).send_keys("a").key_up(Keys.CONTROL)  # Replace what is there
+            actions.send_keys(value)
+            if field in ("sex", "ethnicity"):
+                actions.send_keys(Keys.ENTER)  # Static options - the typed text filters them straight away
+        if "phenotype" in values and elements.get("phenotype") is not None:
+            actions.click(elements["phenotype"]).send_keys(values["phenotype"])
+        try:
+            actions.perform()
+            if "phenotype" in values and elements.get("phenotype") is not None:
+                self.wait_for_dropdown_options(Locators.PHENOTYPE_INPUT)  # Suggestions come from the server
+                ActionChains(self.driver).send_keys(Keys.ARROW_DOWN).send_keys(Keys.ENTER).perform()
+        except WebDriverException as e:
+            print(f"Batched fill did not go through ({e.msg}) - filling fields one by one")
         
-        if not self.select_ethnicity(ethnicity):
-            print(f"Warning: Issue with ethnicity field: {ethnicity}")
-            success = False
-        else:
-            print(f"  Ethnicity: {ethnicity}")
+        shown = self.read_sample_information()
+        retry = [field for field, value in values.items() if not self._confirmed(field, value, shown["values"].get(field))]
+        if retry:
+            fill_one = {"sex": self.select_sex, "age": self.enter_age,
+                        "ethnicity": self.select_ethnicity, "phenotype": self.fill_phenotype}
+            print(f"Not confirmed after batched fill: {', '.join(retry)} - filling one by one")
+            if germline and not shown["germline_active"]:
+                self.select_germline_tab()
+            for field in retry:
+                fill_one[field](values[field])
+            shown = self.read_sample_information()
         
-        return success
\ No newline at end of file
+        confirmed = {field: self._confirmed(field, value, shown["values"].get(field)) for field, value in values.items()}
+        self.last_fill = {"values": shown["values"], "confirmed": confirmed, "filled_one_by_one": retry}
+        for field, value in values.items():
+            status = "" if confirmed[field] else f" (modal shows '{shown['values'].get(field)}')"
+            print(f"  {field.capitalize()}: {value}{status}")
+        return all(confirmed.values()) and (shown["germline_active"] or not germline)
+    
+    def fill_sample_information(self, phenotype, sex, age, ethnicity):
+        """Fill all the sample information fields at once
+        Same as fill_profile with a profile made from these values"""
+        return self.fill_profile({"name": "inline", "annotation_mode": "germline", "phenotype": phenotype,
+                                  "sex": sex, "age": age, "ethnicity": ethnicity})
@@ -0,0 +1,603 @@
+"""
+Matrix runner for VarSome Test Automation
+Runs the variant journey for a whole list of variants using several browsers at once
+
+Usage: python run_matrix.py variants.tsv --workers 4
+       python run_matrix.py variants.tsv --workers 2 --tabs 3   (3 tabs in each browser)
+
+The variant list is a CSV or TSV file with columns:
+    variant, genome, expected_verdict, expected_color, mode, profile
+Only variant is required. Lines starting with # are ignored.
+mode is "full" (homepage search + modal) or "direct" (open the results URL), default --mode
+profile is a sample profile in profiles/ (default RunSettings.SAMPLE_PROFILE)
+A VCF (or .vcf.gz) works too, see framework/variant_source.py. --genes and --region pick the
+variants to run. Longest expected journeys run first (--schedule lpt, framework/scheduler.py),
+planned in windows of RunSettings.SCHEDULE_WINDOW variants. --schedule fifo keeps list order
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+from framework.scheduler import JourneyHistory, Scheduler
+from framework.throttle import ThrottleController
+from framework.variant_source import JOURNEY_MODES, VariantSource, parse_genes, parse_regions
+from locators import RunSettings
+
+
+def load_variant_list(path, default_mode=None):
+    """Read the whole variant list file into VariantCase objects
+    For big lists use VariantSource directly, it reads the file as the run goes"""
+    return list(VariantSource(path, default_mode=default_mode))
+
+
+def available_memory_mb():
+    """Free memory on this machine in MB, or None if we cant tell"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available // (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def default_worker_count():
+    """Pick number of workers from CPU cores and free RAM
+    Each worker runs its own Chrome so memory usually is the limit, not CPU"""
+    workers = os.cpu_count() or 1
+    memory_mb = available_memory_mb()
+    if memory_mb is not None:
+        workers = min(workers, memory_mb // RunSettings.BROWSER_MEMORY_MB)
+    return max(1, min(workers, RunSettings.MAX_WORKERS))
+
+
+def _worker_main(worker_id, task_queue, result_queue, max_uses, run_id, tabs=1):
+    """Worker process - keeps one warm browser, takes variants from the queue until it gets None
+    The browser is reset between variants and replaced after max_uses journeys.
+    With tabs > 1 the browser runs that many journeys at once, one tab each"""
+    from framework.driver_pool import DriverPool
+    from framework.journey import run_variant_journey
+    from framework.tracing import TRACER
+
+    if tabs > 1:
+        from framework.driver_factory import create_driver
+        pool = DriverPool(size=1, max_uses=max_uses, factory=lambda: create_driver(background_tabs=True))
+    else:
+        pool = DriverPool(size=1, max_uses=max_uses)
+    try:
+        if tabs > 1:
+            _run_tabs(worker_id, tabs, pool, task_queue, result_queue, run_id)
+            return
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            index, case = task
+            result_queue.put(("start", {"index": index, "worker": worker_id}))
+            print(f"[worker {worker_id}] {case.variant} ({case.genome})")
+            with pool.driver() as driver:
+                result = run_variant_journey(driver, case, run_id=run_id)
+            result["index"] = index
+            result["worker"] = worker_id
+            result_queue.put(("result", result))
+    except Exception as e:
+        print(f"[worker {worker_id}] stopped: {e}")
+    finally:
+        pool.close()
+        TRACER.export(os.path.join(RunSettings.TRACE_DIR, run_id, f"worker_{worker_id}"))
+        result_queue.put(("pool", {"worker": worker_id, **pool.stats()}))
+
+
+class _TabBrowser:
+    """The browser all tabs of a worker share, replaced like the pool does it for one browser per worker:
+    after max_uses journeys or when it uses more than the memory limit. No new journey starts
+    while it drains, the last journey to end quits it and the next one checks out a fresh one"""
+
+    def __init__(self, pool, worker_id):
+        from framework.tab_manager import TabManager
+
+        self._tab_manager = TabManager
+        self.pool = pool
+        self.worker_id = worker_id
+        self._cond = threading.Condition()
+        self.generation = 0
+        self.running = 0
+        self.draining = False
+        self.driver = self.manager = None
+        self.uses = 0
+
+    def begin(self):
+        """Wait out a drain - returns (manager, generation) of the browser the journey runs in"""
+        with self._cond:
+            while self.draining:
+                self._cond.wait()
+            if self.manager is None:
+                # Checked out when the first journey needs it, so the last drain doesnt start a browser for nothing
+                self.driver = self.pool.checkout()
+                self.manager = self._tab_manager(self.driver)
+                self.generation += 1
+                self.uses = 0
+            self.running += 1
+            return self.manager, self.generation
+
+    def end(self):
+        """A journey ended - between journeys is when the browser is checked, like at checkin"""
+        from framework.driver_pool import is_abandoned
+
+        with self._cond:
+            self.running -= 1
+            self.uses += 1
+            if not self.draining:
+                if self.uses >= self.pool.max_uses or is_abandoned(self.driver):
+                    self.draining = True
+                elif self.pool.watchdog.over_limit(self.driver):
+                    print(f"[worker {self.worker_id}] Browser uses more than {self.pool.watchdog.limit_mb} MB, "
+                          f"replacing it once its tabs are done")
+                    self.pool.retired_for_memory += 1
+                    self.draining = True
+            if self.draining and self.running == 0:
+                self.manager.close()
+                self.pool.checkin(self.driver, healthy=False)  # Quits it
+                self.driver = self.manager = None
+                self.draining = False
+            self._cond.notify_all()
+
+    def close(self):
+        if self.manager is None:
+            return
+        self.manager.close()
+        self.pool.checkin(self.driver)
+
+
+def _run_tabs(worker_id, tabs, pool, task_queue, result_queue, run_id):
+    """One browser, one thread per tab - every thread takes variants from the queue until it gets None
+    The browser is replaced after max_uses journeys or over the memory limit, once its tabs are done"""
+    from selenium.common.exceptions import WebDriverException
+    from framework.journey import run_variant_journey
+
+    browser = _TabBrowser(pool, worker_id)
+
+    def tab_loop(tab_number):
+        tab, tab_generation = None, None
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            index, case = task
+            manager, generation = browser.begin()
+            try:
+                if generation != tab_generation:
+                    tab, tab_generation = manager.open_tab(), generation  # Fresh browser
+                result_queue.put(("start", {"index": index, "worker": worker_id}))
+                print(f"[worker {worker_id} tab {tab_number}] {case.variant} ({case.genome})")
+                result = run_variant_journey(tab, case, run_id=run_id)
+                result["index"] = index
+                result["worker"] = worker_id
+                result["tab"] = tab_number
+                result_queue.put(("result", result))
+                try:
+                    manager.reset_tab(tab)
+                except WebDriverException as e:
+                    print(f"[worker {worker_id} tab {tab_number}] could not reset tab: {e}")
+            finally:
+                browser.end()
+        if tab is not None and tab_generation == browser.generation and browser.manager is not None:
+            browser.manager.close_tab(tab)
+
+    threads = [threading.Thread(target=tab_loop, args=(i,)) for i in range(tabs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    browser.close()
+
+
+def run_matrix(cases, workers, max_uses=None, run_id=None, tabs=1, scheduler=None, throttle=None):
+    """Spread the cases over worker processes and collect one result per case
+    cases can be any iterable - it is consumed by a feeder thread as workers take variants,
+    so a VariantSource never has to be read into memory at once.
+    With a scheduler (framework/scheduler.py) cases is ignored: every worker gets its own queue
+    and is handed the scheduler's next task whenever one of its journeys finishes.
+    With a throttle (framework/throttle.py) a task is only handed out once it allows another start
+    Returns (results, pool_stats) - pool_stats has one entry per worker"""
+    # spawn works the same on Windows and Linux, and no browser state gets forked
+    ctx = multiprocessing.get_context("spawn")
+    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+    result_queue = ctx.Queue()
+
+    pending = {}  # Cases without a result yet
+    lock = threading.Lock()
+    fed = threading.Event()
+    submitted = [0]
+    feed_error = []
+
+    def feed():
+        try:
+            for index, case in enumerate(cases):
+                if throttle:
+                    throttle.acquire()
+                with lock:
+                    pending[index] = case
+                    submitted[0] += 1
+                task_queue.put((index, case))
+        except Exception as e:
+            # The workers still get their stop signals, or they would wait for tasks forever
+            print(f"Stopped reading the variant list: {e}")
+            feed_error.append(str(e))
+        finally:
+            for _ in range(workers * tabs):
+                task_queue.put(None)  # One stop signal per worker (per tab in multi-tab mode)
+            fed.set()
+
+    idle = []  # Free worker slots (one per tab) waiting for a task the throttle allows
+    running = {worker: set() for worker in range(workers)}  # Tasks a worker holds without a result yet
+    ended = set()
+
+    def worker_ended(worker):
+        # A worker that died mid-journey never sends those results - free their throttle slots
+        ended.add(worker)
+        idle[:] = [w for w in idle if w != worker]
+        if throttle and running[worker]:
+            throttle.release(len(running[worker]))
+        running[worker].clear()
+
+    def dispatch():
+        while idle:
+            if not scheduler.has_tasks():
+                for worker in idle:
+                    task_queues[worker].put(None)  # Stops one of the worker's tabs - nothing left to steal
+                idle.clear()
+                break
+            if throttle and not throttle.try_acquire():
+                break  # Tried again when a journey finishes or the bucket refills
+            worker = idle.pop(0)
+            task = scheduler.next_task(worker)
+            with lock:
+                pending[task[0]] = task[1]
+                submitted[0] += 1
+            running[worker].add(task[0])
+            task_queues[worker].put(task)
+        if not scheduler.has_tasks():
+            fed.set()  # Everything handed out - the run ends with the last result
+            if scheduler.error:
+                feed_error.append(scheduler.error)
+
+    if scheduler:
+        task_queues = [ctx.Queue() for _ in range(workers)]
+        idle.extend(worker for _ in range(tabs) for worker in range(workers))
+        dispatch()
+    else:
+        # Bounded, so the feeder stays only a little ahead of the workers
+        task_queue = ctx.Queue(maxsize=workers * tabs * 2)
+        task_queues = [task_queue] * workers
+        # Daemon - if every worker dies the feeder is stuck on a full queue and must not keep us alive
+        threading.Thread(target=feed, daemon=True).start()
+
+    processes = [ctx.Process(target=_worker_main,
+                             args=(i, task_queues[i], result_queue, max_uses or RunSettings.DRIVER_MAX_USES, run_id, tabs))
+                 for i in range(workers)]
+    started = time.time()
+    for process in processes:
+        process.start()
+
+    results = []
+    pool_stats = []
+    while not (fed.is_set() and len(results) >= submitted[0]) or len(pool_stats) < workers:
+        try:
+            kind, payload = result_queue.get(timeout=0.25 if idle else 1)
+        except queue.Empty:
+            alive = [process.is_alive() for process in processes]
+            if not any(alive):
+                break  # All workers died - dont wait forever
+            for worker, is_alive in enumerate(alive):
+                if not is_alive and worker not in ended:
+                    worker_ended(worker)
+            if idle:
+                dispatch()
+            continue
+        if kind == "start":
+            running[payload["worker"]].add(payload["index"])
+        elif kind == "result":
+            running[payload["worker"]].discard(payload["index"])
+            results.append(payload)
+            with lock:
+                pending.pop(payload["index"], None)
+            if throttle:
+                throttle.finished(payload)
+            if scheduler:
+                scheduler.actual_makespan = time.time() - started
+                idle.append(payload["worker"])
+                dispatch()
+        else:
+            pool_stats.append(payload)
+            worker_ended(payload["worker"])
+
+    for process in processes:
+        process.join()
+
+    # Anything without a result means its worker crashed
+    with lock:
+        missing = sorted(pending.items())
+    for index, case in missing:
+        results.append({
+            "index": index, "variant": case.variant, "genome": case.genome,
+            "expected_verdict": case.expected_verdict, "expected_color": case.expected_color,
+            "verdict": None, "color": None, "passed": False, "failed_step": None,
+            "error": "Worker stopped before running this variant", "duration": 0,
+        })
+    if not fed.is_set():
+        print("Workers stopped before the whole variant list was read")
+    elif feed_error:
+        print(f"Only part of the variant list ran - reading it failed: {feed_error[0]}")
+    return sorted(results, key=lambda r: r["index"]), pool_stats
+
+
+def summarize_pool_stats(pool_stats):
+    """Combine per-worker browser pool stats into run totals"""
+    checkouts = sum(s["checkouts"] for s in pool_stats)
+    hits = sum(s["hits"] for s in pool_stats)
+    return {
+        "checkouts": checkouts,
+        "hit_rate": round(hits / checkouts, 3) if checkouts else 0,
+        "browsers_started": sum(s["misses"] for s in pool_stats),
+        "recycled": sum(s["recycled"] for s in pool_stats),
+        "retired_for_memory": sum(s.get("retired_for_memory", 0) for s in pool_stats),
+        "wait_total": round(sum(s["wait_total"] for s in pool_stats), 2),
+        "workers": [{k: v for k, v in s.items() if k != "memory"} for s in pool_stats],
+    }
+
+
+def summarize_memory(pool_stats):
+    """Memory of every browser over the run, from the workers' watchdogs
+    Timeline rows are [seconds since first sample, worker, browser, MB] (+ "checkin" for the
+    samples taken between journeys, where a browser over the limit gets replaced)"""
+    samples = []
+    for s in pool_stats:
+        for row in s.get("memory", {}).get("timeline", []):
+            samples.append([row[0], s["worker"]] + row[1:])
+    samples.sort(key=lambda row: row[0])
+    started = samples[0][0] if samples else 0
+    return {
+        "limit_mb": next((s["memory"]["limit_mb"] for s in pool_stats if "memory" in s), None),
+        "peak_mb": max((s.get("memory", {}).get("peak_mb", 0) for s in pool_stats), default=0),
+        "retired_for_memory": sum(s.get("retired_for_memory", 0) for s in pool_stats),
+        "timeline": [[round(row[0] - started, 1)] + row[1:] for row in samples],
+    }
+
+
+def summarize_modes(results):
+    """Average time until the results page was ready, per journey mode, and the time direct
+    mode saved compared to full journeys in the same run (needs both modes in the run)"""
+    modes = {}
+    for mode in JOURNEY_MODES:
+        times = [r["time_to_results"] for r in results
+                 if r.get("mode") == mode and r.get("time_to_results") is not None]
+        modes[mode] = {
+            "journeys": sum(1 for r in results if r.get("mode") == mode),
+            "avg_time_to_results": round(sum(times) / len(times), 2) if times else None,
+        }
+    full, direct = modes["full"]["avg_time_to_results"], modes["direct"]["avg_time_to_results"]
+    saved = None
+    if full is not None and direct is not None:
+        saved = {
+            "per_journey": round(full - direct, 2),
+            "total": round((full - direct) * modes["direct"]["journeys"], 1),
+        }
+    return {"modes": modes, "time_saved": saved}
+
+
+def summarize_retries(results):
+    """How often journeys were retried, how many retries resumed from a checkpoint and the time
+    that saved compared to starting again at the homepage"""
+    retries = [retry for r in results for retry in r.get("retries", [])]
+    return {
+        "retries": len(retries),
+        "resumed": sum(1 for retry in retries if retry["resumed_from"]),
+        "passed_after_retry": sum(1 for r in results if r["passed"] and r.get("retries")),
+        "resumed_from": {name: sum(1 for retry in retries if retry["resumed_from"] == name)
+                         for name in sorted({retry["resumed_from"] for retry in retries if retry["resumed_from"]})},
+        "time_saved": round(sum(r.get("time_saved_by_resume", 0) for r in results), 1),
+    }
+
+
+def merge_worker_traces(run_id, workers):
+    """One trace file for the whole run, with a row per worker process in the trace viewer"""
+    from framework.tracing import merge_trace_files
+
+    trace_dir = os.path.join(RunSettings.TRACE_DIR, run_id)
+    paths = [os.path.join(trace_dir, f"worker_{i}.trace.json") for i in range(workers)]
+    return merge_trace_files(paths, os.path.join(trace_dir, "run.trace.json"))
+
+
+def write_report(results, workers, elapsed, pool_stats, run_id, trace_path=None, tabs=1, source=None,
+                 schedule=None, throttle=None):
+    """Save results as JSON so nightly runs can be compared"""
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR, f"matrix_{run_id}.json")
+    report = {
+        "workers": workers,
+        "tabs": tabs,
+        "elapsed": round(elapsed, 2),
+        "total": len(results),
+        "passed": sum(1 for r in results if r["passed"]),
+        "driver_pool": summarize_pool_stats(pool_stats),
+        "memory": summarize_memory(pool_stats),
+        "journey_modes": summarize_modes(results),
+        "retries": summarize_retries(results),
+        "variant_source": source,
+        "schedule": schedule,
+        "throttle": throttle,
+        "journeys_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else None,
+        "trace": trace_path,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_summary(results):
+    """Print one line per variant and the totals"""
+    print("\n" + "="*70)
+    for r in results:
+        status = "[PASS]" if r["passed"] else "[FAIL]"
+        detail = f"{r['verdict']} / {r['color']}" if r["passed"] else r["error"]
+        mode = " [direct]" if r.get("mode") == "direct" else ""
+        print(f"  {status} {r['variant']} ({r['genome']}){mode} - {detail}")
+        if r.get("artifacts"):
+            print(f"         artifacts: {r['artifacts']}")
+    passed = sum(1 for r in results if r["passed"])
+    print("-"*70)
+    print(f"Passed: {passed}/{len(results)}")
+    retries = summarize_retries(results)
+    if retries["retries"]:
+        print(f"Retries: {retries['retries']} ({retries['resumed']} from a checkpoint), "
+              f"{retries['passed_after_retry']} passed after retry, {retries['time_saved']}s saved by resuming")
+    modes = summarize_modes(results)
+    if modes["modes"]["direct"]["journeys"]:
+        averages = ", ".join(f"{mode} {m['avg_time_to_results']}s" for mode, m in modes["modes"].items()
+                             if m["avg_time_to_results"] is not None)
+        print(f"Time to results page: {averages}")
+        if modes["time_saved"]:
+            print(f"Direct links saved {modes['time_saved']['per_journey']}s per journey, "
+                  f"{modes['time_saved']['total']}s in total")
+        else:
+            print("Time saved by direct links needs at least one full journey in the run to compare")
+    print("="*70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the VarSome journey for a list of variants")
+    parser.add_argument("variant_list", help="CSV/TSV file with variant, genome, expected_verdict, expected_color, "
+                                             "mode, profile - or a VCF / .vcf.gz")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of parallel browsers (default: based on CPU cores and free RAM)")
+    parser.add_argument("--max-uses", type=int, default=RunSettings.DRIVER_MAX_USES,
+                        help="Journeys per browser before it is replaced with a fresh one")
+    parser.add_argument("--memory-limit", type=int, default=None,
+                        help=f"Replace a browser between journeys once it uses more MB than this "
+                             f"(default {RunSettings.BROWSER_MEMORY_LIMIT_MB}, 0 = never)")
+    parser.add_argument("--tabs", type=int, default=1,
+                        help="Journeys run at once in each browser, one tab each (saves memory)")
+    parser.add_argument("--mode", choices=JOURNEY_MODES, default=None,
+                        help=f"Journey for variants without a mode column (default {RunSettings.JOURNEY_MODE}): "
+                             f"full = homepage search and modal, direct = open the results URL")
+    parser.add_argument("--allow-direct", action="store_true",
+                        help="Run direct journeys as direct - they run as full ones until the results URL "
+                             "parameters are confirmed (same as VARSOME_DIRECT_MODE=1)")
+    parser.add_argument("--genes", default=None,
+                        help="Only run variants in these genes - comma separated, or a file with one gene per line")
+    parser.add_argument("--region", default=None,
+                        help="Only run variants in these regions, e.g. 7:140700000-140800000,chr17")
+    parser.add_argument("--genome", choices=["hg19", "hg38"], default=None,
+                        help="Genome for rows / VCFs that dont give one (VCFs are read from their header)")
+    parser.add_argument("--schedule", choices=["lpt", "fifo"], default=RunSettings.SCHEDULE,
+                        help=f"lpt = longest expected journey first from past durations, with work stealing - "
+                             f"planned in windows, so up to {RunSettings.SCHEDULE_WINDOW} variants are held in memory "
+                             f"(--genes / --region dont lower that); fifo = list order, read as the run goes")
+    parser.add_argument("--flaky-first", action="store_true", default=RunSettings.SCHEDULE_FLAKY_FIRST,
+                        help="With lpt, start variants that often failed before first so their retries overlap the run")
+    parser.add_argument("--no-throttle", action="store_true",
+                        help="Always keep every worker busy, even when the site shows security checks or slows down")
+    parser.add_argument("--retries", type=int, default=None,
+                        help=f"Retries of a failed journey, resumed from the last checkpoint "
+                             f"(default {RunSettings.JOURNEY_RETRIES}, 0 = no retries)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record step / BasePage / WebDriver command timings (same as VARSOME_TRACE=1)")
+    parser.add_argument("--profile-template", nargs="?", const=RunSettings.DEFAULT_PROFILE_TEMPLATE, default=None,
+                        help="Start every browser from a copy of this pre-seeded profile (built if missing)")
+    args = parser.parse_args(argv)
+    if args.allow_direct:
+        RunSettings.DIRECT_MODE = True
+
+    source = VariantSource(args.variant_list, parse_genes(args.genes), parse_regions(args.region),
+                           args.mode, args.genome)
+    tabs = max(1, args.tabs)
+    workers = args.workers or default_worker_count()
+
+    # Only the first few cases are read now - enough to know if every worker has something to do
+    cases = iter(source)
+    first = list(itertools.islice(cases, workers * tabs))
+    if not first:
+        print("No variants found in list")
+        return 1
+    workers = min(workers, -(-len(first) // tabs))
+    cases = itertools.chain(first, cases)
+    print(f"Running variants from {args.variant_list} with {workers} workers" + (f", {tabs} tabs each" if tabs > 1 else ""))
+
+    history = JourneyHistory()
+    scheduler = None
+    if args.schedule == "lpt":
+        # Reads the first window of the list
+        scheduler = Scheduler(cases, workers, tabs, history, args.flaky_first)
+        print(f"Longest first in windows of {scheduler.window} variants - "
+              f"first window predicted to take {scheduler.predicted_makespan()}s")
+
+    if args.profile_template:
+        if not os.path.isdir(args.profile_template):
+            from framework.browser_profile import build_profile_template
+            build_profile_template(args.profile_template)
+        os.environ["VARSOME_PROFILE_TEMPLATE"] = args.profile_template  # Worker processes inherit it
+
+    if args.memory_limit is not None:
+        os.environ["VARSOME_MEMORY_LIMIT_MB"] = str(args.memory_limit)  # Worker processes inherit it
+
+    if args.retries is not None:
+        os.environ["VARSOME_JOURNEY_RETRIES"] = str(args.retries)  # Worker processes inherit it
+
+    if args.trace:
+        os.environ["VARSOME_TRACE"] = "1"  # Worker processes inherit it
+    tracing = os.environ.get("VARSOME_TRACE", "") not in ("", "0")
+
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    started = time.time()
+    throttle = ThrottleController(workers * tabs) if RunSettings.THROTTLE and not args.no_throttle else None
+    results, pool_stats = run_matrix(cases, workers, args.max_uses, run_id, tabs, scheduler, throttle)
+    elapsed = time.time() - started
+    history.record(results)
+    history.save()
+    schedule = scheduler.report(results) if scheduler else None
+    throttle_state = throttle.state() if throttle else None
+    trace_path = merge_worker_traces(run_id, workers) if tracing else None
+
+    print_summary(results)
+    source_stats = source.stats()
+    if source_stats["skipped"]:
+        skipped = ", ".join(f"{count} {reason}" for reason, count in source_stats["skipped"].items())
+        print(f"Variant list: {source_stats['read']} read, {source_stats['cases']} run, skipped: {skipped}")
+    pool_summary = summarize_pool_stats(pool_stats)
+    print(f"Browser pool: {pool_summary['browsers_started']} started, hit rate {pool_summary['hit_rate']:.0%}, "
+          f"checkout wait {pool_summary['wait_total']}s")
+    memory = summarize_memory(pool_stats)
+    print(f"Browser memory: peak {memory['peak_mb']} MB, {memory['retired_for_memory']} replaced for memory")
+    if schedule:
+        print(f"Makespan: predicted {schedule['predicted_makespan']}s, actual {schedule['actual_makespan']}s "
+              f"({schedule['without_history']} variants without history, {schedule['steals']} steals)")
+    if throttle_state:
+        signals = ", ".join(f"{name} {count}" for name, count in throttle_state["signals"].items())
+        print(f"Throttle: {int(throttle_state['limit'])} of {throttle_state['max_concurrency']} journeys at once "
+              f"at the end (best {throttle_state['best_limit']}), {throttle_state['cuts']} backoffs - {signals}")
+    report_path = write_report(results, workers, elapsed, pool_stats, run_id, trace_path, tabs, source_stats,
+                               schedule, throttle_state)
+    print(f"Report saved as: {report_path} ({elapsed:.1f}s)")
+    if trace_path:
+        print(f"Timing trace saved as: {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+
+    return 0 if all(r["passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
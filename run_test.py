@@ -1,60 +1,151 @@
 """
 Simple run script for VarSome Test Automation
 Makes it easy to run the test - just execute: python run_test.py
+The test runs in this interpreter and Chrome starts in the background while the test is
+imported. python run_test.py --subprocess runs it in a separate interpreter like before
 """
 
+import importlib.util
+import json
+import os
 import subprocess
 import sys
-import os
+import threading
+import time
+from datetime import datetime
+
+STARTED = time.perf_counter()  # Cold start is measured from here
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Only looked up, not imported - costs well under a millisecond when they are installed
+REQUIRED_MODULES = ["selenium"]
 
 
 def check_requirements():
     """Check if required packages are installed
     If not, install them automatically"""
-    try:
-        import selenium
-        import webdriver_manager
+    missing = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+    if not missing:
         print("Required packages found")
         return True
-    except ImportError:
-        print("Missing required packages")
-        print("\nInstalling packages now...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "selenium", "webdriver-manager"])
-        print("Packages installed successfully")
-        return True
 
+    print(f"Missing required packages: {', '.join(missing)}")
+    print("\nInstalling packages now...")
+    result = subprocess.run([sys.executable, "-m", "pip", "install", "-r",
+                             os.path.join(PROJECT_DIR, "requirements.txt")])
+    if result.returncode != 0:
+        print("Could not install packages - run: pip install -r requirements.txt")
+        return False
+    importlib.invalidate_caches()
+    print("Packages installed successfully")
+    return True
+
+
+def start_browser_in_background(timings):
+    """Start Chrome while the test module is being imported
+    The browser waits idle in the shared pool until the test checks it out"""
+    def warm():
+        try:
+            from framework.driver_cache import last_resolution
+            from framework.driver_pool import get_shared_pool
+            get_shared_pool().warm()
+            timings["driver_lookup"] = dict(last_resolution)
+        except Exception as e:
+            # The test starts its own browser and shows the real error
+            timings["browser_error"] = str(e).splitlines()[0] if str(e) else repr(e)
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+def run_in_process(timings):
+    """Load and run the test here - no second interpreter, imports overlap with Chrome starting"""
+    import unittest
+
+    sys.path.insert(0, PROJECT_DIR)
+    start_browser_in_background(timings)
+
+    import_started = time.perf_counter()
+    suite = unittest.defaultTestLoader.loadTestsFromName("test_germline_variant")
+    timings["test_import"] = round(time.perf_counter() - import_started, 3)
+    timings["ready_to_run"] = round(time.perf_counter() - STARTED, 3)
+
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
 
-def run_test():
+    from framework.driver_pool import get_shared_pool
+    pool = get_shared_pool()
+    if pool.start_times:
+        timings["browser_start"] = round(pool.start_times[0], 3)
+    if pool.wait_times:
+        # How long after launch the test had its browser - what we want to keep small
+        timings["cold_start"] = round(timings["ready_to_run"] + pool.wait_times[0], 3)
+    return result.wasSuccessful()
+
+
+def run_in_subprocess():
+    """Run the test file in a separate interpreter"""
+    result = subprocess.run([sys.executable, os.path.join(PROJECT_DIR, "test_germline_variant.py")])
+    return result.returncode == 0
+
+
+def report_cold_start(timings, mode):
+    """Print startup timings and append them to results/startup_history.jsonl"""
+    print("\nCold start:")
+    for key in ("preflight", "test_import", "ready_to_run", "browser_start", "cold_start"):
+        if key in timings:
+            print(f"  {key:<14}{timings[key]:.3f}s")
+    lookup = timings.get("driver_lookup")
+    if lookup:
+        print(f"  driver lookup {lookup['seconds']:.3f}s ({lookup['source'] or 'selenium default'})")
+
+    from locators import RunSettings
+    results_dir = os.path.join(PROJECT_DIR, RunSettings.RESULTS_DIR)
+    os.makedirs(results_dir, exist_ok=True)
+    entry = {"time": datetime.now().isoformat(timespec="seconds"), "mode": mode, **timings}
+    with open(os.path.join(results_dir, "startup_history.jsonl"), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def run_test(use_subprocess=False):
     """Run the main test file"""
     print("\n" + "="*70)
     print(" VarSome Test Automation - Starting Test Run")
     print("="*70)
     print("\nChecking requirements first...")
-    
+
+    timings = {}
     if not check_requirements():
         return
-    
+    timings["preflight"] = round(time.perf_counter() - STARTED, 3)
+
     print("\nStarting test execution...")
     print("-"*70)
-    
+
     # Run the actual test
-    result = subprocess.run([sys.executable, "test_germline_variant.py"])
-    
-    if result.returncode == 0:
+    if use_subprocess:
+        passed = run_in_subprocess()
+    else:
+        passed = run_in_process(timings)
+
+    if passed:
         print("\nTest execution completed successfully!")
     else:
         print("\nTest execution failed - check output above for details")
-    
+
+    if not use_subprocess:
+        report_cold_start(timings, "in-process")
     print("="*70)
 
 
 if __name__ == "__main__":
     try:
-        run_test()
+        run_test(use_subprocess="--subprocess" in sys.argv[1:])
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
     except Exception as e:
         print(f"\nError occured: {e}")
         print("Make sure all files are in correct location")
-    
-    input("\nPress Enter to exit...")
\ No newline at end of file
+
+    input("\nPress Enter to exit...")
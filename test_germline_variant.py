@@ -5,17 +5,22 @@ Using Page Object Model Pattern
 This is the main test file that runs the actual test scenario
 """
 
+import os
 import unittest
 from datetime import datetime
-from selenium import webdriver
-import time
 # Import our page objects
 from pages.home_page import HomePage
 from pages.sample_info_modal import SampleInfoModal
 from pages.results_page import ResultsPage
 
 # Import test data
-from locators import TestData
+from locators import TestData, RunSettings
+from framework.driver_pool import get_shared_pool
+from framework.evidence import get_evidence_writer
+from framework.failure_capture import capture_failure
+from framework.network_monitor import NetworkMonitor
+from framework.sample_profiles import load_profile
+from framework.tracing import TRACER
 
 
 class TestGermlineVariantClassification(unittest.TestCase):
@@ -32,29 +37,28 @@ class TestGermlineVariantClassification(unittest.TestCase):
         print(f"Test Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("-"*70)
         
-        # Setup Chrome with options to avoid detection and popups
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Hide that its automated
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        chrome_options.add_argument("--disable-notifications")
-        chrome_options.add_argument("--disable-popup-blocking")
-        chrome_options.add_argument("--log-level=3")  # Reduce console noise
-        
-        # Initialize Chrome driver - it will auto download chromedriver if needed
-        cls.driver = webdriver.Chrome(options=chrome_options)
+        # Browser comes from the shared pool - reused warm if another test class already started one
+        # Chrome is started (and chromedriver downloaded) only when the pool has no idle browser
+        cls.driver = get_shared_pool().checkout()
         
         # Create page objects for each page we'll interact with
         cls.home_page = HomePage(cls.driver)
         cls.modal = SampleInfoModal(cls.driver)
-        cls.results_page = ResultsPage(cls.driver)
+        # Results page waits for the variant API responses instead of polling the page
+        cls.results_page = ResultsPage(cls.driver, network=NetworkMonitor.for_driver(cls.driver))
         
     @classmethod
     def tearDownClass(cls):
         """Cleanup after all tests are done"""
         print("\n" + "-"*70)
         input("Press Enter to close browser...")  # Let me see results before closing
-        cls.driver.quit()
+        get_shared_pool().checkin(cls.driver)  # Reset and kept warm, pool quits it at exit
+        
+        # Step and WebDriver timings when VARSOME_TRACE=1
+        trace_files = TRACER.export(os.path.join(RunSettings.TRACE_DIR,
+                                                 f"test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"))
+        if trace_files:
+            print(f"Timing trace saved as: {trace_files[1]}")
         print(f"Test Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*70)
     
@@ -64,11 +68,14 @@ class TestGermlineVariantClassification(unittest.TestCase):
         
     def tearDown(self):
         """Cleanup after each test method
-        Take screenshot if test fails for debugging"""
+        Take screenshot if test fails for debugging, plus DOM / console / network log"""
+        TRACER.end_step()  # Failed step is still open
         if not self.test_passed:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            self.driver.save_screenshot(f"failure_{timestamp}.png")
-            print(f"Failure screenshot saved")
+            path = get_evidence_writer().capture(self.driver, f"failure_{timestamp}.png")
+            print(f"Failure screenshot saved: {path}")
+            capture_failure(self.driver, TestData.VARIANT, TestData.GENOME,
+                            reason=self._testMethodName, network=self.results_page.network)
             
     def test_verify_braf_v600e_pathogenic_classification(self):
         """
@@ -87,12 +94,14 @@ class TestGermlineVariantClassification(unittest.TestCase):
         try:
             # STEP 1: Launch VarSome Website
             print("\n[STEP 1] Launching VarSome Website")
+            TRACER.start_step("STEP 1 Launching VarSome Website")
             success = self.home_page.navigate_to_homepage()
             self.assertTrue(success, "Failed to load VarSome homepage")
             print("Homepage loaded successfully")
             
             # STEP 2: Search for the variant
             print("\n[STEP 2] Starting Variant Search")
+            TRACER.start_step("STEP 2 Starting Variant Search")
             
             # Enter BRAF:V600E in search box
             self.assertTrue(
@@ -117,6 +126,7 @@ class TestGermlineVariantClassification(unittest.TestCase):
             
             # STEP 3: Handle Optional Sample Information Modal
             print("\n[STEP 3] Checking for Optional Sample Information Modal")
+            TRACER.start_step("STEP 3 Checking for Optional Sample Information Modal")
             
             # The modal doesnt always appear
             modal_appeared = self.modal.check_if_modal_appears()
@@ -131,20 +141,10 @@ class TestGermlineVariantClassification(unittest.TestCase):
                 )
                 print("Germline tab selected")
                 
-                # Fill all the fields
-                print("Filling patient information:")
-                self.modal.fill_phenotype(TestData.PHENOTYPE)
-                print(f"  Phenotype: {TestData.PHENOTYPE}")
-                
-                self.modal.select_sex(TestData.SEX)
-                print(f"  Sex: {TestData.SEX}")
-                
-                self.modal.enter_age(TestData.AGE)
-                print(f"  Age: {TestData.AGE}")
-                
-                self.modal.select_ethnicity(TestData.ETHNICITY)
-                print(f"  Ethnicity: {TestData.ETHNICITY}")
-                
+                # Fill all the fields - one batched action sequence, then one read-back
+                # Values come from profiles/default.json (or VARSOME_SAMPLE_PROFILE)
+                if not self.modal.fill_profile(load_profile()):
+                    print(f"Warning: modal shows {self.modal.last_fill['values']}")
                 print("  Other fields left blank (not required)")
                 
                 # Submit the modal
@@ -168,12 +168,11 @@ class TestGermlineVariantClassification(unittest.TestCase):
             
             # STEP 4: Verify Results Page
             print("\n[STEP 4] Verifying Results Page")
-            
-            time.sleep(5)  # Give page time to load all data
+            TRACER.start_step("STEP 4 Verifying Results Page")
             
             # Wait for results to load
             self.assertTrue(
-                self.results_page.wait_for_results_page(),
+                self.results_page.wait_for_results_page(TestData.VARIANT, TestData.GENOME),
                 "Results page did not load"
             )
             print("Results page loaded")
@@ -187,8 +186,9 @@ class TestGermlineVariantClassification(unittest.TestCase):
             
             # Check what sections loaded
             print("\nChecking page sections:")
-            sections = self.results_page.verify_page_sections(print_results=True)
-            time.sleep(5)  # Let all sections load
+            # Checks all cards together and returns once Germline Classification is there
+            sections = self.results_page.verify_page_sections(print_results=True,
+                                                              required=["Germline Classification"])
             
             # We need at least Germline Classification section
             required_sections = {
@@ -214,6 +214,7 @@ class TestGermlineVariantClassification(unittest.TestCase):
             
             # STEP 5: Expand Germline Classification
             print("\n[STEP 5] Expanding Germline Classification Section")
+            TRACER.start_step("STEP 5 Expanding Germline Classification Section")
             
             # Verify section is there
             self.assertTrue(
@@ -231,6 +232,7 @@ class TestGermlineVariantClassification(unittest.TestCase):
             
             # STEP 6: Verify Classification Results
             print("\n[STEP 6] Verifying Classification Verdict")
+            TRACER.start_step("STEP 6 Verifying Classification Verdict")
             
             # Get the classification details
             classification = self.results_page.verify_pathogenic_classification()
@@ -241,6 +243,8 @@ class TestGermlineVariantClassification(unittest.TestCase):
                 "Could not find verdict text"
             )
             print(f"Verdict found: {classification['verdict_text']}")
+            if classification["criteria"]:
+                print(f"ACMG criteria: {', '.join(classification['criteria'])}")
             
             # Verify its Pathogenic
             self.assertTrue(
@@ -266,7 +270,7 @@ class TestGermlineVariantClassification(unittest.TestCase):
             # Take screenshot for proof
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_file = f"success_pathogenic_{timestamp}.png"
-            self.results_page.take_verdict_screenshot(screenshot_file)
+            screenshot_file = self.results_page.take_verdict_screenshot(screenshot_file)
             print(f"\nScreenshot saved: {screenshot_file}")
             
             # Final check - both text and color must be right
@@ -275,6 +279,7 @@ class TestGermlineVariantClassification(unittest.TestCase):
                 "Classification verification failed"
             )
             
+            TRACER.end_step()
             print("\n" + "="*70)
             print("TEST PASSED: BRAF:V600E correctly shows as Pathogenic in red")
             print("="*70)
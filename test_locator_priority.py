@@ -0,0 +1,74 @@
+"""
+Test Case: Learned locator order with framework.locator_priority
+No browser needed - the store file lives in a temporary folder
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from selenium.webdriver.common.by import By
+
+from framework.locator_priority import LocatorPriorityStore
+from locators import CompositeLocator, RunSettings
+
+PRIMARY = (By.CSS_SELECTOR, "#search")
+FALLBACK = (By.CSS_SELECTOR, "input[type='text']")
+LAST = (By.XPATH, "//input")
+
+
+class TestLocatorPriorityStore(unittest.TestCase):
+    """A fallback only takes over after a majority of recent wins, and wins survive a restart"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "priority.json")
+        self.composite = CompositeLocator("search_input", PRIMARY, FALLBACK, LAST)
+        self.store = LocatorPriorityStore(path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_primary_first_without_history(self):
+        self.assertEqual(self.store.ordered(self.composite), [PRIMARY, FALLBACK, LAST])
+
+    def test_single_win_does_not_promote(self):
+        self.store.record_win(self.composite, LAST)
+        # Still primary first - the winner only moves ahead of the other fallback
+        self.assertEqual(self.store.ordered(self.composite), [PRIMARY, LAST, FALLBACK])
+
+    def test_majority_of_recent_wins_promotes(self):
+        for _ in range(RunSettings.LOCATOR_PRIORITY_MIN_WINS - 1):
+            self.store.record_win(self.composite, FALLBACK)
+        self.assertEqual(self.store.ordered(self.composite)[0], PRIMARY)
+
+        self.store.record_win(self.composite, FALLBACK)
+        self.assertEqual(self.store.ordered(self.composite)[0], FALLBACK)
+        # Written as soon as the preference changes, not only at exit
+        self.assertEqual(LocatorPriorityStore(path=self.path).ordered(self.composite)[0], FALLBACK)
+
+    def test_no_promotion_without_majority(self):
+        for _ in range(RunSettings.LOCATOR_PRIORITY_MIN_WINS + 1):
+            self.store.record_win(self.composite, PRIMARY)
+            self.store.record_win(self.composite, FALLBACK)
+        self.assertEqual(self.store.ordered(self.composite)[0], PRIMARY)
+
+    def test_wins_of_two_processes_are_merged(self):
+        other = LocatorPriorityStore(path=self.path)
+        self.store.record_win(self.composite, LAST)
+        other.record_win(self.composite, LAST)
+        other.record_win(self.composite, FALLBACK)
+        self.store.save()
+        other.save()
+
+        saved = LocatorPriorityStore(path=self.path).data["search_input"]
+        self.assertEqual(saved["wins"], {f"{LAST[0]}={LAST[1]}": 2, f"{FALLBACK[0]}={FALLBACK[1]}": 1})
+
+    def test_save_without_new_wins_writes_nothing(self):
+        self.store.save()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,64 @@
+"""
+Test Case: Results page readiness from intercepted API responses
+Runs against the local stand-in server (tools/stand_in_server.py), no internet needed
+"""
+
+import unittest
+from urllib.parse import quote
+
+from framework.driver_factory import create_driver
+from framework.network_monitor import NetworkMonitor
+from locators import RunSettings
+from pages.results_page import ResultsPage
+from tools.stand_in_server import start_server
+
+
+class TestNetworkReadiness(unittest.TestCase):
+    """ResultsPage should notice the variant's API calls finishing and expose their payloads"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.readiness = RunSettings.NETWORK_READINESS
+        RunSettings.NETWORK_READINESS = True  # The ApiEndpoints patterns match the stand-in server
+        cls.server, cls.base_url = start_server(api_delay=0.3)
+        cls.driver = create_driver(profile="lean")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.quit()
+        cls.server.shutdown()
+        RunSettings.NETWORK_READINESS = cls.readiness
+
+    def setUp(self):
+        self.network = NetworkMonitor.for_driver(self.driver)
+        self.network.reset()
+        self.results_page = ResultsPage(self.driver, network=self.network)
+
+    def open_variant(self, variant, genome="hg38"):
+        self.driver.get(f"{self.base_url}/variant/{genome}/{quote(variant, safe='')}")
+
+    def test_waits_for_annotation_and_classification_responses(self):
+        self.open_variant("BRAF:V600E")
+
+        self.assertTrue(self.results_page.wait_for_results_page("BRAF:V600E", "hg38"))
+        self.assertEqual(set(self.results_page.api_responses), {"annotation", "classification"})
+        for info in self.results_page.api_responses.values():
+            self.assertEqual(info["status"], 200)
+
+    def test_payloads_are_exposed_for_verification(self):
+        self.open_variant("BRAF:V600E")
+        self.results_page.wait_for_results_page("BRAF:V600E", "hg38")
+
+        classification = self.results_page.api_payloads["classification"]
+        self.assertEqual(classification["verdict"], "Pathogenic")
+        self.assertEqual(self.results_page.api_payloads["annotation"]["gene"], "BRAF")
+
+    def test_other_variants_responses_are_not_matched(self):
+        self.open_variant("TP53:R175H")
+
+        self.assertFalse(self.results_page.wait_for_api_responses("BRAF:V600E", "hg38", timeout=2))
+        self.assertEqual(self.results_page.api_responses, {})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
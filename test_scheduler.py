@@ -0,0 +1,112 @@
+"""
+Test Case: Variant ordering with framework.scheduler
+No browser needed - the journey history lives in a temporary folder
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from framework.journey import VariantCase
+from framework.scheduler import JourneyHistory, Scheduler, history_key
+
+
+class TestScheduler(unittest.TestCase):
+    """Longest expected journeys first, spread so workers finish together, idle workers steal"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.history = JourneyHistory(path=os.path.join(self.folder, "history.json"))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def cases(self, durations, failures=None):
+        """One case per duration, with that duration as its whole history"""
+        cases = []
+        for i, seconds in enumerate(durations):
+            case = VariantCase(f"GENE{i}:V1", "hg38", mode="full")
+            self.history.data[history_key(case.variant, case.genome, case.mode)] = {
+                "durations": [seconds], "runs": 5, "failures": (failures or {}).get(i, 0)}
+            cases.append(case)
+        return cases
+
+    def durations(self, queue):
+        return [self.history.expected_duration(case) for _, case in queue]
+
+    def test_longest_first_over_workers(self):
+        scheduler = Scheduler(self.cases([4, 10, 2, 8, 6]), workers=2, history=self.history)
+
+        self.assertEqual(self.durations(scheduler.queues[0]), [10, 4, 2])
+        self.assertEqual(self.durations(scheduler.queues[1]), [8, 6])
+        self.assertEqual(scheduler.predicted_makespan(), 16)
+
+    def test_slots_share_a_workers_load(self):
+        scheduler = Scheduler(self.cases([10, 10, 10, 10]), workers=1, slots=2, history=self.history)
+        self.assertEqual(scheduler.predicted_makespan(), 20)
+
+    def test_flaky_first(self):
+        scheduler = Scheduler(self.cases([10, 2], failures={1: 3}), workers=1, history=self.history,
+                              flaky_first=True)
+        self.assertEqual(self.durations(scheduler.queues[0]), [2, 10])
+        self.assertEqual(scheduler.flaky, 1)
+
+    def test_windows_read_the_list_lazily(self):
+        cases = self.cases([1, 2, 3, 4, 5])
+        read = []
+
+        def source():
+            for case in cases:
+                read.append(case)
+                yield case
+
+        scheduler = Scheduler(source(), workers=1, history=self.history, window=2)
+        self.assertEqual(len(read), 2)
+        # Longest first within each window, windows in list order
+        handed_out = []
+        while True:
+            task = scheduler.next_task(0)
+            if task is None:
+                break
+            handed_out.append(self.history.expected_duration(task[1]))
+        self.assertEqual(handed_out, [2, 1, 4, 3, 5])
+        self.assertEqual(scheduler.windows, 3)
+        self.assertEqual(scheduler.predicted_makespan(), 15)
+        self.assertEqual(scheduler.expected, {})
+
+    def test_broken_list_stops_cleanly(self):
+        def source():
+            yield from self.cases([1, 2])
+            raise ValueError("bad line")
+
+        scheduler = Scheduler(source(), workers=1, history=self.history, window=10)
+        self.assertEqual(scheduler.total, 2)
+        self.assertEqual(scheduler.error, "bad line")
+
+    def test_idle_worker_steals_from_the_busiest(self):
+        scheduler = Scheduler(self.cases([10, 9, 1, 1, 1]), workers=2, history=self.history)
+        while scheduler.queues[1]:
+            scheduler.next_task(1)
+
+        index, case = scheduler.next_task(1)
+        self.assertEqual(scheduler.steals, 1)
+        self.assertEqual(self.history.expected_duration(case), 1)  # From the back - the shortest one
+        self.assertEqual(len(scheduler.queues[0]), 1)
+
+    def test_history_round_trip(self):
+        case = VariantCase("BRAF:V600E", "hg38", mode="full")
+        self.history.record([{"variant": case.variant, "genome": case.genome, "mode": "full",
+                              "duration": 12.5, "passed": False},
+                             {"variant": case.variant, "genome": case.genome, "mode": "full",
+                              "duration": 0, "passed": False}])  # Never ran
+        self.history.save()
+
+        loaded = JourneyHistory(path=self.history.path)
+        self.assertEqual(loaded.expected_duration(case), 12.5)
+        self.assertEqual(loaded.failure_rate(case), 1.0)
+        self.assertEqual(loaded.default_duration, 12.5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
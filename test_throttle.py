@@ -0,0 +1,99 @@
+"""
+Test Case: Journey throttling with framework.throttle.ThrottleController
+No browser needed - the clock is faked so the token bucket can be tested without waiting
+"""
+
+import unittest
+from unittest import mock
+
+from framework.throttle import ThrottleController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestThrottleController(unittest.TestCase):
+    """The bucket should space out starts and the AIMD limit should react to congestion signals"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("framework.throttle.time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_token_refill(self):
+        throttle = ThrottleController(4, rate_per_minute=60)
+        for _ in range(4):
+            self.assertTrue(throttle.try_acquire())  # Full bucket - the first wave starts at once
+        throttle.release(4)
+        self.assertFalse(throttle.try_acquire())  # Slots free, but no tokens left
+
+        self.clock.now += 1  # 60 per minute is one token per second
+        self.assertTrue(throttle.try_acquire())
+        self.assertFalse(throttle.try_acquire())
+
+    def test_limit_caps_journeys_in_flight(self):
+        throttle = ThrottleController(2, rate_per_minute=600)
+        self.assertTrue(throttle.try_acquire())
+        self.assertTrue(throttle.try_acquire())
+        self.clock.now += 10
+        self.assertFalse(throttle.try_acquire())
+
+        throttle.finished({"passed": True, "duration": 5})
+        self.assertTrue(throttle.try_acquire())
+
+    def test_release_frees_slots_of_dead_workers(self):
+        throttle = ThrottleController(2, rate_per_minute=600)
+        throttle.try_acquire()
+        throttle.try_acquire()
+        throttle.release(2)
+        self.assertEqual(throttle.in_flight, 0)
+        throttle.release(1)
+        self.assertEqual(throttle.in_flight, 0)  # Never below zero
+
+    def test_back_off_once_per_episode(self):
+        throttle = ThrottleController(8, rate_per_minute=100)
+        for _ in range(3):
+            throttle.try_acquire()
+        self.clock.now += 30
+        throttle.finished({"passed": False, "security_check": True, "duration": 20})
+        self.assertEqual((throttle.limit, throttle.rate, throttle.cuts), (4.0, 50.0, 1))
+
+        # Started before the cut - ran at the old limit, so no second cut for the same episode
+        throttle.finished({"passed": False, "failed_step": 4, "duration": 25})
+        self.assertEqual((throttle.limit, throttle.cuts), (4.0, 1))
+        self.assertEqual(throttle.signals, {"security_check": 1, "timeout": 1, "slow": 0})
+
+        # Started after it - a new episode
+        self.clock.now += 30
+        throttle.finished({"passed": False, "failed_step": 4, "duration": 10})
+        self.assertEqual((throttle.limit, throttle.cuts), (2.0, 2))
+
+    def test_additive_increase_up_to_max(self):
+        throttle = ThrottleController(3, rate_per_minute=100)
+        throttle.limit = 2.0
+        throttle.finished({"passed": True, "duration": 1})
+        self.assertEqual(throttle.limit, 2.5)
+        for _ in range(10):
+            throttle.finished({"passed": True, "duration": 1})
+        self.assertEqual(throttle.limit, 3.0)
+
+    def test_congestion_signals(self):
+        throttle = ThrottleController(2)
+        self.assertEqual(throttle.congestion({"passed": True, "retries": [{"failed_step": 5}]}), "timeout")
+        # A wrong verdict is an answer from the site, not a wait that ran out
+        self.assertIsNone(throttle.congestion({"passed": True, "retries": [{"failed_step": 6}]}))
+        self.assertIsNone(throttle.congestion({"passed": False, "failed_step": 6}))
+
+        throttle._recent = [10.0] * 5
+        self.assertEqual(throttle.congestion({"passed": True, "time_to_results": 30.0}), "slow")
+        self.assertIsNone(throttle.congestion({"passed": True, "time_to_results": 12.0}))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
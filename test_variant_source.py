@@ -0,0 +1,112 @@
+"""
+Test Case: Reading variant lists and VCFs with framework.variant_source
+No browser needed - the files are written to a temporary folder
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from framework.variant_source import VariantSource, parse_regions
+from locators import RunSettings
+
+VCF_HEADER = ("##fileformat=VCFv4.2\n"
+              "##reference=GRCh38\n"
+              "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n")
+
+
+def vcf_line(chrom, pos, ref, alt, info):
+    return f"{chrom}\t{pos}\t.\t{ref}\t{alt}\t.\tPASS\t{info}\n"
+
+
+class TestVariantSource(unittest.TestCase):
+    """VariantSource should yield one case per usable record and count what it skipped"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, text, gzipped=False):
+        path = os.path.join(self.folder, name)
+        with (gzip.open(path, "wt") if gzipped else open(path, "w")) as f:
+            f.write(text)
+        return path
+
+    def test_vcf_cases_from_info(self):
+        path = self.write("v.vcf", VCF_HEADER + vcf_line("chr7", 140753336, "A", "T,G", "GENE=BRAF;CLNSIG=Pathogenic"))
+        source = VariantSource(path)
+        cases = list(source)
+
+        self.assertEqual([c.variant for c in cases], ["chr7:140753336:A:T", "chr7:140753336:A:G"])
+        self.assertEqual({(c.genome, c.expected_verdict, c.expected_color) for c in cases},
+                         {("hg38", "Pathogenic", "red")})
+        self.assertEqual(source.format, "vcf")
+
+    def test_malformed_vcf_lines_are_skipped(self):
+        path = self.write("bad.vcf", VCF_HEADER
+                          + "7\t140753336\t.\tA\n"  # Too few columns
+                          + vcf_line("7", "not_a_position", "A", "T", "CLNSIG=Pathogenic")
+                          + vcf_line("7", 1, "A", "T", "CLNSIG")  # Flag without a value
+                          + vcf_line("7", 2, "A", "T", "CLNSIG=Pathogenic/Likely_pathogenic")
+                          + vcf_line("7", 3, "A", "<DEL>", "CLNSIG=Benign")
+                          + vcf_line("7", 4, "A", "C", "CLNSIG=Likely_benign"))
+        source = VariantSource(path)
+        cases = list(source)
+
+        self.assertEqual([(c.variant, c.expected_verdict) for c in cases], [("chr7:4:A:C", "Likely Benign")])
+        self.assertEqual(source.stats()["skipped"], {"malformed line": 2, "no verdict in INFO": 2,
+                                                     "symbolic allele": 1})
+
+    def test_gzipped_vcf(self):
+        path = self.write("v.vcf.gz", VCF_HEADER + vcf_line("17", 7675088, "C", "T", "CLNSIG=Pathogenic"),
+                          gzipped=True)
+
+        self.assertEqual([c.variant for c in VariantSource(path)], ["chr17:7675088:C:T"])
+
+    def test_gene_and_region_filters(self):
+        path = self.write("v.vcf", VCF_HEADER
+                          + vcf_line("7", 140753336, "A", "T", "GENEINFO=BRAF:673;CLNSIG=Pathogenic")
+                          + vcf_line("7", 140753337, "A", "T", "ANN=T|missense|MODERATE|KRAS|x;CLNSIG=Benign")
+                          + vcf_line("17", 7675088, "C", "T", "GENE=BRAF;CLNSIG=Pathogenic"))
+
+        by_gene = VariantSource(path, genes={"braf"})
+        self.assertEqual([c.variant for c in by_gene], ["chr7:140753336:A:T", "chr17:7675088:C:T"])
+        self.assertEqual(by_gene.stats()["skipped"], {"gene not in list": 1})
+
+        by_region = VariantSource(path, regions=parse_regions("chr7:140753300-140753340"))
+        self.assertEqual(len(list(by_region)), 2)
+        self.assertEqual(by_region.stats()["skipped"], {"outside region": 1})
+
+    @mock.patch.object(RunSettings, "DIRECT_MODE", True)
+    def test_table_rows(self):
+        path = self.write("list.tsv", "variant\tgenome\texpected_verdict\texpected_color\tmode\tprofile\n"
+                                      "# comment\n"
+                                      "BRAF:V600E\thg19\tPathogenic\tred\tdirect\n"
+                                      "TP53:R175H\n"
+                                      "chr7:140753336:A:T\t\t\t\tsideways\n")
+        cases = list(VariantSource(path, default_mode="full", genome="hg38"))
+
+        self.assertEqual([(c.variant, c.genome, c.mode) for c in cases],
+                         [("BRAF:V600E", "hg19", "direct"), ("TP53:R175H", "hg38", "full"),
+                          ("chr7:140753336:A:T", "hg38", "full")])
+
+    def test_direct_rows_run_full_until_direct_mode_is_on(self):
+        path = self.write("list.tsv", "BRAF:V600E\thg38\tPathogenic\t\tdirect\n")
+        self.assertEqual([c.mode for c in VariantSource(path)], ["full"])
+
+    def test_table_filters(self):
+        path = self.write("list.csv", "BRAF:V600E,hg38\nKRAS:G12D,hg38\nchr7:140753336:A:T,hg38\n")
+
+        self.assertEqual([c.variant for c in VariantSource(path, genes={"KRAS"})], ["KRAS:G12D"])
+        by_region = VariantSource(path, regions=parse_regions("7"))
+        self.assertEqual([c.variant for c in by_region], ["chr7:140753336:A:T"])
+        self.assertEqual(by_region.stats()["skipped"], {"no coordinates for region filter": 2})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
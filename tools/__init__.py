@@ -0,0 +1 @@
+# Tools package for VarSome Test Automation - measurement scripts
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Check that a direct journey ends where a full one does - the condition for turning on direct mode
+Usage: python -m tools.compare_modes [--variants BRAF:V600E,TP53:R175H] [--profile default] [--live]
+
+Every variant runs as a full journey (homepage search + modal) and as a direct one (results URL
+with the sample information in the query string), in the same browser. Reported per variant:
+    same verdict and color from both modes
+    the query parameters the site put in the URL after the full journey, next to the ones
+    ResultsUrl.SAMPLE_PARAMS sends - on the live site these confirm (or correct) the names
+Exit code 1 if any variant differs. Runs against the local stand-in server unless --live is given
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+from framework.driver_factory import create_driver
+from framework.driver_pool import reset_driver_state
+from framework.journey import VariantCase, run_variant_journey
+from framework.sample_profiles import load_profile
+from locators import TestData, RunSettings, ResultsUrl
+from tools.stand_in_server import CLASSIFICATIONS, start_server
+
+
+def compare_variant(driver, variant, profile):
+    """Run both modes for one variant, returns what the report needs"""
+    runs = {}
+    for mode in ("full", "direct"):
+        reset_driver_state(driver)
+        case = VariantCase(variant, mode=mode, profile=profile)
+        case.expected_verdict = CLASSIFICATIONS.get(variant, (TestData.EXPECTED_VERDICT,))[0]
+        result = run_variant_journey(driver, case, retries=0)
+        runs[mode] = {"verdict": result["verdict"], "color": result["color"], "passed": result["passed"],
+                      "error": result["error"], "url": driver.current_url}
+
+    sample = load_profile(profile) or {}
+    expected_params = sorted(ResultsUrl.SAMPLE_PARAMS[key] for key, value in sample.items()
+                             if key in ResultsUrl.SAMPLE_PARAMS and value not in (None, ""))
+    full_params = sorted(parse_qs(urlparse(runs["full"]["url"]).query))
+    full, direct = runs["full"], runs["direct"]
+    same = (full["verdict"] is not None and full["color"] == direct["color"]
+            and full["verdict"].strip().lower() == (direct["verdict"] or "").strip().lower())
+    return {
+        "variant": variant,
+        "same_result": same,
+        "full": full,
+        "direct": direct,
+        "url_params_after_full": full_params,
+        "url_params_sent_by_direct": expected_params,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that direct journeys reach the same verdict as full ones")
+    parser.add_argument("--variants", default=None, help="Comma separated variants (default: all of the stand-in's)")
+    parser.add_argument("--profile", default=RunSettings.SAMPLE_PROFILE, help="Sample profile for both modes")
+    parser.add_argument("--live", action="store_true", help="Use VarSome instead of the local stand-in")
+    args = parser.parse_args(argv)
+
+    RunSettings.DIRECT_MODE = True  # This is the check that decides whether it can be on
+    server = None
+    if not args.live:
+        server, TestData.BASE_URL = start_server()
+    variants = args.variants.split(",") if args.variants else (list(CLASSIFICATIONS) if not args.live
+                                                                 else [TestData.VARIANT])
+
+    driver = create_driver()
+    try:
+        comparisons = [compare_variant(driver, variant.strip(), args.profile) for variant in variants]
+    finally:
+        driver.quit()
+        if server:
+            server.shutdown()
+
+    print("\n" + "="*70)
+    for c in comparisons:
+        print(f"[{'SAME' if c['same_result'] else 'DIFFERENT'}] {c['variant']}: "
+              f"full {c['full']['verdict']} ({c['full']['color']}), direct {c['direct']['verdict']} ({c['direct']['color']})")
+        if c["url_params_after_full"] != c["url_params_sent_by_direct"]:
+            print(f"  URL parameters after the full journey: {c['url_params_after_full'] or 'none'}, "
+                  f"direct sends: {c['url_params_sent_by_direct'] or 'none'}")
+    differing = [c for c in comparisons if not c["same_result"]]
+    print(f"{len(comparisons) - len(differing)} of {len(comparisons)} variants reach the same verdict in both modes")
+    print("="*70)
+
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR, f"compare_modes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"live": args.live, "profile": args.profile, "comparisons": comparisons}, f, indent=2)
+    print(f"Comparison saved as: {path}")
+    return 1 if differing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
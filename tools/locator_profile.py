@@ -0,0 +1,190 @@
+"""
+Locator cost profiler - evaluates every locator in locators.Locators inside the browser and reports
+how long each takes and how many elements it matches
+Usage:
+    python -m tools.locator_profile                              # stand-in results page
+    python -m tools.locator_profile --page home --inflate 50     # stand-in home page, DOM made 50x bigger
+    python -m tools.locator_profile --url https://varsome.com/variant/hg38/BRAF%3AV600E
+    python -m tools.locator_profile --fixture artifacts/<run_id>/<variant>/dom.html
+
+Each locator is evaluated --iterations times with the same lookup code the wait engine uses
+(findAll from BasePage's DOM helpers), so the numbers are what one poll of a wait costs.
+The report also compares a lookup through the page's locator index with a plain lookup
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from locators import Locators, TestData, RunSettings, CompositeLocator
+
+# args[0] is [[name, locator], ...], args[1] iterations - returns [name, median ms, max ms, matches, error]
+PROFILE_JS = """
+var items = arguments[0], iterations = arguments[1], out = [];
+for (var i = 0; i < items.length; i++) {
+    var times = [], count = 0, error = null;
+    for (var n = 0; n < iterations; n++) {
+        var started = performance.now();
+        try { count = findAll(items[i][1]).length; } catch (e) { error = String(e); break; }
+        times.push(performance.now() - started);
+    }
+    times.sort(function(a, b) { return a - b; });
+    out.push([items[i][0], times.length ? times[Math.floor(times.length / 2)] : null,
+              times.length ? times[times.length - 1] : null, count, error]);
+}
+return {results: out, elements: document.getElementsByTagName('*').length};
+"""
+
+# Copies the page content n times so the DOM is closer to the size of the real results page
+INFLATE_JS = """
+var root = document.querySelector('main') || document.body, copies = arguments[0];
+var original = root.innerHTML, html = [];
+for (var i = 0; i < copies; i++) { html.push("<div class='inflated-copy'>" + original + "</div>"); }
+root.insertAdjacentHTML('beforeend', html.join(''));
+return document.getElementsByTagName('*').length;
+"""
+
+
+def registered_locators():
+    """Every (By, value) locator in Locators by attribute name, each one once
+    CompositeLocators and INTERRUPTION_OVERLAYS reuse these so they are not repeated"""
+    found, seen = [], set()
+    for name, value in vars(Locators).items():
+        if name.startswith("_") or isinstance(value, (CompositeLocator, dict)):
+            continue
+        if isinstance(value, tuple) and len(value) == 2 and tuple(value) not in seen:
+            seen.add(tuple(value))
+            found.append((name, value))
+    return found
+
+
+def scan_kind(locator):
+    """Why a locator is likely slow - document-wide scans that cant use an id lookup"""
+    by, value = locator
+    if by == "id":
+        return "id"
+    if by == "xpath":
+        if value.startswith("//") and ("contains(" in value or "text()" in value):
+            return "xpath scan + text/contains"
+        return "xpath scan" if value.startswith("//") else "xpath"
+    if "*=" in value or "^=" in value:
+        return "css substring"
+    return "css"
+
+
+def profile_locators(driver, iterations):
+    """Run PROFILE_JS on the current page. Returns (rows sorted by cost, element count)"""
+    from pages.base_page import DOM_HELPERS_JS
+
+    items = [[name, list(locator)] for name, locator in registered_locators()]
+    outcome = driver.execute_script(DOM_HELPERS_JS + PROFILE_JS, items, iterations)
+    kinds = dict((name, scan_kind(locator)) for name, locator in registered_locators())
+    rows = [{"name": name, "median_ms": round(median, 3) if median is not None else None,
+             "max_ms": round(worst, 3) if worst is not None else None, "matches": count,
+             "kind": kinds[name], "error": error}
+            for name, median, worst, count, error in outcome["results"]]
+    rows.sort(key=lambda r: -(r["median_ms"] or 0))
+    return rows, outcome["elements"]
+
+
+def profile_index(driver, repeat=20):
+    """Round trip of a plain one-locator lookup vs the ResultsPage locator index
+    The first index lookup builds it (all locators), the rest are answered from it"""
+    from framework.locator_index import LocatorIndex
+    from pages.base_page import DOM_HELPERS_JS, LOCATOR_STATE_CONDITIONS
+    from pages.results_page import ResultsPage
+
+    name = "Germline Classification"
+    locator = list(ResultsPage.INDEXED_LOCATORS[name])
+    plain_script = DOM_HELPERS_JS + "var args = arguments;" + LOCATOR_STATE_CONDITIONS["visible"]
+
+    def timed(call):
+        started = time.perf_counter()
+        call()
+        return (time.perf_counter() - started) * 1000
+
+    index = LocatorIndex(driver, ResultsPage.INDEXED_LOCATORS, key="profile")
+    build_ms = timed(lambda: index.lookup(name))
+    indexed = sorted(timed(lambda: index.lookup(name)) for _ in range(repeat))
+    plain = sorted(timed(lambda: driver.execute_script(plain_script, locator)) for _ in range(repeat))
+    return {
+        "locator": name,
+        "index_build_ms": round(build_ms, 2),
+        "indexed_lookup_ms": round(indexed[len(indexed) // 2], 2),
+        "plain_lookup_ms": round(plain[len(plain) // 2], 2),
+        "rebuilds": index.rebuilds,
+    }
+
+
+def open_page(driver, args):
+    """Load what should be profiled. Returns (description, stand-in server or None)"""
+    if args.fixture:
+        path = os.path.abspath(args.fixture)
+        driver.get("file://" + path)
+        return path, None
+    if args.url:
+        driver.get(args.url)
+        return args.url, None
+
+    from pages.results_page import ResultsPage, build_results_url
+    from tools.stand_in_server import start_server
+
+    server, base_url = start_server(api_delay=0, home_page="home_full.html")
+    if args.page == "home":
+        driver.get(base_url)
+    else:
+        driver.get(build_results_url(TestData.VARIANT, TestData.GENOME, base_url=base_url))
+        ResultsPage(driver).wait_for_locator(Locators.VERDICT_PILL_TEXT, "visible")
+    return f"stand-in {args.page} page", server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every locator in locators.Locators on a loaded page")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--page", choices=["home", "results"], default="results", help="Stand-in page (default)")
+    source.add_argument("--url", help="Profile this live page instead")
+    source.add_argument("--fixture", help="Profile a saved DOM, e.g. dom.html of a failure artifact")
+    parser.add_argument("--inflate", type=int, default=0, help="Copy the page content this many times first")
+    parser.add_argument("--iterations", type=int, default=20, help="Evaluations per locator")
+    args = parser.parse_args(argv)
+
+    from framework.driver_factory import create_driver
+
+    driver = create_driver(profile="lean", use_template=False)
+    server = None
+    try:
+        description, server = open_page(driver, args)
+        if args.inflate:
+            driver.execute_script(INFLATE_JS, args.inflate)
+        rows, elements = profile_locators(driver, args.iterations)
+        index = profile_index(driver)
+    finally:
+        driver.quit()
+        if server:
+            server.shutdown()
+
+    print("\n" + "="*70)
+    print(f"{description} - {elements} elements, {args.iterations} evaluations per locator")
+    print(f"{'locator':<34}{'median ms':>11}{'max ms':>9}{'matches':>9}  kind")
+    for r in rows:
+        if r["error"]:
+            print(f"{r['name']:<34}{'error':>11}  {r['error']}")
+            continue
+        print(f"{r['name']:<34}{r['median_ms']:>11}{r['max_ms']:>9}{r['matches']:>9}  {r['kind']}")
+    print("-"*70)
+    print(f"Locator index ({index['locator']}): build {index['index_build_ms']} ms, "
+          f"indexed lookup {index['indexed_lookup_ms']} ms, plain lookup {index['plain_lookup_ms']} ms (round trips)")
+    print("="*70)
+
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR, f"locator_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"page": description, "elements": elements, "inflate": args.inflate,
+                   "iterations": args.iterations, "locators": rows, "index": index}, f, indent=2)
+    print(f"Profile saved as: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure page load time and browser memory with and without the lean profile
+Usage: python -m tools.measure_lean_profile [--url URL ...] [--repeat 3]
+
+Compares three setups on the same pages:
+    default        - maximized headed browser, everything downloaded (what the test used to run)
+    lean-unblocked - headless fixed viewport, everything downloaded
+    lean           - headless fixed viewport with RunSettings.LEAN_BLOCKED_URL_PATTERNS blocked
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from framework.browser_memory import browser_rss_mb
+from framework.driver_factory import create_driver
+from locators import TestData, RunSettings
+
+SETUPS = [
+    ("default", "default", False),
+    ("lean-unblocked", "lean", False),
+    ("lean", "lean", True),
+]
+
+PAGE_TIMING_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var transferred = 0;
+for (var i = 0; i < resources.length; i++) { transferred += resources[i].transferSize || 0; }
+return {
+    load_ms: Math.round(nav.loadEventEnd - nav.startTime),
+    dom_ready_ms: Math.round(nav.domContentLoadedEventEnd - nav.startTime),
+    requests: resources.length,
+    transfer_kb: Math.round(transferred / 1024)
+};
+"""
+
+
+def measure_setup(profile, block_requests, urls, repeat):
+    """Load every url repeat times in a fresh browser and return the averages"""
+    samples = []
+    for _ in range(repeat):
+        driver = create_driver(profile=profile, block_requests=block_requests)
+        try:
+            for url in urls:
+                driver.get(url)
+                sample = driver.execute_script(PAGE_TIMING_JS)
+                sample["url"] = url
+                sample["memory_mb"] = browser_rss_mb(driver)
+                samples.append(sample)
+        finally:
+            driver.quit()
+
+    def average(key):
+        values = [s[key] for s in samples if s.get(key) is not None]
+        return round(sum(values) / len(values), 1) if values else None
+
+    return {
+        "load_ms": average("load_ms"),
+        "dom_ready_ms": average("dom_ready_ms"),
+        "requests": average("requests"),
+        "transfer_kb": average("transfer_kb"),
+        "memory_mb": average("memory_mb"),
+        "samples": samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare page load and memory for browser profiles")
+    parser.add_argument("--url", action="append", help="Page to load (default: VarSome homepage), can repeat")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh browsers per setup")
+    args = parser.parse_args(argv)
+    urls = args.url or [TestData.BASE_URL]
+
+    results = {}
+    for name, profile, block_requests in SETUPS:
+        print(f"Measuring {name}...")
+        results[name] = measure_setup(profile, block_requests, urls, args.repeat)
+
+    print("\n" + "="*70)
+    print(f"{'setup':<16}{'load ms':>10}{'dom ms':>10}{'requests':>10}{'KB':>10}{'memory MB':>12}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['load_ms']!s:>10}{r['dom_ready_ms']!s:>10}{r['requests']!s:>10}"
+              f"{r['transfer_kb']!s:>10}{r['memory_mb']!s:>12}")
+    print("="*70)
+
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR,
+                        f"lean_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"urls": urls, "repeat": args.repeat, "setups": results}, f, indent=2)
+    print(f"Measurement saved as: {path}")
+
+
+if __name__ == "__main__":
+    main()
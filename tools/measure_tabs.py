@@ -0,0 +1,159 @@
+"""
+Compare running journeys in several tabs of one browser against one browser per journey
+Usage: python -m tools.measure_tabs [--concurrency 4] [--journeys 12] [--live]
+
+Both setups run the same journeys with the same number at once, on the same machine:
+    browsers - one Chrome per concurrent journey (what run_matrix.py does by default)
+    tabs     - one Chrome, one tab per concurrent journey (run_matrix.py --tabs)
+Reports throughput (journeys per minute) and peak resident memory of all Chrome processes.
+Runs against the local stand-in server unless --live is given
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from framework.browser_memory import browser_rss_mb
+from framework.driver_factory import create_driver
+from framework.driver_pool import DriverPool, reset_driver_state
+from framework.journey import VariantCase, run_variant_journey
+from framework.tab_manager import TabManager
+from locators import TestData, RunSettings
+from tools.stand_in_server import CLASSIFICATIONS, start_server
+
+
+class MemorySampler:
+    """Samples total RSS of the given browsers twice a second and keeps the peak"""
+
+    def __init__(self, drivers):
+        self.drivers = drivers
+        self.peak_mb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            total = sum(browser_rss_mb(driver) or 0 for driver in self.drivers)
+            self.peak_mb = max(self.peak_mb, total)
+            self._stop.wait(0.5)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_journeys(drivers_for_threads, cases):
+    """One thread per driver, each takes cases from a shared queue. Returns the results"""
+    tasks = queue.Queue()
+    for case in cases:
+        tasks.put(case)
+    results = []
+
+    def loop(driver, reset):
+        while True:
+            try:
+                case = tasks.get_nowait()
+            except queue.Empty:
+                return
+            results.append(run_variant_journey(driver, case))
+            reset(driver)
+
+    threads = [threading.Thread(target=loop, args=item) for item in drivers_for_threads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def measure_browsers(concurrency, cases):
+    pools = [DriverPool(size=1) for _ in range(concurrency)]
+    drivers = [pool.checkout() for pool in pools]
+    try:
+        with MemorySampler(drivers) as sampler:
+            started = time.perf_counter()
+            results = run_journeys([(driver, reset_driver_state) for driver in drivers], cases)
+            elapsed = time.perf_counter() - started
+    finally:
+        for pool, driver in zip(pools, drivers):
+            pool.checkin(driver)
+            pool.close()
+    return summarize(results, elapsed, sampler.peak_mb)
+
+
+def measure_tabs(concurrency, cases):
+    pool = DriverPool(size=1, factory=lambda: create_driver(background_tabs=True))
+    driver = pool.checkout()
+    manager = TabManager(driver)
+    tabs = [manager.open_tab() for _ in range(concurrency)]
+    try:
+        with MemorySampler([driver]) as sampler:
+            started = time.perf_counter()
+            results = run_journeys([(tab, manager.reset_tab) for tab in tabs], cases)
+            elapsed = time.perf_counter() - started
+    finally:
+        manager.close()
+        pool.checkin(driver)
+        pool.close()
+    return summarize(results, elapsed, sampler.peak_mb)
+
+
+def summarize(results, elapsed, peak_mb):
+    return {
+        "journeys": len(results),
+        "passed": sum(1 for r in results if r["passed"]),
+        "elapsed": round(elapsed, 2),
+        "per_minute": round(len(results) / elapsed * 60, 1) if elapsed else 0,
+        "avg_journey": round(sum(r["duration"] for r in results) / len(results), 2) if results else 0,
+        "peak_memory_mb": round(peak_mb),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare tabs in one browser with one browser per journey")
+    parser.add_argument("--concurrency", type=int, default=4, help="Journeys running at the same time")
+    parser.add_argument("--journeys", type=int, default=12, help="Journeys per setup")
+    parser.add_argument("--live", action="store_true", help="Use VarSome instead of the local stand-in")
+    args = parser.parse_args(argv)
+
+    server = None
+    if not args.live:
+        server, TestData.BASE_URL = start_server()
+    variants = list(CLASSIFICATIONS) if not args.live else [TestData.VARIANT]
+    cases = [VariantCase(variants[i % len(variants)]) for i in range(args.journeys)]
+    for case in cases:
+        case.expected_verdict = CLASSIFICATIONS.get(case.variant, (TestData.EXPECTED_VERDICT,))[0]
+
+    try:
+        results = {}
+        for name, measure in (("browsers", measure_browsers), ("tabs", measure_tabs)):
+            print(f"Measuring {name} ({args.concurrency} at once, {args.journeys} journeys)...")
+            results[name] = measure(args.concurrency, cases)
+    finally:
+        if server:
+            server.shutdown()
+
+    print("\n" + "="*70)
+    print(f"{'setup':<10}{'passed':>8}{'seconds':>10}{'per min':>10}{'avg journey':>13}{'peak MB':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['passed']:>8}{r['elapsed']:>10}{r['per_minute']:>10}"
+              f"{r['avg_journey']:>13}{r['peak_memory_mb']:>10}")
+    print("="*70)
+
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR, f"tabs_vs_browsers_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"concurrency": args.concurrency, "live": args.live, "setups": results}, f, indent=2)
+    print(f"Measurement saved as: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Build the pre-seeded profile template and measure what it saves
+Usage:
+    python -m tools.profile_template build [--template DIR]
+    python -m tools.profile_template measure [--template DIR] [--repeat 3]
+
+measure starts browsers both ways and times startup-to-search: from starting Chrome until the
+search box is usable with no popup left on top of it
+    fresh  - empty profile, consent banner and update popup have to be dismissed
+    seeded - copy of the template, consent and popup already acknowledged, HTTP cache warm
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from framework.browser_profile import build_profile_template
+from framework.driver_factory import create_driver
+from framework.driver_pool import DriverPool
+from locators import Locators, RunSettings
+from pages.home_page import HomePage
+
+
+def measure_startup(use_template, repeat):
+    """Start repeat browsers and time each one until the search box is ready"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        driver = create_driver(use_template=use_template)
+        browser_ready = time.perf_counter()
+        try:
+            home_page = HomePage(driver)
+            home_page.navigate_to_homepage()
+            search_ready = home_page.get_clickable_element(Locators.SEARCH_INPUT_ANY) is not None
+            dismissed = home_page.dismiss_overlays() + [e["name"] for e in home_page.overlay_watcher_log()]
+            finished = time.perf_counter()
+        finally:
+            DriverPool._quit_driver(driver)  # Also removes the profile copy
+        samples.append({
+            "browser_start": round(browser_ready - started, 3),
+            "startup_to_search": round(finished - started, 3),
+            "search_ready": search_ready,
+            "popups_dismissed": sorted(set(dismissed)),
+        })
+
+    def average(key):
+        return round(sum(s[key] for s in samples) / len(samples), 3)
+
+    return {
+        "browser_start": average("browser_start"),
+        "startup_to_search": average("startup_to_search"),
+        "popups_dismissed": sum(len(s["popups_dismissed"]) for s in samples),
+        "samples": samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or measure the pre-seeded browser profile")
+    parser.add_argument("command", choices=["build", "measure"])
+    parser.add_argument("--template", default=None,
+                        help=f"Template folder (default: {RunSettings.DEFAULT_PROFILE_TEMPLATE})")
+    parser.add_argument("--repeat", type=int, default=3, help="Browsers started per setup (measure)")
+    args = parser.parse_args(argv)
+    template = args.template or os.environ.get("VARSOME_PROFILE_TEMPLATE") or RunSettings.DEFAULT_PROFILE_TEMPLATE
+
+    if args.command == "build":
+        build_profile_template(template)
+        return
+
+    if not os.path.isdir(template):
+        build_profile_template(template)
+    os.environ["VARSOME_PROFILE_TEMPLATE"] = template
+
+    results = {}
+    for name, use_template in (("fresh", False), ("seeded", True)):
+        print(f"Measuring {name}...")
+        results[name] = measure_startup(use_template, args.repeat)
+
+    print("\n" + "="*70)
+    print(f"{'setup':<10}{'browser start s':>18}{'startup to search s':>22}{'popups':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['browser_start']:>18}{r['startup_to_search']:>22}{r['popups_dismissed']:>10}")
+    saved = results["fresh"]["startup_to_search"] - results["seeded"]["startup_to_search"]
+    print(f"Seeded profile saves {saved:.2f}s per browser start")
+    print("="*70)
+
+    os.makedirs(RunSettings.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RunSettings.RESULTS_DIR,
+                        f"profile_startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump({"template": template, "repeat": args.repeat, "setups": results,
+                   "saved_per_start": round(saved, 3)}, f, indent=2)
+    print(f"Measurement saved as: {path}")
+
+
+if __name__ == "__main__":
+    main()
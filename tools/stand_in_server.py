@@ -0,0 +1,98 @@
+"""
+Local stand-in for varsome.com - serves the fixture pages and the same API endpoints
+Usage: python -m tools.stand_in_server [--port 8000] [--api-delay 0.5] [--home home_full.html]
+Then run tests against it with VARSOME_BASE_URL=http://localhost:8000
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+# Verdict and ACMG criteria the stand-in returns per variant, anything else is a VUS
+CLASSIFICATIONS = {
+    "BRAF:V600E": ("Pathogenic", ["PS3", "PM1", "PM2", "PM5", "PP2", "PP3", "PP5"]),
+    "TP53:R175H": ("Pathogenic", ["PS3", "PM1", "PM2", "PM5", "PP3", "PP5"]),
+    "APOE:C130R": ("Benign", ["BA1", "BP6"]),
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Routes: / home page, /variant/<genome>/<variant> results page, /api/... JSON
+    The home page is home.html, or home_full.html for cookie banner, update popup and sample modal"""
+
+    def do_GET(self):
+        parts = [unquote(p) for p in urlparse(self.path).path.split("/") if p]
+
+        if not parts:
+            return self._send_file(self.server.home_page)
+        if parts[0] == "variant" and len(parts) >= 3:
+            return self._send_file("results.html")
+        if parts[:2] == ["api", "lookup"] and len(parts) >= 3:
+            variant, genome = parts[2], parts[3] if len(parts) > 3 else "hg38"
+            gene = variant.split(":")[0]
+            return self._send_json({"variant": variant, "genome": genome, "gene": gene})
+        if parts[:2] == ["api", "acmg"] and len(parts) >= 3:
+            verdict, criteria = CLASSIFICATIONS.get(parts[2], ("Uncertain Significance", []))
+            return self._send_json({"variant": parts[2], "verdict": verdict, "criteria": criteria})
+        if len(parts) == 1 and os.path.isfile(os.path.join(FIXTURES_DIR, parts[0])):
+            return self._send_file(parts[0])
+
+        self.send_error(404)
+
+    def _send_file(self, name):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            body = f.read()
+        self._send(body, "text/html; charset=utf-8")
+
+    def _send_json(self, data):
+        time.sleep(self.server.api_delay)  # Pretend the API takes a while, like the real one
+        self._send(json.dumps(data).encode(), "application/json")
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output clean
+
+
+def start_server(port=0, api_delay=0.2, home_page="home.html"):
+    """Start the stand-in in a background thread - returns (server, base_url)
+    port 0 picks a free port. Call server.shutdown() when done"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.api_delay = api_delay
+    server.home_page = home_page
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for varsome.com")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--api-delay", type=float, default=0.2, help="Seconds each API call takes")
+    parser.add_argument("--home", default="home.html", help="Fixture served as the home page")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandInHandler)
+    server.api_delay = args.api_delay
+    server.home_page = args.home
+    print(f"Stand-in server on http://127.0.0.1:{args.port} - Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()